@@ -0,0 +1,264 @@
+import base64
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+from benchmarks.docker_sim import compose_services, simulated_daemon, write_shim
+from benchmarks.harness import ROOT, TEMPLATES_DIR, Sandbox, measure
+
+CASES = {}
+DB_COUNTS = [1, 10, 100]
+FLEET_SIZE = 20
+# Provisioning runs one docker process per agent; status only hits the API.
+SIM_PROVISION_SIZE = 20
+SIM_STATUS_SIZE = 200
+# Round trip of a real `docker compose` call is far above this; it only has to
+# dominate process start-up so that fan-out gains stay visible.
+DOCKER_LATENCY = "0.05"
+EDGE_KEY = base64.b64encode(
+    json.dumps(
+        {"serverUrl": "http://127.0.0.1", "agentId": "bench", "masterKeyB64": "a2V5"}
+    ).encode()
+).decode()
+
+
+def benchmark(name: str):
+    def decorator(func):
+        CASES[name] = func
+        return func
+
+    return decorator
+
+
+def quiet_consoles():
+    import core.network
+    import core.utils
+
+    core.utils.console.quiet = True
+    core.network.console.quiet = True
+
+
+def run_cli(*args: str):
+    subprocess.run(
+        [sys.executable, str(ROOT / "main.py"), *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+@benchmark("startup.import_main")
+def startup_import(sandbox: Sandbox) -> dict:
+    return measure(
+        lambda: subprocess.run([sys.executable, "-c", "import main"], cwd=ROOT, check=True),
+        repeat=10,
+    )
+
+
+@benchmark("startup.help")
+def startup_help(sandbox: Sandbox) -> dict:
+    return measure(lambda: run_cli("--help"), repeat=10)
+
+
+def render_agent(db_count: int):
+    from commands.agent import build_local_database, render_agent_compose
+    from templates.compose import DATABASE_ENGINES
+
+    engines = list(DATABASE_ENGINES)
+    template = (TEMPLATES_DIR / "agent.yml").read_text()
+    extra_services = {}
+    volumes = []
+    for i in range(db_count):
+        engine, variant = engines[i % len(engines)]
+        local_db = build_local_database(engine, variant, port=20000 + i)
+        extra_services[local_db["service_name"]] = local_db["service"]
+        volumes.append(local_db["volume"])
+    return render_agent_compose(
+        template, extra_services, volumes, ["./databases.json:/config/config.json"], False
+    )
+
+
+for count in DB_COUNTS:
+
+    @benchmark(f"compose.render_agent[{count}]")
+    def compose_render(sandbox: Sandbox, count=count) -> dict:
+        return measure(lambda: render_agent(count), repeat=20 if count < 100 else 5)
+
+
+@benchmark("config.db_json_add_each[100]")
+def db_json_add_each(sandbox: Sandbox) -> dict:
+    from core.config import add_db_to_json
+
+    def run(path: Path):
+        for i in range(100):
+            add_db_to_json(path, {"name": f"db{i}", "type": "sqlite", "database": f"/d{i}"})
+
+    return measure(run, repeat=5, setup=lambda: sandbox.fresh_dir("db-json"))
+
+
+@benchmark("config.db_json_add_bulk[100]")
+def db_json_add_bulk(sandbox: Sandbox) -> dict:
+    from core.config import add_dbs_to_json
+
+    def run(path: Path):
+        add_dbs_to_json(
+            path,
+            [{"name": f"db{i}", "type": "sqlite", "database": f"/d{i}"} for i in range(100)],
+        )
+
+    return measure(run, repeat=10, setup=lambda: sandbox.fresh_dir("db-json"))
+
+
+@benchmark("config.env_write_each[100]")
+def env_write_each(sandbox: Sandbox) -> dict:
+    from core.config import write_env_file
+
+    def run(path: Path):
+        for i in range(100):
+            write_env_file(path, {f"VAR_{i}": str(i)})
+
+    return measure(run, repeat=5, setup=lambda: sandbox.fresh_dir("env"))
+
+
+def write_fleet_spec(path: Path, size: int = FLEET_SIZE) -> Path:
+    spec = {
+        "defaults": {"key": EDGE_KEY, "overwrite": True},
+        "agents": [
+            {
+                "name": str(path / f"agent-{i}"),
+                "databases": [
+                    {"type": "postgresql", "new": True},
+                    {"type": "sqlite", "new": True, "database": "local"},
+                ],
+            }
+            for i in range(size)
+        ],
+    }
+    spec_file = path / "fleet.yml"
+    spec_file.write_text(yaml.safe_dump(spec))
+    return spec_file
+
+
+@benchmark(f"fleet.provision_start[{FLEET_SIZE}]")
+def fleet_provision(sandbox: Sandbox) -> dict:
+    from commands.fleet import provision_fleet
+    from core.ports import release_ports
+
+    quiet_consoles()
+
+    def run(spec_file: Path):
+        provision_fleet(spec_file, parallel=8, start=True, offline=True)
+        for agent in spec_file.parent.glob("agent-*"):
+            release_ports(str(agent))
+
+    os.environ["FAKE_DOCKER_LATENCY"] = DOCKER_LATENCY
+    try:
+        return measure(run, repeat=3, setup=lambda: write_fleet_spec(sandbox.fresh_dir("fleet")))
+    finally:
+        os.environ["FAKE_DOCKER_LATENCY"] = "0"
+
+
+@benchmark(f"fleet.restart[{FLEET_SIZE}]")
+def fleet_restart(sandbox: Sandbox) -> dict:
+    from commands.common import run_lifecycle
+    from commands.fleet import provision_fleet
+
+    quiet_consoles()
+    path = sandbox.fresh_dir("lifecycle")
+    provision_fleet(write_fleet_spec(path), offline=True)
+
+    os.environ["FAKE_DOCKER_LATENCY"] = DOCKER_LATENCY
+    try:
+        return measure(
+            lambda: run_lifecycle([path / "agent-*"], ["restart"], "Restarting", "Restarted", 4),
+            repeat=3,
+        )
+    finally:
+        os.environ["FAKE_DOCKER_LATENCY"] = "0"
+
+
+@benchmark("network.template_fetch")
+def template_fetch(sandbox: Sandbox) -> dict:
+    import core.network
+
+    quiet_consoles()
+    core.network.TEMPLATE_BASE_URL = f"{sandbox.url}/templates"
+    return measure(lambda: core.network.fetch_template("agent.yml", refresh=True), repeat=20)
+
+
+@benchmark("network.release_check")
+def release_check(sandbox: Sandbox) -> dict:
+    import core.updater
+
+    core.updater.GITHUB_API_BASE_URL = f"{sandbox.url}/releases"
+    return measure(lambda: core.updater.get_latest_release_data(), repeat=20)
+
+
+@contextmanager
+def docker_simulator(sandbox: Sandbox, **options):
+    """Point both the Engine API client and the docker binary at a SimulatedDaemon."""
+    import core.docker_api
+
+    socket_path = str(sandbox.root / "docker-sim.sock")
+    shim_dir = write_shim(sandbox.root / "sim-bin").parent
+    saved = {key: os.environ[key] for key in ("DOCKER_HOST", "PATH")}
+    with simulated_daemon(socket_path, **options) as daemon:
+        os.environ["DOCKER_HOST"] = f"unix://{socket_path}"
+        os.environ["PATH"] = f"{shim_dir}{os.pathsep}{saved['PATH']}"
+        os.environ["DOCKER_SIM_QUIET"] = "1"
+        core.docker_api._api = None
+        try:
+            yield daemon
+        finally:
+            os.environ.update(saved)
+            os.environ.pop("DOCKER_SIM_QUIET", None)
+            core.docker_api._api = None
+
+
+@benchmark(f"sim.provision_start[{SIM_PROVISION_SIZE}]")
+def sim_provision(sandbox: Sandbox) -> dict:
+    from commands.fleet import provision_fleet
+    from core.ports import release_ports
+
+    quiet_consoles()
+
+    def run(spec_file: Path):
+        provision_fleet(spec_file, parallel=16, start=True, offline=True)
+        for agent in spec_file.parent.glob("agent-*"):
+            release_ports(str(agent))
+
+    with docker_simulator(sandbox, latency=0.001, compose_latency=0.01, seed=1):
+        return measure(
+            run,
+            repeat=1,
+            setup=lambda: write_fleet_spec(sandbox.fresh_dir("sim-fleet"), SIM_PROVISION_SIZE),
+            warmup=False,
+        )
+
+
+@benchmark(f"sim.status[{SIM_STATUS_SIZE}]")
+def sim_status(sandbox: Sandbox) -> dict:
+    from commands.fleet import provision_fleet
+    from commands.status import collect_status
+    from core.docker import project_name
+    from core.utils import discover_components
+
+    quiet_consoles()
+    path = sandbox.fresh_dir("sim-status")
+    provision_fleet(write_fleet_spec(path, SIM_STATUS_SIZE), parallel=16, offline=True)
+    components = discover_components([path])
+
+    def run():
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(collect_status, components))
+
+    with docker_simulator(sandbox, latency=0.001, seed=1) as daemon:
+        # Start the containers straight in the daemon, no need to time 500 `up`s.
+        for component in components:
+            daemon.compose(project_name(component), ["up", "-d"], compose_services(component, []))
+        return measure(run, repeat=5)
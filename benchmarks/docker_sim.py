@@ -0,0 +1,580 @@
+"""Simulated Docker daemon for exercising the CLI on large fleets.
+
+Implements the part of the Engine API the CLI talks to (/_ping, /info,
+networks, container list/inspect, image inspect/pull) on a unix socket, plus a
+`docker` shim that turns the CLI invocations (info, network, inspect, image
+inspect, pull, compose up/start/stop/restart/down/ps/logs) into requests
+against the same in-memory state.
+
+    python -m benchmarks.docker_sim serve --socket /tmp/sim.sock --latency 0.005 --failure-rate 0.01
+    python -m benchmarks.docker_sim shim /tmp/sim-bin
+    portabase config docker-host unix:///tmp/sim.sock
+    portabase config docker-binary /tmp/sim-bin/docker
+
+Latency is added to every request; compose latency once per container that a
+compose command touches. Failures are injected on compose commands, either at
+random (--failure-rate) or for projects matching --fail-project. Set
+DOCKER_SIM_QUIET=1 to silence the shim's compose progress output.
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import http.client
+import json
+import os
+import random
+import socket
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+COMPOSE_COMMANDS = {"up", "start", "stop", "restart", "down", "ps", "logs"}
+# Every simulated image is made of these layers (sizes in bytes).
+IMAGE_LAYERS = [30_000_000, 8_000_000, 2_000_000]
+PULL_STEPS = 5
+DONE = {"start": "Started", "stop": "Stopped", "restart": "Restarted"}
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class SimulatedDaemon:
+    """In-memory networks and containers, shared by the API and the compose shim."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        compose_latency: float = 0.0,
+        failure_rate: float = 0.0,
+        api_error_rate: float = 0.0,
+        fail_projects: list | None = None,
+        log_lines: int = 20,
+        pull_latency: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.compose_latency = compose_latency
+        self.failure_rate = failure_rate
+        self.api_error_rate = api_error_rate
+        self.fail_projects = fail_projects or []
+        self.log_lines = log_lines
+        self.pull_latency = pull_latency
+        self.images = set()
+        self.random = random.Random(seed)
+        self.networks = {"bridge": {"Name": "bridge", "Id": uuid.uuid4().hex}}
+        self.containers = {}
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    def delay(self, base: float):
+        if base or self.jitter:
+            with self.lock:
+                extra = self.random.uniform(0, self.jitter) if self.jitter else 0
+            time.sleep(base + extra)
+
+    def chance(self, rate: float) -> bool:
+        if not rate:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+
+    def count(self, key: str):
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    # Engine API
+
+    def summary(self, container: dict) -> dict:
+        return {
+            "Id": container["Id"],
+            "Names": [f"/{container['Name']}"],
+            "Image": container["Image"],
+            "State": container["State"]["Status"],
+            "Status": "Up" if container["State"]["Running"] else "Exited (0)",
+            "Labels": container["Config"]["Labels"],
+        }
+
+    def list_containers(self, query: dict) -> list:
+        filters = json.loads(query.get("filters", ["{}"])[0])
+        labels = filters.get("label", [])
+        show_all = query.get("all", ["0"])[0] in ("1", "true")
+        with self.lock:
+            containers = list(self.containers.values())
+        result = []
+        for container in containers:
+            if not show_all and not container["State"]["Running"]:
+                continue
+            container_labels = container["Config"]["Labels"]
+            if all(
+                container_labels.get(key) == value
+                for key, _, value in (label.partition("=") for label in labels)
+            ):
+                result.append(self.summary(container))
+        return result
+
+    def find_container(self, ref: str) -> dict | None:
+        with self.lock:
+            if ref in self.containers:
+                return self.containers[ref]
+            for container in self.containers.values():
+                if container["Name"] == ref.lstrip("/") or container["Id"].startswith(ref):
+                    return container
+        return None
+
+    def pull(self, image: str):
+        """Yield the progress messages of a pull, taking about pull_latency per layer."""
+        layers = [
+            (hashlib.sha256(f"{image}/{i}".encode()).hexdigest()[:12], size)
+            for i, size in enumerate(IMAGE_LAYERS)
+        ]
+        yield {"status": f"Pulling from {image.split(':', 1)[0]}", "id": image.rsplit(":", 1)[-1]}
+        for layer, size in layers:
+            for step in range(1, PULL_STEPS + 1):
+                self.delay(self.pull_latency / PULL_STEPS)
+                yield {
+                    "status": "Downloading",
+                    "id": layer,
+                    "progressDetail": {"current": size * step // PULL_STEPS, "total": size},
+                }
+            yield {"status": "Pull complete", "id": layer}
+        with self.lock:
+            self.images.add(image)
+        yield {"status": f"Status: Downloaded newer image for {image}"}
+
+    # Compose
+
+    def project_containers(self, project: str) -> list:
+        with self.lock:
+            return [
+                c
+                for c in self.containers.values()
+                if c["Config"]["Labels"].get("com.docker.compose.project") == project
+            ]
+
+    def set_running(self, container: dict, running: bool):
+        container["State"].update(
+            {
+                "Status": "running" if running else "exited",
+                "Running": running,
+                "StartedAt": now_iso() if running else container["State"]["StartedAt"],
+            }
+        )
+
+    def compose(self, project: str, args: list, services: dict) -> dict:
+        command = args[0]
+        if command in ("up", "start", "stop", "restart", "down") and (
+            any(fnmatch.fnmatchcase(project, p) for p in self.fail_projects)
+            or self.chance(self.failure_rate)
+        ):
+            self.delay(self.compose_latency)
+            return {"exit_code": 1, "stdout": "", "stderr": f"simulated failure for {project}\n"}
+
+        lines = []
+        if command == "up":
+            existing = {c["Config"]["Labels"]["com.docker.compose.service"]: c for c in self.project_containers(project)}
+            for service, image in services.items():
+                self.delay(self.compose_latency)
+                with self.lock:
+                    self.images.add(image)
+                container = existing.get(service)
+                if container is None:
+                    container = {
+                        "Id": uuid.uuid4().hex + uuid.uuid4().hex,
+                        "Name": f"{project}-{service}-1",
+                        "Image": image,
+                        "RestartCount": 0,
+                        "State": {"Status": "created", "Running": False, "StartedAt": "0001-01-01T00:00:00Z"},
+                        "Config": {
+                            "Image": image,
+                            "Labels": {
+                                "com.docker.compose.project": project,
+                                "com.docker.compose.service": service,
+                            },
+                        },
+                    }
+                    with self.lock:
+                        self.containers[container["Id"]] = container
+                    lines.append(f" Container {container['Name']}  Created")
+                if not container["State"]["Running"]:
+                    self.set_running(container, True)
+                lines.append(f" Container {container['Name']}  Started")
+        elif command in ("start", "stop", "restart"):
+            for container in self.project_containers(project):
+                self.delay(self.compose_latency)
+                if command == "restart":
+                    container["RestartCount"] += 1
+                self.set_running(container, command != "stop")
+                lines.append(f" Container {container['Name']}  {DONE[command]}")
+        elif command == "down":
+            for container in self.project_containers(project):
+                self.delay(self.compose_latency)
+                with self.lock:
+                    self.containers.pop(container["Id"], None)
+                lines.append(f" Container {container['Name']}  Removed")
+        elif command == "ps":
+            containers = self.project_containers(project)
+            if "--all" not in args and "-a" not in args:
+                containers = [c for c in containers if c["State"]["Running"]]
+            if "--quiet" in args or "-q" in args:
+                return {"exit_code": 0, "stdout": "".join(f"{c['Id']}\n" for c in containers), "stderr": ""}
+            rows = [
+                {
+                    "ID": c["Id"][:12],
+                    "Name": c["Name"],
+                    "Service": c["Config"]["Labels"]["com.docker.compose.service"],
+                    "State": c["State"]["Status"],
+                    "Status": "Up" if c["State"]["Running"] else "Exited (0)",
+                }
+                for c in containers
+            ]
+            return {"exit_code": 0, "stdout": "".join(json.dumps(row) + "\n" for row in rows), "stderr": ""}
+        elif command == "logs":
+            tail = args[args.index("--tail") + 1] if "--tail" in args else "all"
+            count = self.log_lines if tail == "all" else min(int(tail), self.log_lines)
+            out = [
+                f"{c['Name']}  | simulated log line {i}"
+                for c in self.project_containers(project)
+                for i in range(count)
+            ]
+            return {"exit_code": 0, "stdout": "".join(line + "\n" for line in out), "stderr": ""}
+
+        return {"exit_code": 0, "stdout": "", "stderr": "".join(line + "\n" for line in lines)}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    daemon: SimulatedDaemon
+
+    def address_string(self):
+        return "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status: int, body=None, content_type: str = "application/json"):
+        if content_type == "application/json":
+            data = json.dumps(body).encode() if body is not None else b""
+        else:
+            data = str(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def stream(self, messages):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for message in messages:
+            data = json.dumps(message).encode() + b"\r\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def handle_request(self, method: str):
+        daemon = self.daemon
+        url = urlparse(self.path)
+        # Clients may prefix paths with an API version (/v1.43/...).
+        parts = [unquote(p) for p in url.path.split("/") if p]
+        if parts and parts[0].startswith("v1."):
+            parts = parts[1:]
+        query = parse_qs(url.query)
+        route = f"{method} /{'/'.join(parts[:1])}"
+        daemon.count(route)
+        daemon.delay(daemon.latency)
+
+        if parts[:1] != ["_sim"] and daemon.chance(daemon.api_error_rate):
+            return self.reply(500, {"message": "simulated daemon error"})
+
+        if parts == ["_ping"]:
+            return self.reply(200, "OK", "text/plain")
+        if parts == ["info"]:
+            return self.reply(200, {"ServerVersion": "simulated", "Containers": len(daemon.containers)})
+        if parts == ["networks", "create"] and method == "POST":
+            name = self.read_json().get("Name", "")
+            with daemon.lock:
+                if name in daemon.networks:
+                    return self.reply(409, {"message": f"network with name {name} already exists"})
+                daemon.networks[name] = {"Name": name, "Id": uuid.uuid4().hex}
+                return self.reply(201, {"Id": daemon.networks[name]["Id"]})
+        if len(parts) == 2 and parts[0] == "networks" and method == "GET":
+            network = daemon.networks.get(parts[1])
+            if network is None:
+                return self.reply(404, {"message": f"network {parts[1]} not found"})
+            return self.reply(200, network)
+        if parts == ["containers", "json"]:
+            return self.reply(200, daemon.list_containers(query))
+        if len(parts) == 3 and parts[0] == "containers" and parts[2] == "json":
+            container = daemon.find_container(parts[1])
+            if container is None:
+                return self.reply(404, {"message": f"No such container: {parts[1]}"})
+            return self.reply(200, container)
+        if parts == ["_sim", "compose"] and method == "POST":
+            body = self.read_json()
+            return self.reply(200, daemon.compose(body["project"], body["args"], body.get("services", {})))
+        if parts == ["images", "create"] and method == "POST":
+            image = query.get("fromImage", [""])[0]
+            if ":" not in image.rsplit("/", 1)[-1]:
+                image += f":{query.get('tag', ['latest'])[0]}"
+            if daemon.chance(daemon.api_error_rate):
+                return self.reply(404, {"message": f"pull access denied for {image}"})
+            return self.stream(daemon.pull(image))
+        if len(parts) >= 3 and parts[0] == "images" and parts[-1] == "json":
+            image = "/".join(parts[1:-1])
+            if image not in daemon.images:
+                return self.reply(404, {"message": f"No such image: {image}"})
+            return self.reply(200, {"Id": f"sha256:{hashlib.sha256(image.encode()).hexdigest()}", "RepoTags": [image]})
+        if parts == ["_sim", "stats"]:
+            return self.reply(200, {"containers": len(daemon.containers), "requests": daemon.requests})
+        self.reply(404, {"message": f"page not found: {url.path}"})
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(socket_path: str, daemon: SimulatedDaemon) -> UnixServer:
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    handler = type("BoundHandler", (Handler,), {"daemon": daemon})
+    return UnixServer(socket_path, handler)
+
+
+@contextmanager
+def simulated_daemon(socket_path: str, **options):
+    """Run a SimulatedDaemon on `socket_path` in a background thread."""
+    daemon = SimulatedDaemon(**options)
+    server = create_server(socket_path, daemon)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield daemon
+    finally:
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def write_shim(directory: Path) -> Path:
+    """Write a `docker` executable forwarding to this module's client."""
+    directory.mkdir(parents=True, exist_ok=True)
+    shim = directory / "docker"
+    shim.write_text(f'#!/bin/sh\nexec {sys.executable} {Path(__file__).resolve()} client "$@"\n')
+    shim.chmod(0o755)
+    return shim
+
+
+# Client side of the shim: one process per docker CLI invocation.
+
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str):
+        super().__init__("localhost", timeout=60)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def call(method: str, path: str, body=None) -> tuple[int, object]:
+    docker_host = os.environ.get("DOCKER_HOST", "")
+    if not docker_host.startswith("unix://"):
+        raise ConnectionError("DOCKER_HOST must point to the simulator socket (unix://...)")
+    connection = UnixConnection(docker_host[len("unix://") :])
+    payload = json.dumps(body) if body is not None else None
+    connection.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    if response.getheader("Content-Type", "").startswith("application/json") and data:
+        try:
+            return response.status, json.loads(data)
+        except ValueError:
+            # Streaming endpoints send one JSON message per line.
+            return response.status, [json.loads(line) for line in data.splitlines() if line.strip()]
+    return response.status, data.decode()
+
+
+def compose_services(cwd: Path, files: list) -> dict:
+    import yaml
+
+    services = {}
+    for name in files or ["docker-compose.yml"]:
+        try:
+            with open(cwd / name, "r") as f:
+                data = yaml.safe_load(f) or {}
+        except OSError:
+            continue
+        for service, definition in (data.get("services") or {}).items():
+            services[service] = (definition or {}).get("image", "")
+    return services
+
+
+def client(args: list) -> int:
+    if not args:
+        return 1
+    command = args[0]
+
+    if command == "info":
+        status, body = call("GET", "/info")
+        if status != 200:
+            return 1
+        print(f"Server Version: {body['ServerVersion']}")
+        return 0
+
+    if command == "network" and len(args) >= 3:
+        if args[1] == "inspect":
+            status, body = call("GET", f"/networks/{args[2]}")
+            if status != 200:
+                print(f"Error: No such network: {args[2]}", file=sys.stderr)
+                return 1
+            print(json.dumps([body]))
+            return 0
+        if args[1] == "create":
+            status, body = call("POST", "/networks/create", {"Name": args[2]})
+            if status >= 400:
+                print(f"Error: {body['message']}", file=sys.stderr)
+                return 1
+            print(body["Id"])
+            return 0
+
+    if command == "image" and args[1:2] == ["inspect"]:
+        for image in args[2:]:
+            status, _ = call("GET", f"/images/{image}/json")
+            if status != 200:
+                print(f"Error: No such image: {image}", file=sys.stderr)
+                return 1
+        return 0
+
+    if command == "pull" and len(args) >= 2:
+        image = args[-1]
+        status, body = call("POST", f"/images/create?fromImage={image}")
+        if status != 200:
+            print(f"Error response from daemon: {body['message']}", file=sys.stderr)
+            return 1
+        print(image if "--quiet" in args else body[-1]["status"])
+        return 0
+
+    if command == "inspect":
+        documents = []
+        for ref in args[1:]:
+            status, body = call("GET", f"/containers/{ref}/json")
+            if status != 200:
+                print(f"Error: No such object: {ref}", file=sys.stderr)
+                return 1
+            documents.append(body)
+        print(json.dumps(documents))
+        return 0
+
+    if command == "compose":
+        rest = args[1:]
+        project = Path.cwd().name.lower()
+        files = []
+        while rest and rest[0].startswith("-"):
+            option, value, rest = rest[0], rest[1], rest[2:]
+            if option == "-p":
+                project = value
+            elif option == "-f":
+                files.append(value)
+        if not rest or rest[0] not in COMPOSE_COMMANDS:
+            print(f"unsupported compose command: {' '.join(rest)}", file=sys.stderr)
+            return 1
+        status, body = call(
+            "POST",
+            "/_sim/compose",
+            {"project": project, "args": rest, "services": compose_services(Path.cwd(), files)},
+        )
+        if status != 200:
+            return 1
+        sys.stdout.write(body["stdout"])
+        if not os.environ.get("DOCKER_SIM_QUIET"):
+            sys.stderr.write(body["stderr"])
+        return body["exit_code"]
+
+    print(f"unsupported docker command: {' '.join(args)}", file=sys.stderr)
+    return 1
+
+
+def main(argv: list | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["client"]:
+        try:
+            return client(argv[1:])
+        except (OSError, ConnectionError) as e:
+            print(f"Cannot connect to the Docker daemon: {e}", file=sys.stderr)
+            return 1
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.docker_sim", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the simulated daemon")
+    serve.add_argument("--socket", required=True, help="Unix socket to listen on")
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    serve.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds")
+    serve.add_argument("--compose-latency", type=float, default=0.0, help="Seconds per container a compose command touches")
+    serve.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of compose commands that fail")
+    serve.add_argument("--api-error-rate", type=float, default=0.0, help="Fraction of API requests answered with a 500")
+    serve.add_argument("--fail-project", action="append", default=[], help="Glob of projects whose compose commands always fail")
+    serve.add_argument("--log-lines", type=int, default=20, help="Log lines per container")
+    serve.add_argument("--pull-latency", type=float, default=0.0, help="Seconds to pull each image layer")
+    serve.add_argument("--seed", type=int, default=None, help="Seed for reproducible jitter and failures")
+
+    shim = commands.add_parser("shim", help="Write a docker executable that talks to the simulator")
+    shim.add_argument("directory", type=Path)
+
+    args = parser.parse_args(argv)
+    if args.command == "shim":
+        print(write_shim(args.directory))
+        return 0
+
+    daemon = SimulatedDaemon(
+        latency=args.latency,
+        jitter=args.jitter,
+        compose_latency=args.compose_latency,
+        failure_rate=args.failure_rate,
+        api_error_rate=args.api_error_rate,
+        fail_projects=args.fail_project,
+        log_lines=args.log_lines,
+        pull_latency=args.pull_latency,
+        seed=args.seed,
+    )
+    server = create_server(args.socket, daemon)
+    print(f"Simulated Docker daemon listening on unix://{args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Stand-in for the `docker` CLI used by the benchmarks.
+
+Answers the commands the CLI runs (info, network, compose up/down/ps/logs)
+without a daemon. FAKE_DOCKER_LATENCY (seconds) is slept on every call to
+model the daemon round trip, so fan-out benchmarks measure concurrency rather
+than Docker itself.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def main(args: list) -> int:
+    time.sleep(float(os.environ.get("FAKE_DOCKER_LATENCY", "0")))
+
+    if not args:
+        return 1
+    if args[0] == "info":
+        print("Server Version: fake")
+        return 0
+    if args[0] == "network":
+        return 0
+    if args[0] == "inspect":
+        print(json.dumps([]))
+        return 0
+    if args[0] != "compose":
+        return 0
+
+    # docker compose -p <project> <command> ...
+    project = args[2] if len(args) > 2 and args[1] == "-p" else "fake"
+    command = args[3:] if args[1] == "-p" else args[1:]
+    if not command:
+        return 1
+    if command[0] == "ps":
+        if "--format" in command:
+            print(json.dumps([]))
+        return 0
+    if command[0] == "logs":
+        for i in range(int(os.environ.get("FAKE_DOCKER_LOG_LINES", "100"))):
+            print(f"{project}-app-1  | line {i}")
+        return 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
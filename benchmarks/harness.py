@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = ROOT / "templates"
+FAKE_RELEASE = {
+    "tag_name": "v99.0.0",
+    "prerelease": False,
+    "assets": [],
+}
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    """Serves /templates/<version>/<file> and the GitHub /releases endpoints."""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/templates/"):
+            template = TEMPLATES_DIR / path.rsplit("/", 1)[-1]
+            if not template.is_file() or template.suffix != ".yml":
+                return self.reply(404, b"not found", "text/plain")
+            return self.reply(200, template.read_bytes(), "text/yaml")
+        if path == "/releases/latest":
+            return self.reply(200, json.dumps(FAKE_RELEASE).encode(), "application/json")
+        if path == "/releases":
+            return self.reply(200, json.dumps([FAKE_RELEASE]).encode(), "application/json")
+        self.reply(404, b"not found", "text/plain")
+
+    def reply(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Sandbox:
+    """Throwaway HOME, a fake `docker` first on PATH and a local upstream server.
+
+    Must be entered before any `core` module is imported: their paths are
+    derived from HOME at import time.
+    """
+
+    def __init__(self):
+        self.root = Path(tempfile.mkdtemp(prefix="portabase-bench-"))
+        self.home = self.root / "home"
+        self.work = self.root / "work"
+        self.bin = self.root / "bin"
+        self.server = None
+        self.saved_env = dict(os.environ)
+        self.saved_cwd = os.getcwd()
+
+    def __enter__(self):
+        for path in (self.home, self.work, self.bin):
+            path.mkdir()
+
+        docker = self.bin / "docker"
+        docker.write_text(
+            f"#!/bin/sh\nexec {sys.executable} {ROOT / 'benchmarks' / 'fake_docker.py'} \"$@\"\n"
+        )
+        docker.chmod(0o755)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeUpstreamHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        os.environ.update(
+            {
+                "HOME": str(self.home),
+                "PATH": f"{self.bin}{os.pathsep}{os.environ.get('PATH', '')}",
+                # Not a unix socket: the CLI falls back to the fake binary.
+                "DOCKER_HOST": "tcp://127.0.0.1:1",
+                "PORTABASE_NO_UPDATE_CHECK": "1",
+                "FAKE_DOCKER_LATENCY": "0",
+            }
+        )
+        for var in ("HTTP_PROXY", "HTTPS_PROXY", "http_proxy", "https_proxy"):
+            os.environ.pop(var, None)
+        os.chdir(self.work)
+        return self
+
+    def __exit__(self, *exc):
+        os.chdir(self.saved_cwd)
+        os.environ.clear()
+        os.environ.update(self.saved_env)
+        if self.server is not None:
+            self.server.shutdown()
+        shutil.rmtree(self.root, ignore_errors=True)
+        return False
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fresh_dir(self, name: str) -> Path:
+        return Path(tempfile.mkdtemp(prefix=f"{name}-", dir=self.work))
+
+
+def measure(func, repeat: int, setup=None, warmup: bool = True) -> dict:
+    """Run `func` `repeat` times (after a warm-up call) and summarize wall times in ms."""
+    samples = []
+    for i in range(repeat + warmup):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state) if setup else func()
+        elapsed = (time.perf_counter() - start) * 1000
+        if i or not warmup:
+            samples.append(elapsed)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "repeat": repeat,
+    }
+
+
+def calibration_workload(path: Path):
+    """Fixed mix of what the cases spend their time on: interpreter start-up,
+    pure Python work and fsync'd writes."""
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    data = [{"name": f"db{i}", "type": "postgresql", "port": 5432 + i} for i in range(2000)]
+    for _ in range(10):
+        json.loads(json.dumps(data))
+    for i in range(10):
+        with open(path / f"calibration-{i}.json", "w") as f:
+            json.dump(data[:50], f)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def calibrate(sandbox: Sandbox) -> float:
+    """Median time of calibration_workload; results are compared relative to it."""
+    return measure(
+        calibration_workload, repeat=7, setup=lambda: sandbox.fresh_dir("calibration")
+    )["median_ms"]
@@ -0,0 +1,136 @@
+"""Run the CLI benchmarks offline and compare them with the stored baseline.
+
+    python -m benchmarks.run                 # run everything, compare with baseline.json
+    python -m benchmarks.run -k compose      # only cases whose name contains "compose"
+    python -m benchmarks.run --save          # record the results as the new baseline
+
+Timings depend on the machine and its load, so every run also times a fixed
+calibration workload and the baseline is scaled by the ratio between this
+run's calibration and the stored one before comparing.
+"""
+
+import argparse
+import fnmatch
+import json
+import platform
+import sys
+from pathlib import Path
+
+from benchmarks.harness import ROOT, Sandbox, calibrate
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+# Slower than the baseline by more than this fraction (and MIN_DELTA_MS) fails the run.
+THRESHOLD = 0.25
+MIN_DELTA_MS = 2.0
+
+
+def load_baseline() -> dict:
+    try:
+        with open(BASELINE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def host_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": f"{platform.system()}-{platform.machine()}",
+    }
+
+
+def baseline_scale(baseline: dict, calibration_ms: float) -> float:
+    """Factor bringing the stored timings to this run's machine speed."""
+    before = baseline.get("calibration_ms")
+    if not before:
+        print("warning: the baseline has no calibration, comparing raw timings")
+        return 1.0
+    stored_host = {key: baseline.get(key) for key in host_info()}
+    if stored_host != host_info():
+        print(
+            f"warning: baseline recorded on {stored_host['platform']} / Python {stored_host['python']}, "
+            "scaled comparisons across hosts are approximate"
+        )
+    return calibration_ms / before
+
+
+def compare(results: dict, baseline: dict, threshold: float, scale: float) -> list:
+    regressions = []
+    print(f"\n{'case':<36} {'median ms':>10} {'baseline':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name, {}).get("median_ms")
+        median = result["median_ms"]
+        if before is None:
+            print(f"{name:<36} {median:>10.2f} {'-':>10} {'new':>8}")
+            continue
+        before *= scale
+        change = (median - before) / before if before else 0
+        flag = ""
+        if change > threshold and median - before > MIN_DELTA_MS:
+            regressions.append(name)
+            flag = "  << regression"
+        print(f"{name:<36} {median:>10.2f} {before:>10.2f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", default="*", help="Glob or substring of case names to run")
+    parser.add_argument("--save", action="store_true", help="Write the results to baseline.json")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    pattern = args.filter if any(c in args.filter for c in "*?[") else f"*{args.filter}*"
+
+    results = {}
+    with Sandbox() as sandbox:
+        from benchmarks.cases import CASES
+
+        # Before and after the cases, to average out load changing during the run.
+        calibration = [calibrate(sandbox)]
+        for name, case in CASES.items():
+            if not fnmatch.fnmatchcase(name, pattern):
+                continue
+            print(f"running {name}...", flush=True)
+            results[name] = case(sandbox)
+        calibration.append(calibrate(sandbox))
+    calibration_ms = round(sum(calibration) / len(calibration), 3)
+    print(f"calibration: {calibration_ms:.2f} ms")
+
+    baseline = load_baseline()
+    scale = baseline_scale(baseline, calibration_ms)
+    regressions = compare(results, baseline, args.threshold, scale)
+
+    if args.save:
+        # Cases that were not re-run keep their timing, expressed at this run's speed.
+        merged = {
+            name: {
+                key: round(value * scale, 3) if key.endswith("_ms") else value
+                for key, value in result.items()
+            }
+            for name, result in baseline.get("results", {}).items()
+        }
+        merged.update(results)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(
+                {
+                    **host_info(),
+                    "calibration_ms": calibration_ms,
+                    "results": dict(sorted(merged.items())),
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        print(f"\nBaseline written to {BASELINE_FILE.relative_to(ROOT)}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,3 @@
-import os
 import secrets
 import uuid
 from pathlib import Path
@@ -10,44 +9,169 @@ from rich.panel import Panel
 from rich.prompt import Confirm, IntPrompt, Prompt
 from rich.table import Table
 
-from core.config import add_db_to_json, load_db_config, write_env_file, write_file
+from core.compose import ComposeFile
+from core.config import (
+    add_dbs_to_json,
+    load_db_config,
+    register_component,
+    write_env_file,
+    write_file,
+)
 from core.docker import ensure_network, run_compose
+from core.images import ensure_compose_images, ensure_image, prepull_images
 from core.network import fetch_template
+from core.ports import allocate_port, release_ports_on_abort
+from core.speculative import Speculation
 from core.utils import (
+    DOCKER_PROBE_WAIT,
     check_system,
     console,
+    current_version,
+    docker_is_alive,
     generate_password,
-    get_free_port,
     get_random_hint,
     print_banner,
     questionary_style,
     validate_edge_key,
 )
 from templates.compose import (
-    AGENT_FIREBIRD_SNIPPET,
-    AGENT_MARIADB_SNIPPET,
-    AGENT_MONGODB_AUTH_SNIPPET,
-    AGENT_MONGODB_SNIPPET,
-    AGENT_MSSQL_SNIPPET,
-    AGENT_POSTGRES_SNIPPET,
-    AGENT_REDIS_AUTH_SNIPPET,
-    AGENT_REDIS_SNIPPET,
-    AGENT_VALKEY_AUTH_SNIPPET,
-    AGENT_VALKEY_SNIPPET,
+    DATABASE_ENGINES,
+    DEFAULT_PORTS,
+    ENV_PLACEHOLDERS,
+    render_service,
 )
 
+def build_local_database(
+    db_engine: str, db_variant: str = "no-auth", port: int | None = None, owner: str = ""
+) -> dict:
+    """Generate credentials, compose service and config entry for a new container."""
+    if (db_engine, db_variant) not in DATABASE_ENGINES:
+        db_variant = "no-auth"
+    spec = DATABASE_ENGINES[(db_engine, db_variant)]
+    service_name = f"db-{spec['service']}-{secrets.token_hex(2)}"
+    var_prefix = service_name.upper().replace("-", "_")
+    port = port or allocate_port(owner)
+
+    db_name = spec["db_name"].format(token=secrets.token_hex(4))
+    db_user = spec.get("user", "")
+    generated = {
+        "PORT": str(port),
+        "DB": db_name,
+        "USER": db_user,
+        "PASS": generate_password(16),
+        "ROOT_PASS": generate_password(16),
+    }
+    env_vars = {}
+    params = {"SERVICE_NAME": service_name, "VOL_NAME": f"{service_name}-data"}
+    for suffix in ("PORT", *spec["env"]):
+        env_vars[f"{var_prefix}_{suffix}"] = generated[suffix]
+        params[ENV_PLACEHOLDERS[suffix]] = f"${{{var_prefix}_{suffix}}}"
+
+    return {
+        "service_name": service_name,
+        "service": render_service(spec, params),
+        "volume": f"{service_name}-data",
+        "env_vars": env_vars,
+        "port": port,
+        "label": spec["label"],
+        "entry": {
+            "name": spec.get("entry_name", db_name),
+            "database": spec.get("database", "{db_name}").format(db_name=db_name),
+            "type": db_engine,
+            "username": spec.get("entry_user", db_user),
+            "password": generated["PASS"] if "PASS" in spec["env"] else "",
+            "port": spec["port"],
+            "host": service_name,
+            "generated_id": str(uuid.uuid4()),
+        },
+    }
+
+
+def render_agent_compose(
+    raw_template: str,
+    extra_services: dict,
+    volumes_list: list,
+    app_volumes: list,
+    add_host_gateway: bool,
+) -> str:
+    compose = ComposeFile.from_string(raw_template)
+    agent_service = compose.agent_service()
+
+    for service_name, definition in extra_services.items():
+        compose.add_service(service_name, definition)
+    for vol in volumes_list:
+        compose.add_volume(vol)
+    for mount in app_volumes:
+        compose.add_mount(mount, agent_service)
+
+    if add_host_gateway:
+        compose.add_extra_host("localhost:host-gateway", agent_service)
+    return compose.to_string()
+
 
 def agent(
-    name: str = typer.Argument(..., help="Name of the agent (creates a folder)"),
+    name: Optional[str] = typer.Argument(
+        None, help="Name of the agent (creates a folder)"
+    ),
     key: Optional[str] = typer.Option(None, "--key", "-k", help="Edge Key"),
     tz: str = typer.Option("UTC", "--tz", help="Timezone"),
     polling: int = typer.Option(5, "--polling", help="Polling frequency in seconds"),
     start: bool = typer.Option(False, "--start", "-s", help="Start immediately"),
+    offline: bool = typer.Option(
+        False, "--offline", help="Only use cached templates, never the network"
+    ),
+    refresh_template: bool = typer.Option(
+        False, "--refresh-template", help="Download the latest template first"
+    ),
+    from_file: Optional[Path] = typer.Option(
+        None, "--from-file", help="Provision agents non-interactively from a YAML file"
+    ),
+    parallel: int = typer.Option(
+        4, "--parallel", help="Number of agents provisioned at once with --from-file"
+    ),
 ):
+    if from_file:
+        from commands.fleet import provision_fleet
+
+        provision_fleet(
+            from_file,
+            parallel=parallel,
+            start=start,
+            offline=offline,
+            refresh_template=refresh_template,
+        )
+        return
+
+    if not name:
+        console.print("[danger]✖ Agent name is required (or use --from-file).[/danger]")
+        raise typer.Exit(1)
 
     print_banner()
-    check_system()
-    ensure_network("portabase_network")
+
+    # Docker checks, the template and image pulls run while the questions
+    # below are answered, and are joined where their results are needed.
+    speculation = Speculation()
+    speculation.start("docker", docker_is_alive)
+
+    def prepare_network() -> bool:
+        if not speculation.join("docker"):
+            return False
+        # Runs under the prompts: the docker CLI must not print its errors.
+        ensure_network("portabase_network", quiet=True)
+        return True
+
+    speculation.start("network", prepare_network)
+    speculation.start(
+        "template", fetch_template, "agent.yml", offline=offline, refresh=refresh_template, quiet=True
+    )
+    if start:
+        speculation.start(
+            "pull:template",
+            lambda: ensure_compose_images(speculation.join("template") or ""),
+        )
+    # A stopped daemon is reported before any question; a slow probe keeps running.
+    if speculation.peek("docker", DOCKER_PROBE_WAIT) is False:
+        check_system()
 
     path = Path(name).resolve()
     if path.exists():
@@ -57,792 +181,374 @@ def agent(
 
     path.mkdir(parents=True, exist_ok=True)
 
-    if not key:
-        key = Prompt.ask("[key]Edge Key[/key]")
-
-    if not validate_edge_key(key):
-        console.print(
-            "[danger]✖ Invalid Edge Key. Please check the format (Base64 or JSON).[/danger]"
-        )
-        raise typer.Exit(1)
-
-    if not tz or tz == "UTC":
-        tz = Prompt.ask("Timezone", default="UTC")
-
-    if polling == 5:
-        polling = IntPrompt.ask("Polling frequency (seconds)", default=5)
-
-    add_host_gateway = Confirm.ask(
-        "Add extra_hosts mapping (localhost -> host-gateway)?", default=False
-    )
-
-    raw_template = fetch_template("agent.yml")
-
-    if "{{EXTRA_SERVICES}}" not in raw_template:
-        if "\nnetworks:" in raw_template:
-            raw_template = raw_template.replace(
-                "\nnetworks:", "\n\n{{EXTRA_SERVICES}}\n\nnetworks:"
-            )
-        else:
-            raw_template += "\n\n{{EXTRA_SERVICES}}\n"
+    # Until the .env holds them, leased ports would stay reserved for PORT_LEASE_TTL.
+    with release_ports_on_abort(str(path)):
+        if not key:
+            key = Prompt.ask("[key]Edge Key[/key]")
 
-    if "{{EXTRA_VOLUMES}}" not in raw_template:
-        if "\nnetworks:" in raw_template:
-            raw_template = raw_template.replace(
-                "\nnetworks:", "\n\n{{EXTRA_VOLUMES}}\n\nnetworks:"
-            )
-        else:
-            raw_template += "\n\n{{EXTRA_VOLUMES}}\n"
-
-    env_vars = {
-        "EDGE_KEY": key,
-        "TZ": tz,
-        "POLLING": str(polling),
-        "LOG_LEVEL": "info",
-    }
-
-    extra_services = ""
-    extra_volumes = ""
-    app_volumes = ["./databases.json:/config/config.json"]
-    volumes_list = []
-
-    json_path = path / "databases.json"
-    if not json_path.exists():
-        write_file(json_path, '{"databases": []}')
-        try:
-            os.chmod(json_path, 0o666)
-        except:
-            pass
-
-    console.print("")
-    console.print(Panel("[bold]Database Setup[/bold]", style="cyan"))
-
-    while True:
-        storage_kind = questionary.select(
-            "What do you want to configure?",
-            choices=["done", "database", "docker-volume"],
-            default="database",
-            style=questionary_style,
-        ).ask()
-
-        if storage_kind in (None, "done"):
-            break
-
-        if storage_kind == "docker-volume":
+        if not validate_edge_key(key):
             console.print(
-                "[warning]⚠ Requires the Docker socket. It will be mounted "
-                "on the agent ([bold]/var/run/docker.sock[/bold]).[/warning]"
-            )
-            friendly_name = Prompt.ask("Display Name", default="Docker Volume")
-            volume_name = Prompt.ask("Volume Name (e.g. databases_sqlite-data)").strip()
-            while not volume_name:
-                console.print("[danger]✖ Volume Name is required.[/danger]")
-                volume_name = Prompt.ask(
-                    "Volume Name (e.g. databases_sqlite-data)"
-                ).strip()
-            container_name = Prompt.ask(
-                "Container Name (optional, enables auto-restart after restore)",
-                default="",
+                "[danger]✖ Invalid Edge Key. Please check the format (Base64 or JSON).[/danger]"
             )
-            dv_entry = {
-                "name": friendly_name,
-                "type": "docker-volume",
-                "volume_name": volume_name,
-                "generated_id": str(uuid.uuid4()),
-            }
-            if container_name:
-                dv_entry["container_name"] = container_name
-
-            sock_mount = "/var/run/docker.sock:/var/run/docker.sock"
-            if sock_mount not in app_volumes:
-                app_volumes.append(sock_mount)
-
-            add_db_to_json(path, dv_entry)
-            console.print("[success]✔ Added to config[/success]")
-            continue
+            raise typer.Exit(1)
 
-        while True:
-            mode = Prompt.ask(
-                "Configuration Mode", choices=["new", "existing", "back"], default="new"
-            )
+        if not tz or tz == "UTC":
+            tz = Prompt.ask("Timezone", default="UTC")
 
-            if mode == "back":
-                break
+        if polling == 5:
+            polling = IntPrompt.ask("Polling frequency (seconds)", default=5)
 
-            if mode == "existing":
-                console.print("[info]External/Existing Database Configuration[/info]")
-                db_type = questionary.select(
-                    "Select Database Type",
-                    choices=[
-                        "back",
-                        "postgresql",
-                        "postgresql-cluster",
-                        "mysql",
-                        "mariadb",
-                        "sqlite",
-                        "firebird",
-                        "mongodb",
-                        "redis",
-                        "valkey",
-                        "mssql",
-                    ],
-                    style=questionary_style,
-                ).ask()
-
-                if db_type == "back":
-                    continue
-
-                if not db_type:
-                    raise typer.Exit()
-
-                if db_type == "postgresql-cluster":
-                    console.print(
-                        "[warning]⚠ Postgres Cluster requires a superuser. "
-                        "Cluster backup/restore uses pg_dumpall, which dumps all "
-                        "databases and global objects (roles, tablespaces). "
-                        "The provided user must be a Postgres superuser.[/warning]"
-                    )
+        add_host_gateway = Confirm.ask(
+            "Add extra_hosts mapping (localhost -> host-gateway)?", default=False
+        )
 
-                friendly_name = Prompt.ask("Display Name", default="External DB")
+        env_vars = {
+            "EDGE_KEY": key,
+            "TZ": tz,
+            "POLLING": str(polling),
+            "LOG_LEVEL": "info",
+        }
 
-                if db_type == "sqlite":
-                    db_name = Prompt.ask("Database Path (relative or absolute)")
-                    if not db_name.startswith("/"):
-                        app_volumes.append(f"./{db_name}:/config/{db_name}")
-                        container_path = f"/config/{db_name}"
-                    else:
-                        container_path = db_name
+        extra_services = {}
+        app_volumes = ["./databases.json:/config/config.json"]
+        volumes_list = []
 
-                    add_db_to_json(
-                        path,
-                        {
-                            "name": friendly_name,
-                            "database": container_path,
-                            "type": db_type,
-                            "generated_id": str(uuid.uuid4()),
-                        },
-                    )
-                else:
-                    db_name = Prompt.ask("Database Name")
-                    host = Prompt.ask("Host", default="localhost")
-                    port = IntPrompt.ask(
-                        "Port",
-                        default=5432
-                        if db_type in ["postgresql", "postgresql-cluster"]
-                        else (
-                            3050
-                            if db_type == "firebird"
-                            else (
-                                1433
-                                if db_type == "mssql"
-                                else (
-                                    3306 if db_type in ["mysql", "mariadb"] else 27017
-                                )
-                            )
-                        ),
-                    )
-                    user = Prompt.ask("Username")
-                    password = questionary.password(
-                        "Password", style=questionary_style
-                    ).ask()
-                    if password is None:
-                        raise typer.Exit()
+        # Collected during the wizard and written to databases.json in one go once confirmed.
+        db_entries = []
 
-                    ext_entry = {
-                        "name": friendly_name,
-                        "database": db_name,
-                        "type": db_type,
-                        "username": user,
-                        "password": password,
-                        "port": port,
-                        "host": host,
-                        "generated_id": str(uuid.uuid4()),
-                    }
-                    if db_type == "postgresql":
-                        console.print(
-                            "[info]ℹ When enabled, omits [bold]--no-owner[/bold] and "
-                            "[bold]--no-privileges[/bold] from the dump. Ownership and role "
-                            "assignments are preserved in the output. By default, these flags "
-                            "are applied to keep restores portable across different users and "
-                            "environments, for example when migrating from one database "
-                            "instance to another.[/info]"
-                        )
-
-                        keep_ownership = Confirm.ask("Keep ownership?", default=False)
+        console.print("")
+        console.print(Panel("[bold]Database Setup[/bold]", style="cyan"))
 
-                        if keep_ownership is None:
-                            raise typer.Exit()
-                        if keep_ownership:
-                            ext_entry["options"] = {"keep_ownership": True}
+        while True:
+            storage_kind = questionary.select(
+                "What do you want to configure?",
+                choices=["done", "database", "docker-volume"],
+                default="database",
+                style=questionary_style,
+            ).ask()
+
+            if storage_kind in (None, "done"):
+                break
 
-                    add_db_to_json(path, ext_entry)
+            if storage_kind == "docker-volume":
+                console.print(
+                    "[warning]⚠ Requires the Docker socket. It will be mounted "
+                    "on the agent ([bold]/var/run/docker.sock[/bold]).[/warning]"
+                )
+                friendly_name = Prompt.ask("Display Name", default="Docker Volume")
+                volume_name = Prompt.ask("Volume Name (e.g. databases_sqlite-data)").strip()
+                while not volume_name:
+                    console.print("[danger]✖ Volume Name is required.[/danger]")
+                    volume_name = Prompt.ask(
+                        "Volume Name (e.g. databases_sqlite-data)"
+                    ).strip()
+                container_name = Prompt.ask(
+                    "Container Name (optional, enables auto-restart after restore)",
+                    default="",
+                )
+                dv_entry = {
+                    "name": friendly_name,
+                    "type": "docker-volume",
+                    "volume_name": volume_name,
+                    "generated_id": str(uuid.uuid4()),
+                }
+                if container_name:
+                    dv_entry["container_name"] = container_name
+
+                sock_mount = "/var/run/docker.sock:/var/run/docker.sock"
+                if sock_mount not in app_volumes:
+                    app_volumes.append(sock_mount)
+
+                db_entries.append(dv_entry)
                 console.print("[success]✔ Added to config[/success]")
-                break
+                continue
 
-            else:
-                console.print("[info]New Local Docker Container[/info]")
-                db_engine = questionary.select(
-                    "Select Database Engine",
-                    choices=[
-                        "back",
-                        "postgresql",
-                        "postgresql-cluster",
-                        "mysql",
-                        "mariadb",
-                        "sqlite",
-                        "firebird",
-                        "mongodb",
-                        "redis",
-                        "valkey",
-                        "mssql",
-                    ],
-                    style=questionary_style,
-                ).ask()
-
-                if db_engine == "back":
-                    continue
-
-                if not db_engine:
-                    raise typer.Exit()
-
-                db_variant = "no-auth"
-                if db_engine in ["mongodb", "redis", "valkey"]:
-                    engine_display = {
-                        "mongodb": "MongoDB",
-                        "redis": "Redis",
-                        "valkey": "Valkey",
-                    }[db_engine]
-                    db_variant = questionary.select(
-                        f"Select {engine_display} Variant",
-                        choices=["back", "no-auth", "with-auth"],
+            while True:
+                mode = Prompt.ask(
+                    "Configuration Mode", choices=["new", "existing", "back"], default="new"
+                )
+
+                if mode == "back":
+                    break
+
+                if mode == "existing":
+                    console.print("[info]External/Existing Database Configuration[/info]")
+                    db_type = questionary.select(
+                        "Select Database Type",
+                        choices=[
+                            "back",
+                            "postgresql",
+                            "postgresql-cluster",
+                            "mysql",
+                            "mariadb",
+                            "sqlite",
+                            "firebird",
+                            "mongodb",
+                            "redis",
+                            "valkey",
+                            "mssql",
+                        ],
                         style=questionary_style,
                     ).ask()
 
-                    if db_variant == "back":
+                    if db_type == "back":
                         continue
 
-                    if not db_variant:
+                    if not db_type:
                         raise typer.Exit()
 
-                if db_engine == "sqlite":
-                    db_name = Prompt.ask("Database Name", default="local")
-                    if not db_name.endswith(".sqlite"):
-                        db_name += ".sqlite"
-
-                    app_volumes.append(f"./{db_name}:/config/{db_name}")
-
-                    add_db_to_json(
-                        path,
-                        {
-                            "name": db_name,
-                            "database": f"/config/{db_name}",
-                            "type": "sqlite",
-                            "generated_id": str(uuid.uuid4()),
-                        },
-                    )
-                    console.print(
-                        f"[success]✔ Added SQLite database ({db_name})[/success]"
-                    )
-
-                elif db_engine in ["postgresql", "postgresql-cluster"]:
-                    pg_port = get_free_port()
-                    db_user = "admin"
-                    db_pass = generate_password(16)
-                    db_name = f"pg_{secrets.token_hex(4)}"
-                    service_name = f"db-pg-{secrets.token_hex(2)}"
-
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(pg_port)
-                    env_vars[f"{var_prefix}_DB"] = db_name
-                    env_vars[f"{var_prefix}_USER"] = db_user
-                    env_vars[f"{var_prefix}_PASS"] = db_pass
-
-                    snippet = (
-                        AGENT_POSTGRES_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                        .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                        .replace("${USER}", f"${{{var_prefix}_USER}}")
-                        .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                    )
-
-                    extra_services += snippet
-                    volumes_list.append(f"{service_name}-data")
-
-                    pg_entry = {
-                        "name": db_name,
-                        "database": db_name,
-                        "type": db_engine,
-                        "username": db_user,
-                        "password": db_pass,
-                        "port": 5432,
-                        "host": service_name,
-                        "generated_id": str(uuid.uuid4()),
-                    }
-                    if db_engine == "postgresql":
+                    if db_type == "postgresql-cluster":
                         console.print(
-                            "[info]ℹ When enabled, omits [bold]--no-owner[/bold] and "
-                            "[bold]--no-privileges[/bold] from the dump. Ownership and role "
-                            "assignments are preserved in the output. By default, these flags "
-                            "are applied to keep restores portable across different users and "
-                            "environments, for example when migrating from one database "
-                            "instance to another.[/info]"
+                            "[warning]⚠ Postgres Cluster requires a superuser. "
+                            "Cluster backup/restore uses pg_dumpall, which dumps all "
+                            "databases and global objects (roles, tablespaces). "
+                            "The provided user must be a Postgres superuser.[/warning]"
                         )
-                        keep_ownership = Confirm.ask("Keep ownership?", default=False)
-
-                        if keep_ownership is None:
-                            raise typer.Exit()
-                        if keep_ownership:
-                            pg_entry["options"] = {"keep_ownership": True}
 
-                    add_db_to_json(path, pg_entry)
+                    friendly_name = Prompt.ask("Display Name", default="External DB")
 
-                    label = (
-                        "Postgres Cluster"
-                        if db_engine == "postgresql-cluster"
-                        else "Postgres"
-                    )
-                    console.print(
-                        f"[success]✔ Added {label} container (Port {pg_port})[/success]"
-                    )
+                    if db_type == "sqlite":
+                        db_name = Prompt.ask("Database Path (relative or absolute)")
+                        if not db_name.startswith("/"):
+                            app_volumes.append(f"./{db_name}:/config/{db_name}")
+                            container_path = f"/config/{db_name}"
+                        else:
+                            container_path = db_name
 
-                elif db_engine == "mariadb" or db_engine == "mysql":
-                    mysql_port = get_free_port()
-                    db_user = "admin"
-                    db_pass = generate_password(16)
-                    db_name = f"mysql_{secrets.token_hex(4)}"
-                    service_name = f"db-mariadb-{secrets.token_hex(2)}"
-
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(mysql_port)
-                    env_vars[f"{var_prefix}_DB"] = db_name
-                    env_vars[f"{var_prefix}_USER"] = db_user
-                    env_vars[f"{var_prefix}_PASS"] = db_pass
-
-                    snippet = (
-                        AGENT_MARIADB_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                        .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                        .replace("${USER}", f"${{{var_prefix}_USER}}")
-                        .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                    )
-
-                    extra_services += snippet
-                    volumes_list.append(f"{service_name}-data")
-
-                    add_db_to_json(
-                        path,
-                        {
-                            "name": db_name,
-                            "database": db_name,
-                            "type": db_engine,
-                            "username": db_user,
-                            "password": db_pass,
-                            "port": 3306,
-                            "host": service_name,
-                            "generated_id": str(uuid.uuid4()),
-                        },
-                    )
-                    console.print(
-                        f"[success]✔ Added MariaDB container (Port {mysql_port})[/success]"
-                    )
-
-                elif db_engine == "mongodb":
-                    if db_variant == "with-auth":
-                        mongo_port = get_free_port()
-                        db_user = "admin"
-                        db_pass = generate_password(16)
-                        db_name = f"mongo_{secrets.token_hex(4)}"
-                        service_name = f"db-mongo-auth-{secrets.token_hex(2)}"
-
-                        var_prefix = service_name.upper().replace("-", "_")
-                        env_vars[f"{var_prefix}_PORT"] = str(mongo_port)
-                        env_vars[f"{var_prefix}_DB"] = db_name
-                        env_vars[f"{var_prefix}_USER"] = db_user
-                        env_vars[f"{var_prefix}_PASS"] = db_pass
-
-                        snippet = (
-                            AGENT_MONGODB_AUTH_SNIPPET.replace(
-                                "${SERVICE_NAME}", service_name
-                            )
-                            .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                            .replace("${VOL_NAME}", f"{service_name}-data")
-                            .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                            .replace("${USER}", f"${{{var_prefix}_USER}}")
-                            .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                        )
-
-                        extra_services += snippet
-                        volumes_list.append(f"{service_name}-data")
-
-                        add_db_to_json(
-                            path,
+                        db_entries.append(
                             {
-                                "name": db_name,
-                                "database": db_name,
-                                "type": "mongodb",
-                                "username": db_user,
-                                "password": db_pass,
-                                "port": 27017,
-                                "host": service_name,
+                                "name": friendly_name,
+                                "database": container_path,
+                                "type": db_type,
                                 "generated_id": str(uuid.uuid4()),
-                            },
-                        )
-                        console.print(
-                            f"[success]✔ Added MongoDB Auth container (Port {mongo_port})[/success]"
+                            }
                         )
                     else:
-                        mongo_port = get_free_port()
-                        db_name = f"mongo_{secrets.token_hex(4)}"
-                        service_name = f"db-mongo-{secrets.token_hex(2)}"
-
-                        var_prefix = service_name.upper().replace("-", "_")
-                        env_vars[f"{var_prefix}_PORT"] = str(mongo_port)
-                        env_vars[f"{var_prefix}_DB"] = db_name
-
-                        snippet = (
-                            AGENT_MONGODB_SNIPPET.replace(
-                                "${SERVICE_NAME}", service_name
-                            )
-                            .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                            .replace("${VOL_NAME}", f"{service_name}-data")
-                            .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                        )
-                        extra_services += snippet
-                        volumes_list.append(f"{service_name}-data")
-
-                        add_db_to_json(
-                            path,
-                            {
-                                "name": db_name,
-                                "database": db_name,
-                                "type": "mongodb",
-                                "username": "",
-                                "password": "",
-                                "port": 27017,
-                                "host": service_name,
-                                "generated_id": str(uuid.uuid4()),
-                            },
-                        )
-
-                        console.print(
-                            f"[success]✔ Added MongoDB container (Port {mongo_port})[/success]"
+                        db_name = Prompt.ask("Database Name")
+                        host = Prompt.ask("Host", default="localhost")
+                        port = IntPrompt.ask(
+                            "Port",
+                            default=DEFAULT_PORTS.get(db_type, 27017),
                         )
+                        user = Prompt.ask("Username")
+                        password = questionary.password(
+                            "Password", style=questionary_style
+                        ).ask()
+                        if password is None:
+                            raise typer.Exit()
 
-                elif db_engine == "redis":
-                    if db_variant == "with-auth":
-                        redis_port = get_free_port()
-                        db_name = f"redis_{secrets.token_hex(4)}"
-                        service_name = f"db-redis-auth-{secrets.token_hex(2)}"
-                        db_pass = generate_password(16)
-
-                        var_prefix = service_name.upper().replace("-", "_")
-                        env_vars[f"{var_prefix}_PORT"] = str(redis_port)
-                        env_vars[f"{var_prefix}_PASS"] = db_pass
-
-                        snippet = (
-                            AGENT_REDIS_AUTH_SNIPPET.replace(
-                                "${SERVICE_NAME}", service_name
+                        ext_entry = {
+                            "name": friendly_name,
+                            "database": db_name,
+                            "type": db_type,
+                            "username": user,
+                            "password": password,
+                            "port": port,
+                            "host": host,
+                            "generated_id": str(uuid.uuid4()),
+                        }
+                        if db_type == "postgresql":
+                            console.print(
+                                "[info]ℹ When enabled, omits [bold]--no-owner[/bold] and "
+                                "[bold]--no-privileges[/bold] from the dump. Ownership and role "
+                                "assignments are preserved in the output. By default, these flags "
+                                "are applied to keep restores portable across different users and "
+                                "environments, for example when migrating from one database "
+                                "instance to another.[/info]"
                             )
-                            .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                            .replace("${VOL_NAME}", f"{service_name}-data")
-                            .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                        )
-
-                        extra_services += snippet
-                        volumes_list.append(f"{service_name}-data")
 
-                        add_db_to_json(
-                            path,
-                            {
-                                "name": db_name,
-                                "database": "0",
-                                "type": "redis",
-                                "username": "",
-                                "password": db_pass,
-                                "port": 6379,
-                                "host": service_name,
-                                "generated_id": str(uuid.uuid4()),
-                            },
-                        )
-                        console.print(
-                            f"[success]✔ Added Redis Auth container (Port {redis_port})[/success]"
-                        )
-                    else:
-                        redis_port = get_free_port()
-                        db_name = f"redis_{secrets.token_hex(4)}"
-                        service_name = f"db-redis-{secrets.token_hex(2)}"
+                            keep_ownership = Confirm.ask("Keep ownership?", default=False)
 
-                        var_prefix = service_name.upper().replace("-", "_")
-                        env_vars[f"{var_prefix}_PORT"] = str(redis_port)
+                            if keep_ownership is None:
+                                raise typer.Exit()
+                            if keep_ownership:
+                                ext_entry["options"] = {"keep_ownership": True}
 
-                        snippet = (
-                            AGENT_REDIS_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                            .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                            .replace("${VOL_NAME}", f"{service_name}-data")
-                        )
+                        db_entries.append(ext_entry)
+                    console.print("[success]✔ Added to config[/success]")
+                    break
 
-                        extra_services += snippet
-                        volumes_list.append(f"{service_name}-data")
+                else:
+                    console.print("[info]New Local Docker Container[/info]")
+                    db_engine = questionary.select(
+                        "Select Database Engine",
+                        choices=[
+                            "back",
+                            "postgresql",
+                            "postgresql-cluster",
+                            "mysql",
+                            "mariadb",
+                            "sqlite",
+                            "firebird",
+                            "mongodb",
+                            "redis",
+                            "valkey",
+                            "mssql",
+                        ],
+                        style=questionary_style,
+                    ).ask()
 
-                        add_db_to_json(
-                            path,
-                            {
-                                "name": db_name,
-                                "database": "0",
-                                "type": "redis",
-                                "username": "",
-                                "password": "",
-                                "port": 6379,
-                                "host": service_name,
-                                "generated_id": str(uuid.uuid4()),
-                            },
-                        )
-                        console.print(
-                            f"[success]✔ Added Redis container (Port {redis_port})[/success]"
-                        )
+                    if db_engine == "back":
+                        continue
 
-                elif db_engine == "valkey":
-                    if db_variant == "with-auth":
-                        valkey_port = get_free_port()
-                        db_name = f"valkey_{secrets.token_hex(4)}"
-                        service_name = f"db-valkey-auth-{secrets.token_hex(2)}"
-                        db_pass = generate_password(16)
+                    if not db_engine:
+                        raise typer.Exit()
 
-                        var_prefix = service_name.upper().replace("-", "_")
-                        env_vars[f"{var_prefix}_PORT"] = str(valkey_port)
-                        env_vars[f"{var_prefix}_PASS"] = db_pass
+                    db_variant = "no-auth"
+                    if db_engine in ["mongodb", "redis", "valkey"]:
+                        engine_display = {
+                            "mongodb": "MongoDB",
+                            "redis": "Redis",
+                            "valkey": "Valkey",
+                        }[db_engine]
+                        db_variant = questionary.select(
+                            f"Select {engine_display} Variant",
+                            choices=["back", "no-auth", "with-auth"],
+                            style=questionary_style,
+                        ).ask()
+
+                        if db_variant == "back":
+                            continue
+
+                        if not db_variant:
+                            raise typer.Exit()
 
-                        snippet = (
-                            AGENT_VALKEY_AUTH_SNIPPET.replace(
-                                "${SERVICE_NAME}", service_name
-                            )
-                            .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                            .replace("${VOL_NAME}", f"{service_name}-data")
-                            .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                        )
+                    if db_engine == "sqlite":
+                        db_name = Prompt.ask("Database Name", default="local")
+                        if not db_name.endswith(".sqlite"):
+                            db_name += ".sqlite"
 
-                        extra_services += snippet
-                        volumes_list.append(f"{service_name}-data")
+                        app_volumes.append(f"./{db_name}:/config/{db_name}")
 
-                        add_db_to_json(
-                            path,
+                        db_entries.append(
                             {
                                 "name": db_name,
-                                "database": "0",
-                                "type": "valkey",
-                                "username": "",
-                                "password": db_pass,
-                                "port": 6379,
-                                "host": service_name,
+                                "database": f"/config/{db_name}",
+                                "type": "sqlite",
                                 "generated_id": str(uuid.uuid4()),
-                            },
+                            }
                         )
                         console.print(
-                            f"[success]✔ Added Valkey Auth container (Port {valkey_port})[/success]"
+                            f"[success]✔ Added SQLite database ({db_name})[/success]"
                         )
-                    else:
-                        valkey_port = get_free_port()
-                        db_name = f"valkey_{secrets.token_hex(4)}"
-                        service_name = f"db-valkey-{secrets.token_hex(2)}"
 
-                        var_prefix = service_name.upper().replace("-", "_")
-                        env_vars[f"{var_prefix}_PORT"] = str(valkey_port)
-
-                        snippet = (
-                            AGENT_VALKEY_SNIPPET.replace(
-                                "${SERVICE_NAME}", service_name
+                    else:
+                        local_db = build_local_database(db_engine, db_variant, owner=str(path))
+                        if start:
+                            image = local_db["service"]["image"]
+                            speculation.start(f"pull:{image}", ensure_image, image)
+
+                        if db_engine == "postgresql":
+                            console.print(
+                                "[info]ℹ When enabled, omits [bold]--no-owner[/bold] and "
+                                "[bold]--no-privileges[/bold] from the dump. Ownership and role "
+                                "assignments are preserved in the output. By default, these flags "
+                                "are applied to keep restores portable across different users and "
+                                "environments, for example when migrating from one database "
+                                "instance to another.[/info]"
                             )
-                            .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                            .replace("${VOL_NAME}", f"{service_name}-data")
-                        )
+                            keep_ownership = Confirm.ask("Keep ownership?", default=False)
 
-                        extra_services += snippet
-                        volumes_list.append(f"{service_name}-data")
+                            if keep_ownership is None:
+                                raise typer.Exit()
+                            if keep_ownership:
+                                local_db["entry"]["options"] = {"keep_ownership": True}
+
+                        env_vars.update(local_db["env_vars"])
+                        extra_services[local_db["service_name"]] = local_db["service"]
+                        volumes_list.append(local_db["volume"])
+                        db_entries.append(local_db["entry"])
 
-                        add_db_to_json(
-                            path,
-                            {
-                                "name": db_name,
-                                "database": "0",
-                                "type": "valkey",
-                                "username": "",
-                                "password": "",
-                                "port": 6379,
-                                "host": service_name,
-                                "generated_id": str(uuid.uuid4()),
-                            },
-                        )
                         console.print(
-                            f"[success]✔ Added Valkey container (Port {valkey_port})[/success]"
+                            f"[success]✔ Added {local_db['label']} container "
+                            f"(Port {local_db['port']})[/success]"
                         )
+                    break
 
-                elif db_engine == "firebird":
-                    fb_port = get_free_port()
-                    db_user = "alice"
-                    db_pass = generate_password(16)
-                    db_root_pass = generate_password(16)
-                    db_name = "mirror.fdb"
-                    db_container_path = f"/var/lib/firebird/data/{db_name}"
-                    service_name = f"db-firebird-{secrets.token_hex(2)}"
-
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(fb_port)
-                    env_vars[f"{var_prefix}_DB"] = db_name
-                    env_vars[f"{var_prefix}_USER"] = db_user
-                    env_vars[f"{var_prefix}_PASS"] = db_pass
-                    env_vars[f"{var_prefix}_ROOT_PASS"] = db_root_pass
-
-                    snippet = (
-                        AGENT_FIREBIRD_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                        .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                        .replace("${USER}", f"${{{var_prefix}_USER}}")
-                        .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                        .replace("${ROOT_PASSWORD}", f"${{{var_prefix}_ROOT_PASS}}")
-                    )
-
-                    extra_services += snippet
-                    volumes_list.append(f"{service_name}-data")
-
-                    add_db_to_json(
-                        path,
-                        {
-                            "name": db_name,
-                            "database": db_container_path,
-                            "type": "firebird",
-                            "username": db_user,
-                            "password": db_pass,
-                            "port": 3050,
-                            "host": service_name,
-                            "generated_id": str(uuid.uuid4()),
-                        },
-                    )
-                    console.print(
-                        f"[success]✔ Added Firebird container (Port {fb_port})[/success]"
-                    )
-
-                elif db_engine == "mssql":
-                    mssql_port = get_free_port()
-                    db_pass = generate_password(16)
-                    db_name = "master"
-                    service_name = f"db-mssql-{secrets.token_hex(2)}"
-
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(mssql_port)
-                    env_vars[f"{var_prefix}_PASS"] = db_pass
-
-                    snippet = (
-                        AGENT_MSSQL_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                        .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                    )
-
-                    extra_services += snippet
-                    volumes_list.append(f"{service_name}-data")
+        raw_template = speculation.join(
+            "template",
+            lambda: fetch_template("agent.yml", offline=offline, refresh=refresh_template),
+        )
+        final_compose = render_agent_compose(
+            raw_template, extra_services, volumes_list, app_volumes, add_host_gateway
+        )
 
-                    add_db_to_json(
-                        path,
-                        {
-                            "name": "MSSQL",
-                            "database": db_name,
-                            "type": "mssql",
-                            "username": "sa",
-                            "password": db_pass,
-                            "port": 1433,
-                            "host": service_name,
-                            "generated_id": str(uuid.uuid4()),
-                        },
+        speculation.join("docker")
+        # Instant once the probe above succeeded; otherwise offers to start Docker.
+        check_system()
+        if not speculation.join("network"):
+            ensure_network("portabase_network")
+
+        summary = Table(show_header=False, box=None, padding=(0, 2))
+        summary.add_column("Property", style="bold cyan")
+        summary.add_column("Value", style="white")
+
+        summary.add_row("Agent Name", name)
+        summary.add_row("Path", str(path))
+        summary.add_row("Edge Key", f"{key[:10]}...{key[-10:]}" if len(key) > 20 else key)
+        summary.add_row("Timezone", tz)
+        summary.add_row("Polling", f"{polling}s")
+        summary.add_row("Host Gateway", "Yes" if add_host_gateway else "No")
+
+        dbs = load_db_config(path).get("databases", []) + db_entries
+        if dbs:
+            db_details = []
+            for db in dbs:
+                if db.get("type") == "sqlite":
+                    db_details.append(f"• {db['name']} (sqlite: {db['database']})")
+                elif db.get("type") == "docker-volume":
+                    db_details.append(
+                        f"• {db['name']} (docker-volume: {db.get('volume_name', 'N/A')})"
                     )
-                    console.print(
-                        f"[success]✔ Added MSSQL container (Port {mssql_port})[/success]"
+                else:
+                    db_details.append(
+                        f"• {db['name']} ({db['type']} on port {db.get('port', 'N/A')})"
                     )
-                break
 
-    if volumes_list:
-        extra_volumes = "volumes:\n"
-        for vol in volumes_list:
-            extra_volumes += f"  {vol}:\n"
-
-    final_compose = raw_template.replace("{{EXTRA_SERVICES}}", extra_services)
-    final_compose = final_compose.replace("{{EXTRA_VOLUMES}}", extra_volumes)
+            summary.add_row("Databases", "\n".join(db_details))
+        else:
+            summary.add_row("Databases", "[dim]None configured[/dim]")
 
-    vols_str = "\n".join([f"      - {v}" for v in app_volumes])
-    final_compose = final_compose.replace(
-        "      - ./databases.json:/config/config.json", vols_str
-    )
+        summary.add_row("Files to Create", "• docker-compose.yml\n• .env\n• databases.json")
 
-    if add_host_gateway:
-        final_compose = final_compose.replace(
-            "    image: portabase/agent:latest\n",
-            "    image: portabase/agent:latest\n"
-            "    extra_hosts:\n"
-            '      - "localhost:host-gateway"\n',
+        console.print("")
+        console.print(
+            Panel(
+                summary,
+                title="[bold white]PROPOSED CONFIGURATION[/bold white]",
+                border_style="bold blue",
+                expand=False,
+            )
         )
-
-    summary = Table(show_header=False, box=None, padding=(0, 2))
-    summary.add_column("Property", style="bold cyan")
-    summary.add_column("Value", style="white")
-
-    summary.add_row("Agent Name", name)
-    summary.add_row("Path", str(path))
-    summary.add_row("Edge Key", f"{key[:10]}...{key[-10:]}" if len(key) > 20 else key)
-    summary.add_row("Timezone", tz)
-    summary.add_row("Polling", f"{polling}s")
-    summary.add_row("Host Gateway", "Yes" if add_host_gateway else "No")
-
-    db_config = load_db_config(path)
-    dbs = db_config.get("databases", [])
-    if dbs:
-        db_details = []
-        for db in dbs:
-            if db.get("type") == "sqlite":
-                db_details.append(f"• {db['name']} (sqlite: {db['database']})")
-            elif db.get("type") == "docker-volume":
-                db_details.append(
-                    f"• {db['name']} (docker-volume: {db.get('volume_name', 'N/A')})"
-                )
-            else:
-                db_details.append(
-                    f"• {db['name']} ({db['type']} on port {db.get('port', 'N/A')})"
-                )
-
-        summary.add_row("Databases", "\n".join(db_details))
-    else:
-        summary.add_row("Databases", "[dim]None configured[/dim]")
-
-    summary.add_row("Files to Create", "• docker-compose.yml\n• .env\n• databases.json")
-
-    console.print("")
-    console.print(
-        Panel(
-            summary,
-            title="[bold white]PROPOSED CONFIGURATION[/bold white]",
-            border_style="bold blue",
-            expand=False,
+        console.print(
+            "[dim]The agent will be configured in the directory above and ready for deployment.[/dim]\n"
         )
-    )
-    console.print(
-        "[dim]The agent will be configured in the directory above and ready for deployment.[/dim]\n"
-    )
 
-    if not Confirm.ask(
-        "[bold]Apply this configuration and generate files?[/bold]", default=True
-    ):
-        console.print("[warning]Configuration cancelled.[/warning]")
-        raise typer.Exit()
+        if not Confirm.ask(
+            "[bold]Apply this configuration and generate files?[/bold]", default=True
+        ):
+            console.print("[warning]Configuration cancelled.[/warning]")
+            raise typer.Exit()
 
-    write_file(path / "docker-compose.yml", final_compose)
-    write_env_file(path, env_vars)
+        add_dbs_to_json(path, db_entries)
+        write_file(path / "docker-compose.yml", final_compose)
+        write_env_file(path, env_vars)
+    registered_name = register_component(path, "agent", current_version())
+    if registered_name != path.name:
+        console.print(
+            f"[info]ℹ Another component is already named '{path.name}', "
+            f"refer to this one as '{registered_name}'.[/info]"
+        )
 
     console.print(
         Panel(f"[bold white]AGENT READY: {name}[/bold white]", style="bold #5f00d7")
     )
 
     if start or Confirm.ask("Start agent now?", default=False):
+        if speculation.pending("pull:"):
+            with console.status("[dim]Finishing image downloads...[/dim]"):
+                speculation.wait("pull:")
+        prepull_images([path])
         status_msg = f"[bold magenta]Starting...[/bold magenta]\n{get_random_hint()}"
         with console.status(status_msg, spinner="earth"):
             run_compose(path, ["up", "-d"])
@@ -1,56 +1,153 @@
 import typer
+import glob
+import re
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, Optional
 from rich.prompt import Confirm
-from core.utils import console, validate_work_dir, get_random_hint
-from core.docker import run_compose
+from core.config import load_components, unregister_component
+from core.ports import release_ports
+from core.trace import propagate
+from core.utils import console, resolve_component, get_random_hint
+from core.docker import compose_command, run_compose, run_compose_captured
 
-def start(path: Path = typer.Argument(..., help="Path to component folder")):
-    path = path.resolve()
-    validate_work_dir(path)
-    status_msg = f"[bold magenta]Starting {path.name}...[/bold magenta]\n{get_random_hint()}"
-    with console.status(status_msg):
-        run_compose(path, ["up", "-d"])
-    console.print("[success]✔ Started[/success]")
+def resolve_targets(paths: List[Path]) -> List[Path]:
+    """Expand glob patterns into component folders, keeping the given order."""
+    targets = []
+    for pattern in map(str, paths):
+        if glob.has_magic(pattern):
+            matches = [
+                Path(p).resolve()
+                for p in sorted(glob.glob(pattern))
+                if (Path(p) / "docker-compose.yml").exists()
+            ]
+            if not matches:
+                console.print(f"[danger]No Portabase configuration matches: {pattern}[/danger]")
+                raise typer.Exit(1)
+        else:
+            matches = [resolve_component(pattern)]
+        for path in matches:
+            if path not in targets:
+                targets.append(path)
+    return targets
 
-def stop(path: Path = typer.Argument(..., help="Path to component folder")):
-    path = path.resolve()
-    validate_work_dir(path)
-    status_msg = f"[bold magenta]Stopping {path.name}...[/bold magenta]\n{get_random_hint()}"
-    with console.status(status_msg):
-        run_compose(path, ["stop"])
-    console.print("[success]✔ Stopped[/success]")
+def run_lifecycle(paths: List[Path], args: list, action: str, done: str, parallel: int):
+    targets = resolve_targets(paths)
+
+    if args[0] == "up":
+        from core.images import prepull_images
 
-def restart(path: Path = typer.Argument(..., help="Path to component folder")):
-    path = path.resolve()
-    validate_work_dir(path)
-    status_msg = f"[bold magenta]Restarting {path.name}...[/bold magenta]\n{get_random_hint()}"
+        prepull_images(targets, parallel)
+
+    if len(targets) == 1:
+        path = targets[0]
+        status_msg = f"[bold magenta]{action} {path.name}...[/bold magenta]\n{get_random_hint()}"
+        with console.status(status_msg):
+            run_compose(path, args)
+        console.print(f"[success]✔ {done}[/success]")
+        return
+
+    def run(path: Path):
+        try:
+            result = run_compose_captured(path, args)
+            output = (result.stderr or result.stdout).strip().splitlines()
+            return path, result.returncode == 0, output[-1] if output else ""
+        except Exception as e:
+            return path, False, str(e)
+
+    status_msg = f"[bold magenta]{action} {len(targets)} components...[/bold magenta]\n{get_random_hint()}"
     with console.status(status_msg):
-        run_compose(path, ["restart"])
-    console.print("[success]✔ Restarted[/success]")
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            results = list(pool.map(propagate(run), targets))
+
+    failures = [(path, message) for path, ok, message in results if not ok]
+    for path, ok, _ in results:
+        if ok:
+            console.print(f"[success]✔ {done}[/success] {path.name}")
+        else:
+            console.print(f"[danger]✖ Failed[/danger] {path.name}")
+
+    if failures:
+        console.print(f"\n[danger]{len(failures)} of {len(targets)} components failed:[/danger]")
+        for path, message in failures:
+            console.print(f"  [danger]•[/danger] {path}: [dim]{message}[/dim]")
+        raise typer.Exit(1)
+
+def start(
+    paths: List[Path] = typer.Argument(..., help="Paths, glob patterns or registered names of components"),
+    parallel: int = typer.Option(4, "--parallel", "-p", help="Number of components handled at once")
+):
+    run_lifecycle(paths, ["up", "-d"], "Starting", "Started", parallel)
+
+def stop(
+    paths: List[Path] = typer.Argument(..., help="Paths, glob patterns or registered names of components"),
+    parallel: int = typer.Option(4, "--parallel", "-p", help="Number of components handled at once")
+):
+    run_lifecycle(paths, ["stop"], "Stopping", "Stopped", parallel)
+
+def restart(
+    paths: List[Path] = typer.Argument(..., help="Paths, glob patterns or registered names of components"),
+    parallel: int = typer.Option(4, "--parallel", "-p", help="Number of components handled at once")
+):
+    run_lifecycle(paths, ["restart"], "Restarting", "Restarted", parallel)
 
 def logs(
-    path: Path = typer.Argument(..., help="Path to component folder"),
-    follow: bool = typer.Option(True, "--follow/--no-follow", "-f")
+    paths: Optional[List[Path]] = typer.Argument(None, help="Paths, glob patterns or registered names of components"),
+    all_components: bool = typer.Option(False, "--all", "-a", help="Follow every registered component"),
+    follow: bool = typer.Option(True, "--follow/--no-follow", "-f"),
+    since: Optional[str] = typer.Option(None, "--since", help="Only logs since a timestamp or duration (e.g. 10m)"),
+    tail: Optional[str] = typer.Option(None, "--tail", "-n", help="Number of lines to show from the end of each log"),
+    grep: Optional[str] = typer.Option(None, "--grep", "-g", help="Only show lines matching this regular expression"),
 ):
-    path = path.resolve()
-    validate_work_dir(path)
-    args = ["logs"]
-    if follow:
-        args.append("-f")
-    try:
-        project_name = path.name.lower().replace(" ", "_")
-        subprocess.run(["docker", "compose", "-p", project_name] + args, cwd=path)
-    except KeyboardInterrupt:
-        pass
+    if all_components:
+        targets = [Path(c["path"]) for c in load_components().values() if Path(c["path"]).exists()]
+        if not targets:
+            console.print("[warning]No registered components.[/warning]")
+            return
+    elif paths:
+        targets = resolve_targets(paths)
+    else:
+        console.print("[danger]Give at least one component, or use --all.[/danger]")
+        raise typer.Exit(1)
+
+    if len(targets) == 1 and not grep:
+        path = targets[0]
+        args = ["logs"]
+        if follow:
+            args.append("-f")
+        if since:
+            args += ["--since", since]
+        if tail:
+            args += ["--tail", tail]
+        try:
+            subprocess.run(compose_command(path, args), cwd=path)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if grep:
+        try:
+            re.compile(grep)
+        except re.error as e:
+            console.print(f"[danger]Invalid --grep pattern: {e}[/danger]")
+            raise typer.Exit(1)
+
+    from core.logs import stream_logs
+
+    failures = stream_logs(targets, follow=follow, since=since, tail=tail, grep=grep)
+    if failures:
+        console.print(f"\n[danger]{len(failures)} of {len(targets)} components failed:[/danger]")
+        for path, message in failures:
+            console.print(f"  [danger]•[/danger] {path}: [dim]{message}[/dim]")
+        raise typer.Exit(1)
 
 def uninstall(
-    path: Path = typer.Argument(..., help="Path to component folder"),
+    path: Path = typer.Argument(..., help="Path or registered name of the component"),
     force: bool = typer.Option(False, "--force", "-f")
 ):
-    path = path.resolve()
-    validate_work_dir(path)
+    path = resolve_component(str(path))
     
     if not force:
         console.print(f"[danger]⚠ WARNING: This will delete containers and data in {path}.[/danger]")
@@ -64,5 +161,7 @@ def uninstall(
             shutil.rmtree(path)
         except Exception as e:
             console.print(f"[warning]Could not remove directory: {e}[/warning]")
+        unregister_component(path)
+        release_ports(str(path))
             
     console.print(f"[success]✔ Uninstalled[/success]")
\ No newline at end of file
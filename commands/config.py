@@ -1,7 +1,10 @@
+import os
+from pathlib import Path
+
 import typer
 
 from core.config import get_config_value, set_config_value
-from core.utils import console
+from core.utils import DOCKER_START_TIMEOUT, console
 
 app = typer.Typer(help="Manage global CLI configuration.")
 
@@ -21,8 +24,112 @@ def channel(
     console.print(f"[success]✔ Update channel set to: [bold]{name}[/bold][/success]")
 
 
+@app.command("docker-timeout")
+def docker_timeout(
+    seconds: int = typer.Argument(
+        ..., help="How long to wait for the Docker daemon to start"
+    ),
+):
+    if seconds <= 0:
+        console.print("[danger]✖ The timeout must be a positive number.[/danger]")
+        raise typer.Exit(1)
+
+    set_config_value("docker_start_timeout", seconds)
+    console.print(
+        f"[success]✔ Docker start timeout set to: [bold]{seconds}s[/bold][/success]"
+    )
+
+
+@app.command()
+def proxy(
+    url: str = typer.Argument(
+        ..., help="Proxy URL for GitHub and template downloads, or 'none' to disable"
+    ),
+):
+    if url.lower() == "none":
+        set_config_value("proxy", None)
+        console.print("[success]✔ Proxy disabled[/success]")
+        return
+
+    if not url.startswith(("http://", "https://", "socks5://", "socks5h://")):
+        console.print(
+            "[danger]✖ Invalid proxy URL. Use http://, https:// or socks5://.[/danger]"
+        )
+        raise typer.Exit(1)
+
+    set_config_value("proxy", url)
+    console.print(f"[success]✔ Proxy set to: [bold]{url}[/bold][/success]")
+
+
+@app.command("ca-bundle")
+def ca_bundle(
+    path: str = typer.Argument(
+        ..., help="CA certificates file used to verify HTTPS, or 'none' for the default"
+    ),
+):
+    if path.lower() == "none":
+        set_config_value("ca_bundle", None)
+        console.print("[success]✔ Using the default CA certificates[/success]")
+        return
+
+    bundle = Path(path).expanduser().resolve()
+    if not bundle.is_file():
+        console.print(f"[danger]✖ File not found: {bundle}[/danger]")
+        raise typer.Exit(1)
+
+    set_config_value("ca_bundle", str(bundle))
+    console.print(f"[success]✔ CA bundle set to: [bold]{bundle}[/bold][/success]")
+
+
+@app.command("docker-host")
+def docker_host(
+    url: str = typer.Argument(
+        ..., help="Docker daemon to use (e.g. unix:///path/docker.sock), or 'none' for the default"
+    ),
+):
+    if url.lower() == "none":
+        set_config_value("docker_host", None)
+        console.print("[success]✔ Using the default Docker daemon[/success]")
+        return
+
+    if not url.startswith(("unix://", "tcp://", "ssh://", "npipe://")):
+        console.print(
+            "[danger]✖ Invalid Docker host. Use unix://, tcp://, ssh:// or npipe://.[/danger]"
+        )
+        raise typer.Exit(1)
+
+    set_config_value("docker_host", url)
+    console.print(f"[success]✔ Docker host set to: [bold]{url}[/bold][/success]")
+
+
+@app.command("docker-binary")
+def docker_binary(
+    path: str = typer.Argument(
+        ..., help="docker executable to run instead of the one on PATH, or 'none'"
+    ),
+):
+    if path.lower() == "none":
+        set_config_value("docker_binary", None)
+        console.print("[success]✔ Using docker from PATH[/success]")
+        return
+
+    binary = Path(path).expanduser().resolve()
+    if not binary.is_file() or not os.access(binary, os.X_OK):
+        console.print(f"[danger]✖ Not an executable file: {binary}[/danger]")
+        raise typer.Exit(1)
+
+    set_config_value("docker_binary", str(binary))
+    console.print(f"[success]✔ Docker binary set to: [bold]{binary}[/bold][/success]")
+
+
 @app.command()
 def show():
     channel = get_config_value("update_channel", "auto (based on current version)")
+    docker_timeout = get_config_value("docker_start_timeout", DOCKER_START_TIMEOUT)
     console.print(f"[info]Current Configuration:[/info]")
     console.print(f"  [bold]Update Channel:[/bold] {channel}")
+    console.print(f"  [bold]Docker Start Timeout:[/bold] {docker_timeout}s")
+    console.print(f"  [bold]Proxy:[/bold] {get_config_value('proxy') or 'none'}")
+    console.print(f"  [bold]CA Bundle:[/bold] {get_config_value('ca_bundle') or 'default'}")
+    console.print(f"  [bold]Docker Host:[/bold] {get_config_value('docker_host') or 'default'}")
+    console.print(f"  [bold]Docker Binary:[/bold] {get_config_value('docker_binary') or 'docker (PATH)'}")
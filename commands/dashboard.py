@@ -9,14 +9,19 @@ from rich.panel import Panel
 from rich.prompt import Confirm, IntPrompt, Prompt
 from rich.table import Table
 
-from core.config import write_env_file, write_file
+from core.config import register_component, write_env_file, write_file
 from core.docker import run_compose
+from core.images import ensure_compose_images, prepull_images
 from core.network import fetch_template
+from core.ports import allocate_port, release_ports_on_abort
+from core.speculative import Speculation
 from core.utils import (
+    DOCKER_PROBE_WAIT,
     check_system,
     console,
+    current_version,
+    docker_is_alive,
     generate_password,
-    get_free_port,
     get_random_hint,
     print_banner,
     questionary_style,
@@ -27,9 +32,23 @@ def dashboard(
     name: str = typer.Argument(..., help="Name of the dashboard (creates a folder)"),
     port: str = typer.Option("8887", help="Web Port"),
     start: bool = typer.Option(False, "--start", "-s", help="Start immediately"),
+    offline: bool = typer.Option(
+        False, "--offline", help="Only use cached templates, never the network"
+    ),
+    refresh_template: bool = typer.Option(
+        False, "--refresh-template", help="Download the latest template first"
+    ),
 ):
     print_banner()
-    check_system()
+
+    # See agent(): the slow parts run while the questions are answered.
+    speculation = Speculation()
+    speculation.start("docker", docker_is_alive)
+    speculation.start(
+        "template", fetch_template, "dashboard.yml", offline=offline, refresh=refresh_template, quiet=True
+    )
+    if speculation.peek("docker", DOCKER_PROBE_WAIT) is False:
+        check_system()
 
     path = Path(name).resolve()
     if path.exists():
@@ -40,8 +59,6 @@ def dashboard(
     path.mkdir(parents=True, exist_ok=True)
     project_name = name.lower().replace(" ", "-")
 
-    raw_template = fetch_template("dashboard.yml")
-
     auth_secret = secrets.token_hex(32)
     base_url = f"http://localhost:{port}"
 
@@ -54,131 +71,147 @@ def dashboard(
         "LOG_LEVEL": "info",
     }
 
-    mode = questionary.select(
-        "Database Setup",
-        choices=[
-            questionary.Choice(
-                "external: create a dedicated container in the same docker-compose.yml (recommended)",
-                value="external",
-            ),
-            questionary.Choice(
-                "internal: use the database embedded in the Portabase container",
-                value="internal",
-            ),
-            questionary.Choice(
-                "custom: provide credentials of an existing database",
-                value="custom",
-            ),
-        ],
-        style=questionary_style,
-    ).ask()
-
-    if not mode:
-        raise typer.Exit()
-
-    if mode == "external":
-        pg_port = get_free_port()
-        pg_pass = generate_password(16)
-        env_vars.update(
-            {
-                "POSTGRES_DB": "portabase",
-                "POSTGRES_USER": "portabase",
-                "POSTGRES_PASSWORD": pg_pass,
-                "POSTGRES_HOST": "db",
-                "DATABASE_URL": f"postgresql://portabase:{quote(pg_pass, safe='')}@db:5432/portabase?schema=public",
-                "PG_PORT": str(pg_port),
-            }
-        )
-        final_compose = raw_template.replace("${PROJECT_NAME}", project_name)
-    elif mode == "custom":
-        console.print("[info]External Database Configuration[/info]")
-        db_host = Prompt.ask("Host", default="localhost")
-        db_port = IntPrompt.ask("Port", default=5432)
-        db_name = Prompt.ask("Database Name", default="portabase")
-        db_user = Prompt.ask("Username")
-        db_pass = questionary.password("Password", style=questionary_style).ask()
-        if db_pass is None:
+    with release_ports_on_abort(str(path)):
+        mode = questionary.select(
+            "Database Setup",
+            choices=[
+                questionary.Choice(
+                    "external: create a dedicated container in the same docker-compose.yml (recommended)",
+                    value="external",
+                ),
+                questionary.Choice(
+                    "internal: use the database embedded in the Portabase container",
+                    value="internal",
+                ),
+                questionary.Choice(
+                    "custom: provide credentials of an existing database",
+                    value="custom",
+                ),
+            ],
+            style=questionary_style,
+        ).ask()
+
+        if not mode:
             raise typer.Exit()
 
-        env_vars.update(
-            {
-                "POSTGRES_DB": db_name,
-                "POSTGRES_USER": db_user,
-                "POSTGRES_PASSWORD": db_pass,
-                "POSTGRES_HOST": db_host,
-                "DATABASE_URL": f"postgresql://{quote(db_user, safe='')}:{quote(db_pass, safe='')}@{db_host}:{db_port}/{db_name}?schema=public",
-                "PG_PORT": str(db_port),
-            }
+        raw_template = speculation.join(
+            "template",
+            lambda: fetch_template("dashboard.yml", offline=offline, refresh=refresh_template),
         )
-
-        final_compose = re.sub(
-            r"[ ]{4}depends_on:\n[ ]{6}db:\n[ ]{8}condition: service_healthy\n",
-            "",
-            raw_template,
-        )
-        final_compose = re.sub(
-            r"[ ]{2}db:.*?retries: 5\n", "", final_compose, flags=re.DOTALL
-        )
-        final_compose = re.sub(r"[ ]{2}postgres-data:\n", "", final_compose)
-        final_compose = final_compose.replace("${PROJECT_NAME}", project_name)
-    else:
-        final_compose = re.sub(
-            r"[ ]{4}depends_on:\n[ ]{6}db:\n[ ]{8}condition: service_healthy\n",
-            "",
-            raw_template,
+        if mode == "external":
+            pg_port = allocate_port(str(path))
+            pg_pass = generate_password(16)
+            env_vars.update(
+                {
+                    "POSTGRES_DB": "portabase",
+                    "POSTGRES_USER": "portabase",
+                    "POSTGRES_PASSWORD": pg_pass,
+                    "POSTGRES_HOST": "db",
+                    "DATABASE_URL": f"postgresql://portabase:{quote(pg_pass, safe='')}@db:5432/portabase?schema=public",
+                    "PG_PORT": str(pg_port),
+                }
+            )
+            final_compose = raw_template.replace("${PROJECT_NAME}", project_name)
+        elif mode == "custom":
+            console.print("[info]External Database Configuration[/info]")
+            db_host = Prompt.ask("Host", default="localhost")
+            db_port = IntPrompt.ask("Port", default=5432)
+            db_name = Prompt.ask("Database Name", default="portabase")
+            db_user = Prompt.ask("Username")
+            db_pass = questionary.password("Password", style=questionary_style).ask()
+            if db_pass is None:
+                raise typer.Exit()
+
+            env_vars.update(
+                {
+                    "POSTGRES_DB": db_name,
+                    "POSTGRES_USER": db_user,
+                    "POSTGRES_PASSWORD": db_pass,
+                    "POSTGRES_HOST": db_host,
+                    "DATABASE_URL": f"postgresql://{quote(db_user, safe='')}:{quote(db_pass, safe='')}@{db_host}:{db_port}/{db_name}?schema=public",
+                    "PG_PORT": str(db_port),
+                }
+            )
+
+            final_compose = re.sub(
+                r"[ ]{4}depends_on:\n[ ]{6}db:\n[ ]{8}condition: service_healthy\n",
+                "",
+                raw_template,
+            )
+            final_compose = re.sub(
+                r"[ ]{2}db:.*?retries: 5\n", "", final_compose, flags=re.DOTALL
+            )
+            final_compose = re.sub(r"[ ]{2}postgres-data:\n", "", final_compose)
+            final_compose = final_compose.replace("${PROJECT_NAME}", project_name)
+        else:
+            final_compose = re.sub(
+                r"[ ]{4}depends_on:\n[ ]{6}db:\n[ ]{8}condition: service_healthy\n",
+                "",
+                raw_template,
+            )
+            final_compose = re.sub(
+                r"[ ]{2}db:.*?retries: 5\n", "", final_compose, flags=re.DOTALL
+            )
+            final_compose = re.sub(r"[ ]{2}postgres-data:\n", "", final_compose)
+            final_compose = final_compose.replace("${PROJECT_NAME}", project_name)
+
+        speculation.join("docker")
+        check_system()
+        if start:
+            speculation.start("pull:compose", ensure_compose_images, final_compose)
+
+        summary = Table(show_header=False, box=None, padding=(0, 2))
+        summary.add_column("Property", style="bold cyan")
+        summary.add_column("Value", style="white")
+
+        summary.add_row("Dashboard Name", name)
+        summary.add_row("Path", str(path))
+        summary.add_row("Access URL", f"[bold green]http://localhost:{port}[/bold green]")
+
+        db_setup_label = {
+            "external": "Dedicated Docker Container (Recommended)",
+            "internal": "Embedded Database (In-container)",
+            "custom": "Custom/Existing Database",
+        }
+        summary.add_row("Database Setup", db_setup_label.get(mode))
+
+        if mode == "external":
+            summary.add_row("Internal Port", env_vars["PG_PORT"])
+        elif mode == "custom":
+            summary.add_row("DB Host", env_vars["POSTGRES_HOST"])
+            summary.add_row("DB Name", env_vars["POSTGRES_DB"])
+            masked_url = re.sub(r":.*?@", ":****@", env_vars["DATABASE_URL"])
+            summary.add_row("Connection URL", f"[dim]{masked_url}[/dim]")
+
+        summary.add_row("Files to Create", "• docker-compose.yml\n• .env")
+
+        console.print("")
+        console.print(
+            Panel(
+                summary,
+                title="[bold white]PROPOSED CONFIGURATION[/bold white]",
+                border_style="bold blue",
+                expand=False,
+            )
         )
-        final_compose = re.sub(
-            r"[ ]{2}db:.*?retries: 5\n", "", final_compose, flags=re.DOTALL
+        console.print(
+            "[dim]The dashboard will be set up with the parameters above.[/dim]\n"
         )
-        final_compose = re.sub(r"[ ]{2}postgres-data:\n", "", final_compose)
-        final_compose = final_compose.replace("${PROJECT_NAME}", project_name)
-
-    summary = Table(show_header=False, box=None, padding=(0, 2))
-    summary.add_column("Property", style="bold cyan")
-    summary.add_column("Value", style="white")
-
-    summary.add_row("Dashboard Name", name)
-    summary.add_row("Path", str(path))
-    summary.add_row("Access URL", f"[bold green]http://localhost:{port}[/bold green]")
 
-    db_setup_label = {
-        "external": "Dedicated Docker Container (Recommended)",
-        "internal": "Embedded Database (In-container)",
-        "custom": "Custom/Existing Database",
-    }
-    summary.add_row("Database Setup", db_setup_label.get(mode))
-
-    if mode == "external":
-        summary.add_row("Internal Port", env_vars["PG_PORT"])
-    elif mode == "custom":
-        summary.add_row("DB Host", env_vars["POSTGRES_HOST"])
-        summary.add_row("DB Name", env_vars["POSTGRES_DB"])
-        masked_url = re.sub(r":.*?@", ":****@", env_vars["DATABASE_URL"])
-        summary.add_row("Connection URL", f"[dim]{masked_url}[/dim]")
-
-    summary.add_row("Files to Create", "• docker-compose.yml\n• .env")
+        if not Confirm.ask(
+            "[bold]Apply this configuration and generate files?[/bold]", default=True
+        ):
+            console.print("[warning]Configuration cancelled.[/warning]")
+            raise typer.Exit()
 
-    console.print("")
-    console.print(
-        Panel(
-            summary,
-            title="[bold white]PROPOSED CONFIGURATION[/bold white]",
-            border_style="bold blue",
-            expand=False,
+        write_file(path / "docker-compose.yml", final_compose)
+        write_env_file(path, env_vars)
+    registered_name = register_component(path, "dashboard", current_version())
+    if registered_name != path.name:
+        console.print(
+            f"[info]ℹ Another component is already named '{path.name}', "
+            f"refer to this one as '{registered_name}'.[/info]"
         )
-    )
-    console.print(
-        "[dim]The dashboard will be set up with the parameters above.[/dim]\n"
-    )
-
-    if not Confirm.ask(
-        "[bold]Apply this configuration and generate files?[/bold]", default=True
-    ):
-        console.print("[warning]Configuration cancelled.[/warning]")
-        raise typer.Exit()
-
-    write_file(path / "docker-compose.yml", final_compose)
-    write_env_file(path, env_vars)
 
     db_info = ""
     if mode == "external":
@@ -196,6 +229,10 @@ def dashboard(
     )
 
     if start or Confirm.ask("Start dashboard now?", default=False):
+        if speculation.pending("pull:"):
+            with console.status("[dim]Finishing image downloads...[/dim]"):
+                speculation.wait("pull:")
+        prepull_images([path])
         status_msg = f"[bold magenta]Starting...[/bold magenta]\n{get_random_hint()}"
         with console.status(status_msg, spinner="earth"):
             run_compose(path, ["up", "-d"])
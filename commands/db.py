@@ -1,83 +1,199 @@
-import re
-import secrets
+import csv
+import json
 import uuid
 from pathlib import Path
 
 import questionary
 import typer
+import yaml
 from rich.panel import Panel
 from rich.prompt import IntPrompt, Prompt
 from rich.table import Table
 
-from core.config import add_db_to_json, load_db_config, save_db_config, write_env_file
+from commands.agent import build_local_database
+from commands.fleet import EXTERNAL_DB_TYPES
+from core.compose import ComposeFile
+from core.config import add_dbs_to_json, db_config_transaction, load_db_config, write_env_file
 from core.docker import ensure_network
 from core.utils import (
     console,
-    generate_password,
-    get_free_port,
     questionary_style,
-    validate_work_dir,
-)
-from templates.compose import (
-    AGENT_FIREBIRD_SNIPPET,
-    AGENT_MARIADB_SNIPPET,
-    AGENT_MONGODB_AUTH_SNIPPET,
-    AGENT_MONGODB_SNIPPET,
-    AGENT_MSSQL_SNIPPET,
-    AGENT_POSTGRES_SNIPPET,
-    AGENT_REDIS_AUTH_SNIPPET,
-    AGENT_REDIS_SNIPPET,
-    AGENT_VALKEY_AUTH_SNIPPET,
-    AGENT_VALKEY_SNIPPET,
+    resolve_component,
 )
+from templates.compose import DEFAULT_PORTS
 
 app = typer.Typer(help="Manage databases configuration.")
 
 DOCKER_SOCKET_MOUNT = "/var/run/docker.sock:/var/run/docker.sock"
-
-
-def ensure_docker_socket(path: Path):
+IMPORT_FIELDS = [
+    "name",
+    "type",
+    "database",
+    "host",
+    "port",
+    "username",
+    "password",
+    "volume_name",
+    "container_name",
+    "keep_ownership",
+    "generated_id",
+]
+
+
+def ensure_docker_socket(compose: ComposeFile | None):
     """Mount the Docker socket on the agent's app service if not already present."""
-    compose_path = path / "docker-compose.yml"
-    if not compose_path.exists():
+    if compose is None:
         console.print(
             "[warning]⚠ docker-compose.yml not found. Add "
             f"[bold]{DOCKER_SOCKET_MOUNT}[/bold] to the agent volumes manually.[/warning]"
         )
         return
 
-    content = compose_path.read_text()
-    if DOCKER_SOCKET_MOUNT in content:
+    agent_service = compose.agent_service()
+    mounts = (compose.services.get(agent_service) or {}).get("volumes") or []
+    if DOCKER_SOCKET_MOUNT in mounts:
         return
 
-    anchor = "- ./databases.json:/config/config.json"
-    lines = content.splitlines(keepends=True)
-    new_lines = []
-    inserted = False
-    for line in lines:
-        new_lines.append(line)
-        if not inserted and anchor in line:
-            indent = line[: len(line) - len(line.lstrip())]
-            new_lines.append(f"{indent}- {DOCKER_SOCKET_MOUNT}\n")
-            inserted = True
-
-    if inserted:
-        compose_path.write_text("".join(new_lines))
+    if compose.add_mount(DOCKER_SOCKET_MOUNT, agent_service):
         console.print(
             f"[info]ℹ Mounted Docker socket ([bold]{DOCKER_SOCKET_MOUNT}[/bold]) "
             "on the agent.[/info]"
         )
     else:
         console.print(
-            "[warning]⚠ Could not locate the agent volumes block. Add "
+            "[warning]⚠ Could not locate the agent service. Add "
             f"[bold]{DOCKER_SOCKET_MOUNT}[/bold] to docker-compose.yml manually.[/warning]"
         )
 
 
+def load_compose(path: Path) -> ComposeFile | None:
+    compose_path = path / "docker-compose.yml"
+    if not compose_path.exists():
+        return None
+    try:
+        return ComposeFile.load(compose_path)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        console.print(f"[danger]✖ Could not parse docker-compose.yml:[/danger] {e}")
+        raise typer.Exit(1)
+
+
+def read_import_file(file: Path) -> list:
+    """Read database entries from a JSON, YAML or CSV file."""
+    try:
+        with open(file, "r", newline="") as f:
+            if file.suffix.lower() == ".csv":
+                # Empty cells mean "not set", like a missing key in JSON/YAML.
+                return [
+                    {k: v for k, v in row.items() if k and v not in (None, "")}
+                    for row in csv.DictReader(f)
+                ]
+            if file.suffix.lower() == ".json":
+                data = json.load(f)
+            else:
+                data = yaml.safe_load(f)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        console.print(f"[danger]✖ Could not read {file.name}:[/danger] {e}")
+        raise typer.Exit(1)
+
+    if isinstance(data, dict):
+        data = data.get("databases")
+    if not isinstance(data, list):
+        console.print(
+            "[danger]✖ Import file must contain a list of databases "
+            "(or a 'databases' list).[/danger]"
+        )
+        raise typer.Exit(1)
+    return data
+
+
+def to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def build_import_entry(raw: dict, label: str, errors: list) -> dict | None:
+    """Validate one imported database and return its databases.json entry."""
+    if not isinstance(raw, dict):
+        errors.append(f"{label}: must be a mapping")
+        return None
+
+    unknown = set(raw) - set(IMPORT_FIELDS)
+    if unknown:
+        errors.append(f"{label}: unknown field(s) {', '.join(sorted(unknown))}")
+        return None
+
+    db_type = str(raw.get("type", "")).strip()
+    entry = {}
+
+    if db_type == "docker-volume":
+        if not raw.get("volume_name"):
+            errors.append(f"{label}: 'volume_name' is required")
+            return None
+        entry = {
+            "name": str(raw.get("name", "Docker Volume")),
+            "type": db_type,
+            "volume_name": str(raw["volume_name"]),
+        }
+        if raw.get("container_name"):
+            entry["container_name"] = str(raw["container_name"])
+    elif db_type == "sqlite":
+        if not raw.get("database"):
+            errors.append(f"{label}: 'database' is required")
+            return None
+        database = str(raw["database"])
+        if not database.startswith("/"):
+            # Relative paths are files next to docker-compose.yml, mounted in /config.
+            database = f"/config/{database}"
+        entry = {
+            "name": str(raw.get("name", Path(database).name)),
+            "database": database,
+            "type": db_type,
+        }
+    elif db_type in EXTERNAL_DB_TYPES:
+        if not raw.get("database"):
+            errors.append(f"{label}: 'database' is required")
+            return None
+        try:
+            port = int(raw.get("port", DEFAULT_PORTS.get(db_type, 27017)))
+        except (TypeError, ValueError):
+            errors.append(f"{label}: invalid port '{raw.get('port')}'")
+            return None
+        if not 0 < port < 65536:
+            errors.append(f"{label}: port {port} out of range")
+            return None
+        entry = {
+            "name": str(raw.get("name", "External DB")),
+            "database": str(raw["database"]),
+            "type": db_type,
+            "username": str(raw.get("username", "")),
+            "password": str(raw.get("password", "")),
+            "port": port,
+            "host": str(raw.get("host", "localhost")),
+        }
+        if db_type == "postgresql" and to_bool(raw.get("keep_ownership")):
+            entry["options"] = {"keep_ownership": True}
+    else:
+        errors.append(f"{label}: unsupported type '{db_type or 'N/A'}'")
+        return None
+
+    entry["generated_id"] = str(raw.get("generated_id") or uuid.uuid4())
+    return entry
+
+
+def db_identity(db: dict) -> tuple:
+    """What makes two databases.json entries point at the same database."""
+    db_type = db.get("type")
+    if db_type == "docker-volume":
+        return (db_type, db.get("volume_name"))
+    if db_type == "sqlite":
+        return (db_type, db.get("database"))
+    return (db_type, db.get("host"), str(db.get("port")), db.get("database"))
+
+
 @app.command("list")
 def list_dbs(name: str = typer.Argument(..., help="Name of the agent")):
-    path = Path(name).resolve()
-    validate_work_dir(path)
+    path = resolve_component(name)
 
     config = load_db_config(path)
     dbs = config.get("databases", [])
@@ -121,9 +237,10 @@ def list_dbs(name: str = typer.Argument(..., help="Name of the agent")):
 
 @app.command("add")
 def add_db(name: str = typer.Argument(..., help="Name of the agent")):
-    path = Path(name).resolve()
-    validate_work_dir(path)
+    path = resolve_component(name)
     ensure_network("portabase_network")
+    compose = load_compose(path)
+    db_entries = []
 
     console.print(Panel("Add Database to Agent", style="bold blue"))
 
@@ -163,8 +280,8 @@ def add_db(name: str = typer.Argument(..., help="Name of the agent")):
             }
             if container_name:
                 entry["container_name"] = container_name
-            ensure_docker_socket(path)
-            add_db_to_json(path, entry)
+            ensure_docker_socket(compose)
+            db_entries.append(entry)
             console.print("[success]✔ Added to config[/success]")
             continue
 
@@ -223,17 +340,7 @@ def add_db(name: str = typer.Argument(..., help="Name of the agent")):
                 host = Prompt.ask("Host", default="localhost")
                 port = IntPrompt.ask(
                     "Port",
-                    default=5432
-                    if db_type in ["postgresql", "postgresql-cluster"]
-                    else (
-                        3050
-                        if db_type == "firebird"
-                        else (
-                            1433
-                            if db_type == "mssql"
-                            else (3306 if db_type in ["mysql", "mariadb"] else 27017)
-                        )
-                    ),
+                    default=DEFAULT_PORTS.get(db_type, 27017),
                 )
                 user = Prompt.ask("Username")
                 password = questionary.password(
@@ -272,7 +379,7 @@ def add_db(name: str = typer.Argument(..., help="Name of the agent")):
                     if keep_ownership:
                         entry["options"] = {"keep_ownership": True}
 
-            add_db_to_json(path, entry)
+            db_entries.append(entry)
             break
         else:
             db_engine = questionary.select(
@@ -319,315 +426,57 @@ def add_db(name: str = typer.Argument(..., help="Name of the agent")):
                 if not db_variant:
                     raise typer.Exit()
 
-            env_vars = {}
-            snippet = ""
-            service_name = ""
-            db_name = ""
-            db_container_path = ""
-            db_user = ""
-            db_pass = ""
-            db_port = 0
-            pg_options = None
-
             if db_engine == "sqlite":
                 db_name = Prompt.ask("Database Name", default="local")
                 if not db_name.endswith(".sqlite"):
                     db_name += ".sqlite"
 
-                compose_path = path / "docker-compose.yml"
-                if compose_path.exists():
-                    content = compose_path.read_text()
-                    lines = content.splitlines(keepends=True)
-                    new_lines = []
-                    in_app_service = False
-                    inserted = False
-
-                    for line in lines:
-                        new_lines.append(line)
-                        if not inserted:
-                            if re.search(r"^  app:", line):
-                                in_app_service = True
-                            elif in_app_service and re.search(r"^    volumes:", line):
-                                new_lines.append(
-                                    f"      - ./{db_name}:/config/{db_name}\n"
-                                )
-                                in_app_service = False
-                                inserted = True
-                            elif in_app_service and re.search(r"^  [a-zA-Z]", line):
-                                in_app_service = False
-
-                    with open(compose_path, "w") as f:
-                        f.writelines(new_lines)
-
-                add_db_to_json(
-                    path,
+                if compose is not None:
+                    compose.add_mount(f"./{db_name}:/config/{db_name}")
+
+                db_entries.append(
                     {
                         "name": db_name,
                         "database": f"/config/{db_name}",
                         "type": "sqlite",
                         "generated_id": str(uuid.uuid4()),
-                    },
+                    }
                 )
                 console.print(f"[success]✔ Added SQLite database ({db_name})[/success]")
+                break
 
-            elif db_engine in ["postgresql", "postgresql-cluster"]:
-                db_port = get_free_port()
-                db_user = "admin"
-                db_pass = generate_password(16)
-                db_name = f"pg_{secrets.token_hex(4)}"
-                service_name = f"db-pg-{secrets.token_hex(2)}"
-                var_prefix = service_name.upper().replace("-", "_")
-                env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                env_vars[f"{var_prefix}_DB"] = db_name
-                env_vars[f"{var_prefix}_USER"] = db_user
-                env_vars[f"{var_prefix}_PASS"] = db_pass
-                snippet = (
-                    AGENT_POSTGRES_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                    .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                    .replace("${VOL_NAME}", f"{service_name}-data")
-                    .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                    .replace("${USER}", f"${{{var_prefix}_USER}}")
-                    .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                )
-
-                if db_engine == "postgresql":
-                    console.print(
-                        "[info]ℹ When enabled, omits [bold]--no-owner[/bold] and "
-                        "[bold]--no-privileges[/bold] from the dump. Ownership and role "
-                        "assignments are preserved in the output. By default, these flags "
-                        "are applied to keep restores portable across different users and "
-                        "environments, for example when migrating from one database "
-                        "instance to another.[/info]"
-                    )
-                    keep_ownership = questionary.confirm(
-                        "Keep ownership?",
-                        default=False,
-                        style=questionary_style,
-                    ).ask()
-                    if keep_ownership is None:
-                        raise typer.Exit()
-                    if keep_ownership:
-                        pg_options = {"keep_ownership": True}
-
-            elif db_engine in ["mysql", "mariadb"]:
-                db_port = get_free_port()
-                db_user = "admin"
-                db_pass = generate_password(16)
-                db_name = f"mysql_{secrets.token_hex(4)}"
-                service_name = f"db-mariadb-{secrets.token_hex(2)}"
-                var_prefix = service_name.upper().replace("-", "_")
-                env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                env_vars[f"{var_prefix}_DB"] = db_name
-                env_vars[f"{var_prefix}_USER"] = db_user
-                env_vars[f"{var_prefix}_PASS"] = db_pass
-                snippet = (
-                    AGENT_MARIADB_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                    .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                    .replace("${VOL_NAME}", f"{service_name}-data")
-                    .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                    .replace("${USER}", f"${{{var_prefix}_USER}}")
-                    .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                )
-
-            elif db_engine == "mongodb":
-                db_port = get_free_port()
-                db_name = f"mongo_{secrets.token_hex(4)}"
-                if db_variant == "with-auth":
-                    db_user = "admin"
-                    db_pass = generate_password(16)
-                    service_name = f"db-mongo-auth-{secrets.token_hex(2)}"
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                    env_vars[f"{var_prefix}_DB"] = db_name
-                    env_vars[f"{var_prefix}_USER"] = db_user
-                    env_vars[f"{var_prefix}_PASS"] = db_pass
-                    snippet = (
-                        AGENT_MONGODB_AUTH_SNIPPET.replace(
-                            "${SERVICE_NAME}", service_name
-                        )
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                        .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                        .replace("${USER}", f"${{{var_prefix}_USER}}")
-                        .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                    )
-                else:
-                    service_name = f"db-mongo-{secrets.token_hex(2)}"
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                    env_vars[f"{var_prefix}_DB"] = db_name
-                    snippet = (
-                        AGENT_MONGODB_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                        .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                    )
+            local_db = build_local_database(db_engine, db_variant, owner=str(path))
 
-            elif db_engine == "firebird":
-                db_port = get_free_port()
-                db_user = "alice"
-                db_pass = generate_password(16)
-                db_root_pass = generate_password(16)
-                db_name = "mirror.fdb"
-                db_container_path = f"/var/lib/firebird/data/{db_name}"
-                service_name = f"db-firebird-{secrets.token_hex(2)}"
-                var_prefix = service_name.upper().replace("-", "_")
-                env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                env_vars[f"{var_prefix}_DB"] = db_name
-                env_vars[f"{var_prefix}_USER"] = db_user
-                env_vars[f"{var_prefix}_PASS"] = db_pass
-                env_vars[f"{var_prefix}_ROOT_PASS"] = db_root_pass
-                snippet = (
-                    AGENT_FIREBIRD_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                    .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                    .replace("${VOL_NAME}", f"{service_name}-data")
-                    .replace("${DB_NAME}", f"${{{var_prefix}_DB}}")
-                    .replace("${USER}", f"${{{var_prefix}_USER}}")
-                    .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                    .replace("${ROOT_PASSWORD}", f"${{{var_prefix}_ROOT_PASS}}")
+            if db_engine == "postgresql":
+                console.print(
+                    "[info]ℹ When enabled, omits [bold]--no-owner[/bold] and "
+                    "[bold]--no-privileges[/bold] from the dump. Ownership and role "
+                    "assignments are preserved in the output. By default, these flags "
+                    "are applied to keep restores portable across different users and "
+                    "environments, for example when migrating from one database "
+                    "instance to another.[/info]"
                 )
+                keep_ownership = questionary.confirm(
+                    "Keep ownership?",
+                    default=False,
+                    style=questionary_style,
+                ).ask()
+                if keep_ownership is None:
+                    raise typer.Exit()
+                if keep_ownership:
+                    local_db["entry"]["options"] = {"keep_ownership": True}
 
-            elif db_engine == "redis":
-                db_port = get_free_port()
-                db_name = f"redis_{secrets.token_hex(4)}"
-                if db_variant == "with-auth":
-                    db_pass = generate_password(16)
-                    service_name = f"db-redis-auth-{secrets.token_hex(2)}"
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                    env_vars[f"{var_prefix}_PASS"] = db_pass
-                    snippet = (
-                        AGENT_REDIS_AUTH_SNIPPET.replace(
-                            "${SERVICE_NAME}", service_name
-                        )
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                        .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                    )
-                else:
-                    service_name = f"db-redis-{secrets.token_hex(2)}"
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                    snippet = (
-                        AGENT_REDIS_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                    )
-
-            elif db_engine == "valkey":
-                db_port = get_free_port()
-                db_name = f"valkey_{secrets.token_hex(4)}"
-                if db_variant == "with-auth":
-                    db_pass = generate_password(16)
-                    service_name = f"db-valkey-auth-{secrets.token_hex(2)}"
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                    env_vars[f"{var_prefix}_PASS"] = db_pass
-                    snippet = (
-                        AGENT_VALKEY_AUTH_SNIPPET.replace(
-                            "${SERVICE_NAME}", service_name
-                        )
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                        .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                    )
-                else:
-                    service_name = f"db-valkey-{secrets.token_hex(2)}"
-                    var_prefix = service_name.upper().replace("-", "_")
-                    env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                    snippet = (
-                        AGENT_VALKEY_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                        .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                        .replace("${VOL_NAME}", f"{service_name}-data")
-                    )
-
-            elif db_engine == "mssql":
-                db_port = get_free_port()
-                db_pass = generate_password(16)
-                db_name = "master"
-                service_name = f"db-mssql-{secrets.token_hex(2)}"
-                var_prefix = service_name.upper().replace("-", "_")
-                env_vars[f"{var_prefix}_PORT"] = str(db_port)
-                env_vars[f"{var_prefix}_PASS"] = db_pass
-                snippet = (
-                    AGENT_MSSQL_SNIPPET.replace("${SERVICE_NAME}", service_name)
-                    .replace("${PORT}", f"${{{var_prefix}_PORT}}")
-                    .replace("${VOL_NAME}", f"{service_name}-data")
-                    .replace("${PASSWORD}", f"${{{var_prefix}_PASS}}")
-                )
+            if compose is not None:
+                compose.add_service(local_db["service_name"], local_db["service"])
+                compose.add_volume(local_db["volume"])
 
-            compose_path = path / "docker-compose.yml"
-            if compose_path.exists():
-                content = compose_path.read_text()
-
-                vol_match = re.search(r"^volumes:", content, re.MULTILINE)
-                net_match = re.search(r"^networks:", content, re.MULTILINE)
-
-                if vol_match:
-                    insert_pos = vol_match.start()
-                elif net_match:
-                    insert_pos = net_match.start()
-                else:
-                    insert_pos = len(content)
-
-                content = content[:insert_pos] + snippet + "\n" + content[insert_pos:]
-
-                vol_match = re.search(r"^volumes:", content, re.MULTILINE)
-                net_match = re.search(r"^networks:", content, re.MULTILINE)
-                vol_entry = f"  {service_name}-data:\n"
-
-                if vol_match:
-                    if net_match and net_match.start() > vol_match.start():
-                        content = (
-                            content[: net_match.start()]
-                            + vol_entry
-                            + content[net_match.start() :]
-                        )
-                    else:
-                        if not content.endswith("\n"):
-                            content += "\n"
-                        content += vol_entry
-                else:
-                    if not content.endswith("\n"):
-                        content += "\n"
-                    content += "\nvolumes:\n" + vol_entry
-
-                with open(compose_path, "w") as f:
-                    f.write(content)
-
-        if db_engine != "sqlite":
-            write_env_file(path, env_vars)
-            new_entry = {
-                "name": "mirror.fdb" if db_engine == "firebird" else db_name,
-                "database": db_container_path
-                if db_engine == "firebird"
-                else ("0" if db_engine in ["redis", "valkey"] else db_name),
-                "type": db_engine,
-                "username": "sa" if db_engine == "mssql" else db_user,
-                "password": db_pass,
-                "port": 5432
-                if db_engine in ["postgresql", "postgresql-cluster"]
-                else (
-                    3050
-                    if db_engine == "firebird"
-                    else (
-                        3306
-                        if db_engine in ["mysql", "mariadb"]
-                        else (
-                            1433
-                            if db_engine == "mssql"
-                            else (6379 if db_engine in ["redis", "valkey"] else 27017)
-                        )
-                    )
-                ),
-                "host": service_name,
-                "generated_id": str(uuid.uuid4()),
-            }
-            if pg_options is not None:
-                new_entry["options"] = pg_options
-            add_db_to_json(path, new_entry)
+            write_env_file(path, local_db["env_vars"])
+            db_entries.append(local_db["entry"])
         break
 
+    if compose is not None:
+        compose.save()
+    add_dbs_to_json(path, db_entries)
     console.print("[success]✔ Database added to configuration.[/success]")
     console.print(
         "[info]Restart the agent to apply changes: [/info]"
@@ -637,8 +486,7 @@ def add_db(name: str = typer.Argument(..., help="Name of the agent")):
 
 @app.command("remove")
 def remove_db(name: str = typer.Argument(..., help="Name of the agent")):
-    path = Path(name).resolve()
-    validate_work_dir(path)
+    path = resolve_component(name)
 
     config = load_db_config(path)
     dbs = config.get("databases", [])
@@ -650,11 +498,103 @@ def remove_db(name: str = typer.Argument(..., help="Name of the agent")):
     options = [f"{db['name']} ({db['type']})" for db in dbs]
     choice = Prompt.ask("Which database to remove?", choices=options)
 
-    index = options.index(choice)
-    removed = dbs.pop(index)
-
-    config["databases"] = dbs
-    save_db_config(path, config)
+    removed = dbs[options.index(choice)]
+
+    with db_config_transaction(path) as config:
+        # Re-read under the lock so a concurrent edit is not lost.
+        if removed in config["databases"]:
+            config["databases"].remove(removed)
+
+    compose = load_compose(path)
+    if compose is not None:
+        changed = False
+        if removed.get("type") == "sqlite" and removed["database"].startswith("/config/"):
+            file_name = removed["database"][len("/config/") :]
+            changed = compose.remove_mount(f"./{file_name}:{removed['database']}")
+        elif removed.get("host", "").startswith("db-"):
+            # Containers created by `db add` / the wizard are named db-<engine>-<id>.
+            changed = compose.remove_service(removed["host"])
+        if changed:
+            compose.save()
 
     console.print(f"[success]✔ Removed {removed['name']}[/success]")
     console.print("[info]Restart the agent to apply changes.[/info]")
+
+
+@app.command("import")
+def import_dbs(
+    name: str = typer.Argument(..., help="Name of the agent"),
+    file: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="JSON, YAML or CSV file with the databases"
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Validate and report without writing anything"
+    ),
+):
+    """Register many existing databases at once."""
+    path = resolve_component(name)
+
+    errors = []
+    entries = [
+        entry
+        for index, raw in enumerate(read_import_file(file))
+        if (entry := build_import_entry(raw, f"{file.name}[{index}]", errors))
+    ]
+    if errors:
+        console.print("[danger]✖ Invalid import file:[/danger]")
+        for error in errors:
+            console.print(f"  [danger]•[/danger] {error}")
+        raise typer.Exit(1)
+
+    def split_new(existing: list) -> tuple[list, int]:
+        ids = {db.get("generated_id") for db in existing}
+        seen = {db_identity(db) for db in existing}
+        new = []
+        for entry in entries:
+            key = db_identity(entry)
+            if entry["generated_id"] in ids or key in seen:
+                continue
+            ids.add(entry["generated_id"])
+            seen.add(key)
+            new.append(entry)
+        return new, len(entries) - len(new)
+
+    if dry_run:
+        new, skipped = split_new(load_db_config(path).get("databases", []))
+    else:
+        with db_config_transaction(path) as config:
+            # Deduplicate under the lock so concurrent imports never add twice.
+            new, skipped = split_new(config["databases"])
+            config["databases"].extend(new)
+
+    if dry_run:
+        console.print(
+            f"[info]ℹ Dry run: {len(new)} database(s) would be added, "
+            f"{skipped} already configured.[/info]"
+        )
+        return
+
+    mounts = [
+        f"./{db['database'][len('/config/'):]}:{db['database']}"
+        for db in new
+        if db["type"] == "sqlite" and db["database"].startswith("/config/")
+    ]
+    needs_socket = any(db["type"] == "docker-volume" for db in new)
+    if mounts or needs_socket:
+        compose = load_compose(path)
+        if needs_socket:
+            ensure_docker_socket(compose)
+        if compose is not None:
+            for mount in mounts:
+                compose.add_mount(mount)
+            compose.save()
+
+    console.print(
+        f"[success]✔ Imported {len(new)} database(s)[/success]"
+        + (f" [dim]({skipped} already configured, skipped)[/dim]" if skipped else "")
+    )
+    if new:
+        console.print(
+            "[info]Restart the agent to apply changes: [/info]"
+            + f"portabase restart {name}"
+        )
@@ -0,0 +1,334 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import typer
+import yaml
+from rich.table import Table
+
+from commands.agent import build_local_database, render_agent_compose
+from core.config import (
+    register_component,
+    save_db_config,
+    write_env_file,
+    write_file,
+)
+from core.docker import ensure_network, run_compose
+from core.network import fetch_template
+from core.ports import lease_ports, release_ports
+from core.trace import propagate
+from core.utils import (
+    check_system,
+    console,
+    current_version,
+    get_random_hint,
+    print_banner,
+    validate_edge_key,
+)
+from templates.compose import DATABASE_ENGINES, DEFAULT_PORTS
+
+EXTERNAL_DB_TYPES = [
+    "postgresql",
+    "postgresql-cluster",
+    "mysql",
+    "mariadb",
+    "sqlite",
+    "firebird",
+    "mongodb",
+    "redis",
+    "valkey",
+    "mssql",
+]
+
+AGENT_DEFAULTS = {
+    "tz": "UTC",
+    "polling": 5,
+    "host_gateway": False,
+    "overwrite": False,
+    "start": False,
+    "databases": [],
+}
+
+
+def load_fleet_spec(spec_file: Path) -> list:
+    """Read a fleet YAML file and return the validated list of agent specs."""
+    try:
+        with open(spec_file, "r") as f:
+            data = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        console.print(f"[danger]✖ Could not read fleet file:[/danger] {e}")
+        raise typer.Exit(1)
+
+    if not isinstance(data, dict) or not isinstance(data.get("agents"), list):
+        console.print("[danger]✖ Fleet file must contain an 'agents' list.[/danger]")
+        raise typer.Exit(1)
+
+    defaults = {**AGENT_DEFAULTS, **(data.get("defaults") or {})}
+    agents = []
+    errors = []
+    seen = set()
+
+    for index, raw in enumerate(data["agents"]):
+        spec = {**defaults, **(raw or {})}
+        label = spec.get("name") or f"agents[{index}]"
+
+        if not spec.get("name"):
+            errors.append(f"{label}: 'name' is required")
+        elif spec["name"] in seen:
+            errors.append(f"{label}: duplicate agent name")
+        seen.add(spec.get("name"))
+
+        if not spec.get("key") or not validate_edge_key(str(spec["key"])):
+            errors.append(f"{label}: missing or invalid Edge Key")
+
+        for db_index, db in enumerate(spec.get("databases") or []):
+            db_label = f"{label}.databases[{db_index}]"
+            if not isinstance(db, dict):
+                errors.append(f"{db_label}: must be a mapping")
+                continue
+
+            db_type = db.get("type")
+            if db_type == "docker-volume":
+                if not db.get("volume_name"):
+                    errors.append(f"{db_label}: 'volume_name' is required")
+            elif db.get("new"):
+                if db_type != "sqlite" and (db_type, "no-auth") not in DATABASE_ENGINES:
+                    errors.append(f"{db_label}: unsupported engine '{db_type}'")
+            elif db_type not in EXTERNAL_DB_TYPES:
+                errors.append(f"{db_label}: unsupported type '{db_type}'")
+            elif db_type != "sqlite" and not db.get("database"):
+                errors.append(f"{db_label}: 'database' is required")
+
+        agents.append(spec)
+
+    if errors:
+        console.print("[danger]✖ Invalid fleet file:[/danger]")
+        for error in errors:
+            console.print(f"  [danger]•[/danger] {error}")
+        raise typer.Exit(1)
+
+    return agents
+
+
+def needs_port(db: dict) -> bool:
+    return bool(db.get("new")) and db["type"] not in ("sqlite", "docker-volume")
+
+
+def build_database(
+    db: dict, app_volumes: list, port: int | None = None
+) -> tuple[dict, dict | None]:
+    """Return the databases.json entry and, for new containers, the local service."""
+    db_type = db["type"]
+
+    if db_type == "docker-volume":
+        sock_mount = "/var/run/docker.sock:/var/run/docker.sock"
+        if sock_mount not in app_volumes:
+            app_volumes.append(sock_mount)
+        entry = {
+            "name": db.get("name", "Docker Volume"),
+            "type": "docker-volume",
+            "volume_name": db["volume_name"],
+            "generated_id": str(uuid.uuid4()),
+        }
+        if db.get("container_name"):
+            entry["container_name"] = db["container_name"]
+        return entry, None
+
+    if db_type == "sqlite":
+        db_name = str(db.get("database", "local"))
+        if db.get("new") and not db_name.endswith(".sqlite"):
+            db_name += ".sqlite"
+        if db_name.startswith("/"):
+            container_path = db_name
+        else:
+            app_volumes.append(f"./{db_name}:/config/{db_name}")
+            container_path = f"/config/{db_name}"
+        entry = {
+            "name": db.get("name", db_name),
+            "database": container_path,
+            "type": "sqlite",
+            "generated_id": str(uuid.uuid4()),
+        }
+        return entry, None
+
+    if db.get("new"):
+        local_db = build_local_database(
+            db_type, "with-auth" if db.get("auth") else "no-auth", port=port
+        )
+        entry = local_db["entry"]
+    else:
+        local_db = None
+        entry = {
+            "name": db.get("name", "External DB"),
+            "database": str(db["database"]),
+            "type": db_type,
+            "username": db.get("username", ""),
+            "password": db.get("password", ""),
+            "port": int(db.get("port", DEFAULT_PORTS.get(db_type, 27017))),
+            "host": db.get("host", "localhost"),
+            "generated_id": str(uuid.uuid4()),
+        }
+
+    if db_type == "postgresql" and db.get("keep_ownership"):
+        entry["options"] = {"keep_ownership": True}
+    return entry, local_db
+
+
+def provision_agent(spec: dict, template: str, start: bool) -> dict:
+    path = Path(spec["name"]).resolve()
+    result = {
+        "name": spec["name"],
+        "path": path,
+        "databases": 0,
+        "written": False,
+        "start": start or spec["start"],
+        "error": None,
+    }
+
+    try:
+        if path.exists() and any(path.iterdir()) and not spec["overwrite"]:
+            raise ValueError("directory already exists (set 'overwrite: true')")
+        path.mkdir(parents=True, exist_ok=True)
+
+        env_vars = {
+            "EDGE_KEY": str(spec["key"]),
+            "TZ": spec["tz"],
+            "POLLING": str(spec["polling"]),
+            "LOG_LEVEL": "info",
+        }
+        app_volumes = ["./databases.json:/config/config.json"]
+        volumes_list = []
+        extra_services = {}
+        entries = []
+        ports = list(spec.get("ports") or [])
+
+        for db in spec["databases"] or []:
+            port = ports.pop(0) if needs_port(db) and ports else None
+            entry, local_db = build_database(db, app_volumes, port)
+            entries.append(entry)
+            if local_db:
+                env_vars.update(local_db["env_vars"])
+                extra_services[local_db["service_name"]] = local_db["service"]
+                volumes_list.append(local_db["volume"])
+
+        final_compose = render_agent_compose(
+            template, extra_services, volumes_list, app_volumes, spec["host_gateway"]
+        )
+
+        save_db_config(path, {"databases": entries})
+        write_file(path / "docker-compose.yml", final_compose)
+        write_env_file(path, env_vars)
+        result["databases"] = len(entries)
+        result["written"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def start_agent(result: dict) -> dict:
+    try:
+        run_compose(result["path"], ["up", "-d"])
+    except typer.Exit:
+        result["error"] = "docker compose up failed"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def provision_fleet(
+    spec_file: Path,
+    parallel: int = 4,
+    start: bool = False,
+    offline: bool = False,
+    refresh_template: bool = False,
+):
+    agents = load_fleet_spec(spec_file)
+
+    print_banner()
+    check_system()
+    ensure_network("portabase_network")
+    template = fetch_template("agent.yml", offline=offline, refresh=refresh_template)
+
+    # Reserve every container port of the fleet up front, in a single lease.
+    # Each port is owned by its agent's folder, which `uninstall` releases.
+    counts = [sum(needs_port(db) for db in spec["databases"] or []) for spec in agents]
+    owners = [
+        str(Path(spec["name"]).resolve())
+        for spec, count in zip(agents, counts)
+        for _ in range(count)
+    ]
+    try:
+        ports = lease_ports(owners)
+    except RuntimeError as e:
+        console.print(f"[danger]✖ {e}[/danger]")
+        raise typer.Exit(1)
+    for spec, count in zip(agents, counts):
+        spec["ports"], ports = ports[:count], ports[count:]
+
+    status_msg = (
+        f"[bold magenta]Provisioning {len(agents)} agents...[/bold magenta]\n"
+        f"{get_random_hint()}"
+    )
+    with console.status(status_msg, spinner="earth"):
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            results = list(
+                pool.map(propagate(lambda spec: provision_agent(spec, template, start)), agents)
+            )
+
+    for result in results:
+        if not result["written"]:
+            release_ports(str(result["path"]))
+
+    to_start = [r for r in results if r["written"] and r["start"]]
+    if to_start:
+        from core.images import prepull_images
+
+        # Pull every image once for the whole fleet instead of once per agent.
+        prepull_images([r["path"] for r in to_start], parallel)
+        status_msg = (
+            f"[bold magenta]Starting {len(to_start)} agents...[/bold magenta]\n"
+            f"{get_random_hint()}"
+        )
+        with console.status(status_msg, spinner="earth"):
+            with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+                list(pool.map(propagate(start_agent), to_start))
+
+    version = current_version()
+    for result in results:
+        if result["written"]:
+            result["registered_as"] = register_component(result["path"], "agent", version)
+
+    summary = Table(title="Fleet Provisioning")
+    summary.add_column("Agent", style="cyan")
+    summary.add_column("Path", style="white")
+    summary.add_column("Databases", style="magenta")
+    summary.add_column("Status")
+
+    for result in results:
+        summary.add_row(
+            result["name"],
+            str(result["path"]),
+            str(result["databases"]),
+            (
+                f"[danger]✖ {result['error']}[/danger]"
+                if result["error"]
+                else "[success]✔ Ready[/success]"
+            ),
+        )
+    console.print(summary)
+
+    for result in results:
+        registered_name = result.get("registered_as")
+        if registered_name and registered_name != result["path"].name:
+            console.print(
+                f"[info]ℹ Another component is already named '{result['path'].name}', "
+                f"refer to {result['path']} as '{registered_name}'.[/info]"
+            )
+
+    failed = [r for r in results if r["error"]]
+    if failed:
+        console.print(
+            f"[danger]✖ {len(failed)} of {len(results)} agents failed.[/danger]"
+        )
+        raise typer.Exit(1)
+    console.print(f"[success]✔ {len(results)} agents provisioned.[/success]")
@@ -0,0 +1,136 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+from rich.table import Table
+
+from core.config import load_components
+from core.docker import inspect_project
+from core.trace import propagate
+from core.utils import component_type, console, discover_components
+
+STATE_STYLES = {
+    "running": "green",
+    "restarting": "yellow",
+    "paused": "yellow",
+    "exited": "red",
+    "dead": "red",
+}
+
+HEALTH_STYLES = {
+    "healthy": "green",
+    "starting": "yellow",
+    "unhealthy": "red",
+}
+
+
+def format_uptime(started_at: str) -> str:
+    # Docker reports nanoseconds, fromisoformat only understands microseconds.
+    started = datetime.fromisoformat(started_at[:19] + "+00:00")
+    seconds = int((datetime.now(timezone.utc) - started).total_seconds())
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+def collect_status(path: Path) -> dict:
+    component = {
+        "name": path.name,
+        "path": str(path),
+        "type": component_type(path),
+        "services": [],
+        "error": None,
+    }
+    try:
+        containers = inspect_project(path)
+    except Exception as e:
+        component["error"] = str(e)
+        return component
+
+    for container in containers:
+        state = container.get("State", {})
+        labels = container.get("Config", {}).get("Labels") or {}
+        running = state.get("Status") == "running"
+        component["services"].append(
+            {
+                "service": labels.get("com.docker.compose.service", ""),
+                "container": container.get("Name", "").lstrip("/"),
+                "state": state.get("Status", "unknown"),
+                "health": (state.get("Health") or {}).get("Status"),
+                "started_at": state.get("StartedAt") if running else None,
+                "uptime": format_uptime(state["StartedAt"]) if running else None,
+                "restarts": container.get("RestartCount", 0),
+            }
+        )
+    component["services"].sort(key=lambda s: s["service"])
+    return component
+
+
+def status(
+    paths: Optional[List[Path]] = typer.Argument(
+        None, help="Component folders, or folders containing them (default: registered)"
+    ),
+    as_json: bool = typer.Option(False, "--json", help="Print machine-readable JSON"),
+    parallel: int = typer.Option(
+        8, "--parallel", "-p", help="Number of components queried at once"
+    ),
+):
+    if paths:
+        roots = paths
+    else:
+        roots = [Path(c["path"]) for c in load_components().values()] + [Path.cwd()]
+    components = discover_components(roots)
+
+    if not components:
+        if as_json:
+            print("[]")
+            return
+        console.print("[warning]No Portabase components found.[/warning]")
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        results = list(pool.map(propagate(collect_status), components))
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+
+    table = Table(title="Portabase Components")
+    table.add_column("Component", style="cyan")
+    table.add_column("Type", style="magenta")
+    table.add_column("Service", style="white")
+    table.add_column("State")
+    table.add_column("Health")
+    table.add_column("Uptime", style="green")
+    table.add_column("Restarts", justify="right")
+
+    for component in results:
+        if component["error"] or not component["services"]:
+            message = component["error"] or "not created"
+            table.add_row(
+                component["name"], component["type"], "-", f"[dim]{message}[/dim]"
+            )
+            continue
+        for index, service in enumerate(component["services"]):
+            state_style = STATE_STYLES.get(service["state"], "white")
+            health = service["health"]
+            table.add_row(
+                component["name"] if index == 0 else "",
+                component["type"] if index == 0 else "",
+                service["service"],
+                f"[{state_style}]{service['state']}[/{state_style}]",
+                f"[{HEALTH_STYLES.get(health, 'white')}]{health}[/]" if health else "-",
+                service["uptime"] or "-",
+                str(service["restarts"]),
+            )
+    console.print(table)
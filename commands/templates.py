@@ -0,0 +1,34 @@
+import shutil
+
+import requests
+import typer
+
+from core.config import TEMPLATE_CACHE_DIR, TEMPLATE_FILES
+from core.network import fetch_template, template_cache_path
+from core.utils import console
+
+app = typer.Typer(help="Manage the local compose templates cache.")
+
+
+@app.command()
+def prefetch():
+    failed = False
+    for filename in TEMPLATE_FILES:
+        try:
+            fetch_template(filename, refresh=True, quiet=True)
+        except requests.RequestException as e:
+            console.print(f"[danger]✖ Could not fetch {filename}:[/danger] [dim]{e}[/dim]")
+            failed = True
+            continue
+        console.print(
+            f"[success]✔ Cached {filename}[/success] [dim]({template_cache_path(filename)})[/dim]"
+        )
+    if failed:
+        raise typer.Exit(1)
+
+
+@app.command()
+def clear():
+    if TEMPLATE_CACHE_DIR.exists():
+        shutil.rmtree(TEMPLATE_CACHE_DIR)
+    console.print("[success]✔ Templates cache cleared[/success]")
@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import yaml
+
+from core.config import write_file
+
+AGENT_CONFIG_MOUNT = "./databases.json:/config/config.json"
+TEMPLATE_PLACEHOLDERS = ("{{EXTRA_SERVICES}}", "{{EXTRA_VOLUMES}}")
+TOP_LEVEL_ORDER = ["name", "services", "volumes", "networks"]
+
+
+class ComposeDumper(yaml.SafeDumper):
+    """Dump like a hand-written compose file: indented lists, bare `key:` for nulls."""
+
+    def increase_indent(self, flow=False, indentless=False):
+        return super().increase_indent(flow, False)
+
+
+ComposeDumper.add_representer(
+    type(None), lambda dumper, _: dumper.represent_scalar("tag:yaml.org,2002:null", "")
+)
+
+
+def parse_snippet(snippet: str) -> dict:
+    """Parse a `services:` fragment (one or more indented services) into a dict."""
+    return yaml.safe_load(snippet) or {}
+
+
+class ComposeFile:
+    """A docker-compose.yml parsed once, edited as data and serialized once."""
+
+    def __init__(self, data: dict | None = None, path: Path | None = None):
+        self.data = data or {}
+        self.path = path
+
+    @classmethod
+    def from_string(cls, text: str, path: Path | None = None) -> "ComposeFile":
+        # Older remote templates still carry the text placeholders of the string splicer.
+        lines = [
+            line for line in text.splitlines() if line.strip() not in TEMPLATE_PLACEHOLDERS
+        ]
+        data = yaml.safe_load("\n".join(lines)) or {}
+        if not isinstance(data, dict):
+            raise ValueError("compose file must be a mapping")
+        return cls(data, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "ComposeFile":
+        return cls.from_string(path.read_text(), path)
+
+    def section(self, key: str) -> dict:
+        if not isinstance(self.data.get(key), dict):
+            self.data[key] = {}
+        return self.data[key]
+
+    @property
+    def services(self) -> dict:
+        return self.section("services")
+
+    @property
+    def volumes(self) -> dict:
+        return self.section("volumes")
+
+    def agent_service(self) -> str | None:
+        """Name of the service that mounts databases.json, i.e. the agent itself."""
+        for name, service in self.services.items():
+            if AGENT_CONFIG_MOUNT in ((service or {}).get("volumes") or []):
+                return name
+        for name in ("agent", "app"):
+            if name in self.services:
+                return name
+        return None
+
+    def add_service(self, name: str, definition: dict):
+        self.services[name] = definition
+
+    def remove_service(self, name: str) -> bool:
+        """Drop a service and the named volumes no other service still uses."""
+        service = self.services.pop(name, None)
+        if service is None:
+            return False
+        for volume in self.named_volumes(service):
+            if not any(volume in self.named_volumes(s) for s in self.services.values()):
+                self.volumes.pop(volume, None)
+        return True
+
+    @staticmethod
+    def named_volumes(service: dict | None) -> list:
+        names = []
+        for mount in (service or {}).get("volumes") or []:
+            source = mount.split(":", 1)[0] if isinstance(mount, str) else None
+            if source and not source.startswith((".", "/", "~", "$")):
+                names.append(source)
+        return names
+
+    def add_volume(self, name: str):
+        self.volumes.setdefault(name, None)
+
+    def add_mount(self, mount: str, service: str | None = None) -> bool:
+        definition = self.services.get(service or self.agent_service())
+        if definition is None:
+            return False
+        mounts = definition.setdefault("volumes", [])
+        if mount not in mounts:
+            mounts.append(mount)
+        return True
+
+    def remove_mount(self, mount: str, service: str | None = None) -> bool:
+        definition = self.services.get(service or self.agent_service()) or {}
+        mounts = definition.get("volumes") or []
+        if mount not in mounts:
+            return False
+        mounts.remove(mount)
+        return True
+
+    def add_extra_host(self, host: str, service: str | None = None):
+        definition = self.services.get(service or self.agent_service())
+        if definition is not None:
+            hosts = definition.setdefault("extra_hosts", [])
+            if host not in hosts:
+                hosts.append(host)
+
+    def to_string(self) -> str:
+        keys = [k for k in TOP_LEVEL_ORDER if k in self.data]
+        keys += [k for k in self.data if k not in TOP_LEVEL_ORDER]
+        blocks = []
+        for key in keys:
+            if key == "volumes" and not self.data[key]:
+                continue
+            blocks.append(
+                yaml.dump(
+                    {key: self.data[key]},
+                    Dumper=ComposeDumper,
+                    sort_keys=False,
+                    default_flow_style=False,
+                    allow_unicode=True,
+                    width=4096,
+                )
+            )
+        return "\n".join(blocks)
+
+    def save(self, path: Path | None = None):
+        write_file(path or self.path, self.to_string())
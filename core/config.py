@@ -1,32 +1,97 @@
+import hashlib
 import json
 import os
+import tempfile
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 TEMPLATE_BASE_URL = "https://s3.eu-central-3.ionoscloud.com/portabase-software/cli/public/templates"
 GLOBAL_CONFIG_DIR = Path.home() / ".portabase"
 GLOBAL_CONFIG_FILE = GLOBAL_CONFIG_DIR / "config.json"
+TEMPLATE_CACHE_DIR = GLOBAL_CONFIG_DIR / "templates"
+TEMPLATE_CACHE_TTL = 86400
+TEMPLATE_FILES = ["agent.yml", "dashboard.yml"]
+COMPONENTS_FILE = GLOBAL_CONFIG_DIR / "components.json"
+PORT_LEASES_FILE = GLOBAL_CONFIG_DIR / "port_leases.json"
+LOCKS_DIR = GLOBAL_CONFIG_DIR / "locks"
+# Read once at import: os.umask can only be queried by setting it, which races with threads.
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive inter-process lock for `path`.
+
+    The lock file lives in LOCKS_DIR, named after a hash of the absolute path,
+    so component folders stay free of lock files.
+    """
+    digest = hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:16]
+    lock_path = LOCKS_DIR / f"{path.name.lstrip('.')}-{digest}.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
 
-def write_file(path: Path, content: str):
+def write_file(path: Path, content: str, mode: int | None = None):
+    """Write through a temp file and os.replace so readers never see a partial file."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        f.write(content)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        elif path.exists():
+            os.chmod(temp_path, path.stat().st_mode & 0o777)
+        else:
+            os.chmod(temp_path, 0o666 & ~UMASK)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
 
-def write_env_file(work_dir: Path, env_vars: dict):
-    existing = {}
+def load_env_file(work_dir: Path) -> dict:
+    env = {}
     env_path = work_dir / ".env"
     if env_path.exists():
         with open(env_path, "r") as f:
             for line in f:
                 if "=" in line:
                     k, v = line.strip().split("=", 1)
-                    existing[k] = v.strip('"')
-    
-    existing.update(env_vars)
-    content = ""
-    for k, v in existing.items():
-        content += f'{k}="{v}"\n'
-    write_file(env_path, content)
+                    env[k] = v.strip('"')
+    return env
+
+def write_env_file(work_dir: Path, env_vars: dict):
+    env_path = work_dir / ".env"
+    with file_lock(env_path):
+        existing = load_env_file(work_dir)
+        existing.update(env_vars)
+        content = ""
+        for k, v in existing.items():
+            content += f'{k}="{v}"\n'
+        write_file(env_path, content)
 
 def load_global_config() -> dict:
     if not GLOBAL_CONFIG_FILE.exists():
@@ -38,18 +103,65 @@ def load_global_config() -> dict:
         return {}
 
 def save_global_config(config: dict):
-    GLOBAL_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(GLOBAL_CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    write_file(GLOBAL_CONFIG_FILE, json.dumps(config, indent=2))
 
 def get_config_value(key: str, default=None):
     config = load_global_config()
     return config.get(key, default)
 
 def set_config_value(key: str, value):
-    config = load_global_config()
-    config[key] = value
-    save_global_config(config)
+    with file_lock(GLOBAL_CONFIG_FILE):
+        config = load_global_config()
+        config[key] = value
+        save_global_config(config)
+
+def load_components() -> dict:
+    if not COMPONENTS_FILE.exists():
+        return {}
+    try:
+        with open(COMPONENTS_FILE, "r") as f:
+            return json.load(f).get("components", {})
+    except:
+        return {}
+
+def save_components(components: dict):
+    write_file(COMPONENTS_FILE, json.dumps({"components": components}, indent=2))
+
+def register_component(path: Path, component_type: str, version: str) -> str:
+    """Index the component by folder name and return that name.
+
+    Another live component with the same folder name is never replaced: the
+    new one gets a numbered name ("agent-2") instead.
+    """
+    with file_lock(COMPONENTS_FILE):
+        components = load_components()
+        key = next((n for n, c in components.items() if c.get("path") == str(path)), None)
+        if key is None:
+            key, suffix = path.name, 2
+            while key in components and Path(components[key].get("path", "")).exists():
+                key, suffix = f"{path.name}-{suffix}", suffix + 1
+        components[key] = {
+            "path": str(path),
+            "type": component_type,
+            "project": path.name.lower().replace(" ", "_"),
+            "version": version,
+            "created_at": time.time(),
+        }
+        save_components(components)
+    return key
+
+def unregister_component(path: Path):
+    with file_lock(COMPONENTS_FILE):
+        components = load_components()
+        stale = [name for name, c in components.items() if c.get("path") == str(path)]
+        for name in stale:
+            del components[name]
+        if stale:
+            save_components(components)
+
+def find_component(name: str) -> Path | None:
+    component = load_components().get(name)
+    return Path(component["path"]) if component else None
 
 def load_db_config(path: Path) -> dict:
     json_path = path / "databases.json"
@@ -62,21 +174,24 @@ def load_db_config(path: Path) -> dict:
         return {"databases": []}
 
 def save_db_config(path: Path, config: dict):
-    json_path = path / "databases.json"
-    with open(json_path, "w") as f:
-        json.dump(config, f, indent=2)
-    try:
-        os.chmod(json_path, 0o666)
-    except:
-        pass
+    # The agent container runs as another user and must be able to read it.
+    write_file(path / "databases.json", json.dumps(config, indent=2), mode=0o666)
+
+@contextmanager
+def db_config_transaction(path: Path):
+    """Lock databases.json, yield its content and write it back once if no error occurred."""
+    with file_lock(path / "databases.json"):
+        config = load_db_config(path)
+        config.setdefault("databases", [])
+        yield config
+        save_db_config(path, config)
+
+def add_dbs_to_json(path: Path, db_entries: list):
+    with db_config_transaction(path) as config:
+        for db_entry in db_entries:
+            if "generated_id" not in db_entry:
+                db_entry["generated_id"] = str(uuid.uuid4())
+            config["databases"].append(db_entry)
 
 def add_db_to_json(path: Path, db_entry: dict):
-    config = load_db_config(path)
-    if "databases" not in config:
-        config["databases"] = []
-    
-    if "generated_id" not in db_entry:
-        db_entry["generated_id"] = str(uuid.uuid4())
-        
-    config["databases"].append(db_entry)
-    save_db_config(path, config)
\ No newline at end of file
+    add_dbs_to_json(path, [db_entry])
@@ -0,0 +1,80 @@
+import bz2
+import struct
+
+BSDIFF_MAGIC = b"BSDIFF40"
+LOW_BITS = 0x7F
+HIGH_BIT = 0x80
+
+
+class PatchError(Exception):
+    pass
+
+
+def offtin(buf: bytes) -> int:
+    """bsdiff's 64-bit sign-magnitude little-endian integer."""
+    value = struct.unpack("<Q", buf)[0]
+    if value & (1 << 63):
+        return -(value & ~(1 << 63))
+    return value
+
+
+def add_bytes(diff: bytes, old: bytes) -> bytes:
+    """Byte-wise (a + b) % 256 over whole buffers, using big ints instead of a Python loop."""
+    size = len(diff)
+    if not size:
+        return b""
+    low = int.from_bytes(bytes([LOW_BITS]) * size, "little")
+    high = int.from_bytes(bytes([HIGH_BIT]) * size, "little")
+    a = int.from_bytes(diff, "little")
+    b = int.from_bytes(old, "little")
+    # Add the low 7 bits of every byte (no carry can cross a byte), then fold in the top bits.
+    total = ((a & low) + (b & low)) ^ ((a ^ b) & high)
+    return total.to_bytes(size, "little")
+
+
+def apply_bsdiff(old: bytes, patch: bytes) -> bytes:
+    """Apply a BSDIFF40 patch (as produced by `bsdiff`) to `old`."""
+    if len(patch) < 32 or patch[:8] != BSDIFF_MAGIC:
+        raise PatchError("not a BSDIFF40 patch")
+    ctrl_len = offtin(patch[8:16])
+    diff_len = offtin(patch[16:24])
+    new_size = offtin(patch[24:32])
+    if ctrl_len < 0 or diff_len < 0 or new_size < 0:
+        raise PatchError("corrupt patch header")
+
+    try:
+        ctrl = bz2.decompress(patch[32 : 32 + ctrl_len])
+        diff = bz2.decompress(patch[32 + ctrl_len : 32 + ctrl_len + diff_len])
+        extra = bz2.decompress(patch[32 + ctrl_len + diff_len :])
+    except (OSError, ValueError) as e:
+        raise PatchError(f"corrupt patch data: {e}")
+
+    new = bytearray()
+    old_pos = diff_pos = extra_pos = ctrl_pos = 0
+    while len(new) < new_size:
+        if ctrl_pos + 24 > len(ctrl):
+            raise PatchError("truncated control block")
+        add_len = offtin(ctrl[ctrl_pos : ctrl_pos + 8])
+        copy_len = offtin(ctrl[ctrl_pos + 8 : ctrl_pos + 16])
+        seek = offtin(ctrl[ctrl_pos + 16 : ctrl_pos + 24])
+        ctrl_pos += 24
+        if add_len < 0 or copy_len < 0 or len(new) + add_len + copy_len > new_size:
+            raise PatchError("corrupt control block")
+
+        # Bytes outside the old file count as zero, like bspatch does.
+        start = max(old_pos, 0)
+        end = min(max(old_pos + add_len, 0), len(old))
+        source = bytes(min(start - old_pos, add_len)) if start > old_pos else b""
+        source += old[start:end] if start < end else b""
+        source += bytes(add_len - len(source))
+        if diff_pos + add_len > len(diff):
+            raise PatchError("truncated diff block")
+        new += add_bytes(diff[diff_pos : diff_pos + add_len], source)
+        diff_pos += add_len
+        old_pos += add_len
+
+        new += extra[extra_pos : extra_pos + copy_len]
+        extra_pos += copy_len
+        old_pos += seek
+
+    return bytes(new)
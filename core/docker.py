@@ -1,19 +1,97 @@
+import json
 import subprocess
 import typer
+from core.docker_api import DockerAPIError, docker_binary, get_docker_api
+from core.trace import span, traced
 from core.utils import console
 from pathlib import Path
 
-def ensure_network(name: str):
+@traced("docker.ensure_network")
+def ensure_network(name: str, quiet: bool = False):
+    api = get_docker_api()
+    if api is not None:
+        try:
+            if api.inspect_network(name) is None:
+                api.create_network(name)
+            return
+        except (OSError, DockerAPIError):
+            pass
+
     try:
-        subprocess.run(["docker", "network", "inspect", name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        subprocess.run([docker_binary(), "network", "inspect", name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
     except subprocess.CalledProcessError:
-        subprocess.run(["docker", "network", "create", name], stdout=subprocess.DEVNULL, check=True)
+        subprocess.run(
+            [docker_binary(), "network", "create", name],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL if quiet else None,
+            check=True,
+        )
+
+def project_name(cwd: Path) -> str:
+    return cwd.name.lower().replace(" ", "_")
+
+def compose_command(cwd: Path, args: list) -> list:
+    return [docker_binary(), "compose", "-p", project_name(cwd)] + args
 
 def run_compose(cwd: Path, args: list):
-    try:
-        project_name = cwd.name.lower().replace(" ", "_")
-        cmd = ["docker", "compose", "-p", project_name] + args
-        subprocess.run(cmd, cwd=cwd, check=True)
-    except subprocess.CalledProcessError:
-        console.print("[danger]Command failed.[/danger]")
-        raise typer.Exit(1)
\ No newline at end of file
+    with span(f"compose.{args[0]}", project=project_name(cwd), args=args) as s:
+        try:
+            subprocess.run(compose_command(cwd, args), cwd=cwd, check=True)
+            s.set(exit_code=0)
+        except subprocess.CalledProcessError as e:
+            s.set(exit_code=e.returncode)
+            console.print("[danger]Command failed.[/danger]")
+            raise typer.Exit(1)
+
+def run_compose_captured(cwd: Path, args: list) -> subprocess.CompletedProcess:
+    """Run a compose command without raising, keeping its output for reporting."""
+    with span(f"compose.{args[0]}", project=project_name(cwd), args=args) as s:
+        result = subprocess.run(compose_command(cwd, args), cwd=cwd, capture_output=True, text=True)
+        s.set(exit_code=result.returncode)
+    return result
+
+def project_containers(cwd: Path) -> list:
+    """Containers of a compose project as Engine API summaries (Names, State, Status, Labels)."""
+    api = get_docker_api()
+    if api is not None:
+        try:
+            return api.list_containers(project_name(cwd))
+        except (OSError, DockerAPIError):
+            pass
+
+    result = run_compose_captured(cwd, ["ps", "--all", "--format", "json"])
+    if result.returncode != 0:
+        return []
+    output = result.stdout.strip()
+    if output.startswith("["):
+        rows = json.loads(output)
+    else:
+        rows = [json.loads(line) for line in output.splitlines() if line.strip()]
+    return [
+        {
+            "Id": row.get("ID", ""),
+            "Names": [f"/{row.get('Name', '')}"],
+            "State": row.get("State", ""),
+            "Status": row.get("Status", ""),
+            "Labels": {"com.docker.compose.service": row.get("Service", "")},
+        }
+        for row in rows
+    ]
+
+def inspect_project(cwd: Path) -> list:
+    """Full inspect documents (State, RestartCount, Config.Labels) of a project's containers."""
+    api = get_docker_api()
+    if api is not None:
+        try:
+            return [api.inspect_container(c["Id"]) for c in api.list_containers(project_name(cwd))]
+        except (OSError, DockerAPIError):
+            pass
+
+    result = run_compose_captured(cwd, ["ps", "--all", "--quiet"])
+    ids = result.stdout.split() if result.returncode == 0 else []
+    if not ids:
+        return []
+    result = subprocess.run([docker_binary(), "inspect"] + ids, capture_output=True, text=True)
+    if result.returncode != 0:
+        return []
+    return json.loads(result.stdout)
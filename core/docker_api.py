@@ -0,0 +1,194 @@
+import functools
+import http.client
+import json
+import os
+import socket
+import threading
+from urllib.parse import quote
+
+from core.config import get_config_value
+from core.trace import span
+
+DEFAULT_DOCKER_SOCKET = "/var/run/docker.sock"
+# Longest silence tolerated on a streaming endpoint, e.g. a slow layer extraction.
+STREAM_TIMEOUT = 300
+
+
+class DockerAPIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker API error {status}: {message}")
+        self.status = status
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DockerAPI:
+    """Minimal Docker Engine API client reusing one keep-alive connection to the socket."""
+
+    def __init__(self, socket_path: str, timeout: float = 10):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def request(self, method: str, path: str, body=None):
+        headers = {"Host": "docker"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        with span("docker.api", method=method, path=path.split("?", 1)[0]) as s:
+            with self._lock:
+                for attempt in range(2):
+                    if self._connection is None:
+                        self._connection = UnixHTTPConnection(self.socket_path, self.timeout)
+                    try:
+                        self._connection.request(method, path, body=payload, headers=headers)
+                        response = self._connection.getresponse()
+                        data = response.read()
+                        break
+                    except (http.client.HTTPException, ConnectionError, BrokenPipeError):
+                        # The daemon closed the idle keep-alive connection, reconnect once.
+                        self.close()
+                        if attempt:
+                            raise
+            s.set(status=response.status, bytes=len(data))
+
+        if response.status >= 400:
+            try:
+                message = json.loads(data).get("message", "")
+            except ValueError:
+                message = data.decode(errors="replace")
+            raise DockerAPIError(response.status, message)
+
+        if response.getheader("Content-Type", "").startswith("application/json"):
+            return json.loads(data) if data else None
+        return data.decode(errors="replace")
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def ping(self) -> bool:
+        try:
+            return self.request("GET", "/_ping") == "OK"
+        except (OSError, DockerAPIError):
+            return False
+        except http.client.HTTPException:
+            # Something other than Docker listens on the socket.
+            self.close()
+            return False
+
+    def inspect_network(self, name: str) -> dict | None:
+        try:
+            return self.request("GET", f"/networks/{quote(name)}")
+        except DockerAPIError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def create_network(self, name: str) -> dict:
+        return self.request("POST", "/networks/create", {"Name": name})
+
+    def list_containers(self, project: str | None = None) -> list:
+        path = "/containers/json?all=1"
+        if project:
+            filters = {"label": [f"com.docker.compose.project={project}"]}
+            path += f"&filters={quote(json.dumps(filters))}"
+        return self.request("GET", path) or []
+
+    def inspect_container(self, container_id: str) -> dict:
+        return self.request("GET", f"/containers/{quote(container_id)}/json")
+
+    def inspect_image(self, name: str) -> dict | None:
+        try:
+            return self.request("GET", f"/images/{quote(name, safe='')}/json")
+        except DockerAPIError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def stream(self, method: str, path: str):
+        """Yield the JSON messages of a streaming endpoint.
+
+        Uses its own connection so a long stream (e.g. a pull) does not hold
+        the shared one, and several can run side by side.
+        """
+        connection = UnixHTTPConnection(self.socket_path, STREAM_TIMEOUT)
+        try:
+            connection.request(method, path, headers={"Host": "docker"})
+            response = connection.getresponse()
+            if response.status >= 400:
+                data = response.read()
+                try:
+                    message = json.loads(data).get("message", "")
+                except ValueError:
+                    message = data.decode(errors="replace")
+                raise DockerAPIError(response.status, message)
+            for line in response:
+                if line.strip():
+                    message = json.loads(line)
+                    if message.get("error"):
+                        raise DockerAPIError(500, message["error"])
+                    yield message
+        finally:
+            connection.close()
+
+    def pull_image(self, image: str):
+        """Pull an image, yielding Docker's progress messages."""
+        return self.stream("POST", f"/images/create?fromImage={quote(image, safe='')}")
+
+
+def docker_host() -> str:
+    """DOCKER_HOST, else the `docker_host` config value.
+
+    A configured value is exported so the docker CLI calls made afterwards
+    talk to the same daemon as the API client.
+    """
+    if "DOCKER_HOST" not in os.environ:
+        configured = get_config_value("docker_host")
+        if configured:
+            os.environ["DOCKER_HOST"] = configured
+    return os.environ.get("DOCKER_HOST", "")
+
+
+@functools.cache
+def docker_binary() -> str:
+    """The `docker` executable: the `docker_binary` config value, or the one on PATH."""
+    docker_host()
+    return get_config_value("docker_binary") or "docker"
+
+
+def docker_socket_path() -> str | None:
+    docker_host_url = docker_host()
+    if docker_host_url:
+        if not docker_host_url.startswith("unix://"):
+            return None
+        return docker_host_url[len("unix://") :]
+    return DEFAULT_DOCKER_SOCKET
+
+
+_api = None
+
+
+def get_docker_api() -> DockerAPI | None:
+    """Shared client, or None when the daemon socket cannot be used from here."""
+    global _api
+    if _api is None:
+        path = docker_socket_path()
+        if not hasattr(socket, "AF_UNIX") or not path or not os.path.exists(path):
+            return None
+        _api = DockerAPI(path)
+    return _api
@@ -0,0 +1,177 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from core.config import GLOBAL_CONFIG_DIR
+from core.http import get_session
+from core.trace import propagate, span
+
+DOWNLOAD_DIR = GLOBAL_CONFIG_DIR / "downloads"
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+# Assets at least this big are fetched as several ranges at once.
+PARALLEL_THRESHOLD = 32 * 1024 * 1024
+PARALLEL_PARTS = 4
+MAX_ATTEMPTS = 5
+TIMEOUT = (10, 30)
+
+
+class DownloadError(Exception):
+    pass
+
+
+class AdaptiveChunk:
+    """Grow reads on fast links and shrink them when a read stalls."""
+
+    def __init__(self):
+        self.size = MIN_CHUNK_SIZE
+
+    def update(self, elapsed: float):
+        if elapsed < 0.1:
+            self.size = min(self.size * 2, MAX_CHUNK_SIZE)
+        elif elapsed > 1:
+            self.size = max(self.size // 2, MIN_CHUNK_SIZE)
+
+
+def file_size(path: Path) -> int:
+    return path.stat().st_size if path.exists() else 0
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fetch_range(
+    url: str,
+    part: Path,
+    start: int,
+    length: int | None,
+    advance: Callable[[int], None],
+    etag: str | None = None,
+):
+    """Download `length` bytes from `start` into `part`, resuming from what it already holds."""
+    import requests
+    import urllib3
+
+    for attempt in range(MAX_ATTEMPTS):
+        offset = file_size(part)
+        if length is not None and offset >= length:
+            return
+
+        headers = {}
+        if start + offset or length is not None:
+            end = "" if length is None else str(start + length - 1)
+            headers["Range"] = f"bytes={start + offset}-{end}"
+            if etag and offset:
+                # Only resume if the asset did not change in the meantime.
+                headers["If-Range"] = etag
+
+        try:
+            with get_session().get(
+                url, headers=headers, stream=True, timeout=TIMEOUT
+            ) as r:
+                if r.status_code == 416 and length is None and offset:
+                    return
+                r.raise_for_status()
+                mode = "ab"
+                if "Range" in headers and r.status_code != 206:
+                    if start:
+                        raise DownloadError("the server does not support range requests")
+                    # Full body instead of the range: start the file over.
+                    advance(-offset)
+                    mode = "wb"
+
+                chunk = AdaptiveChunk()
+                with open(part, mode) as f:
+                    while True:
+                        began = time.monotonic()
+                        data = r.raw.read(chunk.size, decode_content=True)
+                        if not data:
+                            break
+                        f.write(data)
+                        advance(len(data))
+                        chunk.update(time.monotonic() - began)
+
+            if length is None or file_size(part) >= length:
+                return
+        except requests.HTTPError:
+            raise
+        except (requests.RequestException, urllib3.exceptions.HTTPError, OSError):
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+        time.sleep(min(2**attempt, 10))
+
+    raise DownloadError(f"download of {url} did not complete")
+
+
+def remove_stale_parts(pattern: str, keep: str):
+    """Delete the partial downloads matching `pattern`, except those of `keep`."""
+    for path in DOWNLOAD_DIR.glob(f"{pattern}.part*"):
+        if not path.name.startswith(f"{keep}.part"):
+            path.unlink(missing_ok=True)
+
+
+def download_file(
+    url: str,
+    name: str,
+    advance: Callable[[int], None],
+    parallel: int = PARALLEL_PARTS,
+    supersedes: str | None = None,
+) -> Path:
+    """Download `url` to ~/.portabase/downloads/<name>.part, resuming earlier attempts.
+
+    `name` must identify the content (e.g. asset and tag) so a partial file is
+    never resumed against a different release. Once the download succeeded,
+    the partial files of the names matching the `supersedes` glob (e.g. other
+    tags of the same asset) are deleted.
+    """
+    with span("download", name=name) as s:
+        DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        target = DOWNLOAD_DIR / f"{name}.part"
+
+        head = get_session().head(url, allow_redirects=True, timeout=TIMEOUT)
+        total = int(head.headers.get("Content-Length", 0)) if head.ok else 0
+        etag = head.headers.get("ETag") if head.ok else None
+        ranges = head.ok and head.headers.get("Accept-Ranges") == "bytes"
+        # Resolve GitHub's redirect once instead of for every range request.
+        url = head.url if head.ok else url
+
+        if ranges and total >= PARALLEL_THRESHOLD and parallel > 1 and not target.exists():
+            part_size = -(-total // parallel)
+            parts = [
+                (DOWNLOAD_DIR / f"{name}.part{i}", i * part_size, min(part_size, total - i * part_size))
+                for i in range(parallel)
+            ]
+            advance(sum(min(file_size(path), length) for path, _, length in parts))
+            with ThreadPoolExecutor(max_workers=parallel) as pool:
+                futures = [
+                    pool.submit(propagate(fetch_range), url, path, start, length, advance, etag)
+                    for path, start, length in parts
+                ]
+                for future in futures:
+                    future.result()
+
+            with open(target, "wb") as out:
+                for path, _, _ in parts:
+                    with open(path, "rb") as f:
+                        while block := f.read(MAX_CHUNK_SIZE):
+                            out.write(block)
+            for path, _, _ in parts:
+                path.unlink()
+            s.set(bytes=total, parts=parallel)
+        else:
+            advance(file_size(target))
+            fetch_range(url, target, 0, total or None, advance, etag if ranges else None)
+            if total and file_size(target) != total:
+                raise DownloadError(f"expected {total} bytes, got {file_size(target)}")
+            s.set(bytes=file_size(target), parts=1)
+
+        if supersedes:
+            remove_stale_parts(supersedes, name)
+        return target
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from core.config import get_config_value
+from core.trace import add_span
+
+# Transient failures worth another try; 4xx answers are returned as they are.
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+POOL_SIZE = 8
+
+_session = None
+_lock = threading.Lock()
+
+
+def record_timing(response, *args, **kwargs):
+    """Response hook tracing method, URL, status and latency of every request."""
+    elapsed = response.elapsed.total_seconds()
+    # elapsed stops at the response headers, so streamed bodies are not included.
+    add_span(
+        f"http.{response.request.method}",
+        time.perf_counter() - elapsed,
+        elapsed,
+        url=response.url,
+        status=response.status_code,
+        bytes=int(response.headers.get("Content-Length", 0) or 0),
+    )
+
+
+def create_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "portabase-cli"
+    session.hooks["response"].append(record_timing)
+
+    proxy = get_config_value("proxy")
+    if proxy:
+        session.proxies = {"http": proxy, "https": proxy}
+    ca_bundle = get_config_value("ca_bundle")
+    if ca_bundle:
+        session.verify = ca_bundle
+    return session
+
+
+def get_session():
+    """Process-wide requests session, so consecutive requests reuse connections."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = create_session()
+    return _session
@@ -0,0 +1,177 @@
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+from core.compose import ComposeFile
+from core.docker_api import DockerAPIError, docker_binary, get_docker_api
+from core.trace import propagate, span
+from core.utils import console
+
+PULL_PARALLEL = 4
+# Layer statuses after which its bytes count as transferred.
+LAYER_DONE = {"Download complete", "Pull complete", "Already exists"}
+
+
+def normalize_image(image: str) -> str:
+    """Add the implicit :latest tag, so `mongo` and `mongo:latest` are pulled once."""
+    if "@" in image:
+        return image
+    name = image.rsplit("/", 1)[-1]
+    return image if ":" in name else f"{image}:latest"
+
+
+def compose_images(path: Path) -> list:
+    """Images referenced by a component's docker-compose.yml."""
+    try:
+        compose = ComposeFile.load(path / "docker-compose.yml")
+    except (OSError, ValueError, yaml.YAMLError):
+        return []
+    return service_images(compose)
+
+
+def service_images(compose: ComposeFile) -> list:
+    return [
+        normalize_image(str(definition["image"]))
+        for definition in compose.services.values()
+        if isinstance(definition, dict) and definition.get("image")
+    ]
+
+
+def image_present(image: str) -> bool:
+    api = get_docker_api()
+    if api is not None:
+        try:
+            return api.inspect_image(image) is not None
+        except (OSError, DockerAPIError):
+            pass
+    result = subprocess.run(
+        [docker_binary(), "image", "inspect", image],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+def pull_image(image: str, progress=None, task=None) -> int:
+    """Pull one image, reporting layer bytes on its progress task; returns the bytes pulled."""
+    with span("image.pull", image=image) as s:
+        api = get_docker_api()
+        if api is not None:
+            # The first message is about the tag itself, not a layer.
+            tag = image.rsplit(":", 1)[-1]
+            layers = {}
+            try:
+                for message in api.pull_image(image):
+                    layer = message.get("id")
+                    if not layer or layer == tag:
+                        continue
+                    detail = message.get("progressDetail") or {}
+                    current, total = layers.get(layer, (0, 0))
+                    if message.get("status") == "Downloading" and detail.get("total"):
+                        current, total = detail.get("current", 0), detail["total"]
+                    elif message.get("status") in LAYER_DONE:
+                        current = total
+                    layers[layer] = (current, total)
+                    if progress is None:
+                        continue
+                    progress.update(
+                        task,
+                        total=sum(t for _, t in layers.values()) or None,
+                        completed=sum(c for c, _ in layers.values()),
+                    )
+                pulled = sum(t for _, t in layers.values())
+                s.set(bytes=pulled, via="api")
+                return pulled
+            except (OSError, DockerAPIError):
+                # e.g. a private registry: the docker CLI has the credential helpers.
+                pass
+
+        result = subprocess.run(
+            [docker_binary(), "pull", "--quiet", image], capture_output=True, text=True
+        )
+        s.set(exit_code=result.returncode, via="cli")
+        if result.returncode != 0:
+            output = (result.stderr or result.stdout).strip().splitlines()
+            raise RuntimeError(output[-1] if output else f"docker pull exited with {result.returncode}")
+        return 0
+
+
+def ensure_image(image: str):
+    """Pull `image` unless it is already present, without any output."""
+    image = normalize_image(image)
+    if not image_present(image):
+        pull_image(image)
+
+
+def ensure_compose_images(content: str):
+    """Silently pull the images of a compose file given as text."""
+    for image in service_images(ComposeFile.from_string(content)):
+        ensure_image(image)
+
+
+def pull_progress():
+    from rich.progress import (
+        BarColumn,
+        DownloadColumn,
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        TransferSpeedColumn,
+    )
+
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        console=console,
+    )
+
+
+def prepull_images(paths: list, parallel: int = PULL_PARALLEL) -> list:
+    """Pull the images of several components at once, each one once, skipping local ones.
+
+    Returns (image, error) for the pulls that failed; `compose up` retries
+    those itself, so callers only warn.
+    """
+    images = []
+    for path in paths:
+        for image in compose_images(path):
+            if image not in images:
+                images.append(image)
+
+    with span("image.check", images=len(images)):
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            present = list(pool.map(propagate(image_present), images))
+    missing = [image for image, found in zip(images, present) if not found]
+    if not missing:
+        return []
+
+    failures = []
+    with pull_progress() as progress:
+        tasks = {image: progress.add_task(f"Pulling {image}", total=None) for image in missing}
+
+        def pull(image: str):
+            try:
+                pulled = pull_image(image, progress, tasks[image])
+                progress.update(
+                    tasks[image],
+                    description=f"[success]✔[/success] {image}",
+                    total=pulled or None,
+                    completed=pulled,
+                )
+                progress.stop_task(tasks[image])
+            except Exception as e:
+                failures.append((image, str(e)))
+                progress.update(tasks[image], description=f"[danger]✖[/danger] {image}")
+                progress.stop_task(tasks[image])
+
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            list(pool.map(propagate(pull), missing))
+
+    for image, error in failures:
+        console.print(f"[warning]⚠ Could not pull {image}:[/warning] [dim]{error}[/dim]")
+    return failures
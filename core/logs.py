@@ -0,0 +1,169 @@
+import asyncio
+import os
+import re
+import sys
+from pathlib import Path
+
+from rich.text import Text
+
+from core.docker import compose_command, project_name
+from core.utils import console
+
+PREFIX_STYLES = ["cyan", "magenta", "green", "yellow", "blue", "bright_cyan", "bright_magenta"]
+# Lines waiting to be printed. When it is full, readers stop draining their pipe
+# and docker compose blocks on write, so a chatty container is slowed down at
+# the source. Waiting readers are resumed in FIFO order, which keeps quiet
+# components from being starved by a busy one.
+LOG_QUEUE_SIZE = 256
+MAX_LINE_LENGTH = 1 << 20
+
+
+def split_line(line: str, project: str) -> tuple[str, str]:
+    """Split a `docker compose logs` line into (service, message)."""
+    container, sep, message = line.partition(" | ")
+    if not sep:
+        return "", line
+    container = container.strip()
+    if container.startswith(f"{project}-"):
+        container = container[len(project) + 1 :]
+    return container, message
+
+
+async def read_line(stream: asyncio.StreamReader) -> bytes:
+    """Next line, or the next chunk of at most MAX_LINE_LENGTH bytes of a longer one."""
+    try:
+        return await stream.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        # Output ended without a newline (b"" at EOF).
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        # Unlike readline(), readuntil() leaves the data buffered on overrun.
+        return await stream.read(min(e.consumed, MAX_LINE_LENGTH))
+
+
+async def read_component(
+    path: Path, args: list, pattern: re.Pattern | None, queue: asyncio.Queue, style: str
+) -> int:
+    process = await asyncio.create_subprocess_exec(
+        *compose_command(path, args),
+        cwd=path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        limit=MAX_LINE_LENGTH,
+    )
+    project = project_name(path)
+    # Service of an overlong line whose next chunk is still to come.
+    continued = None
+    try:
+        while True:
+            raw = await read_line(process.stdout)
+            if not raw:
+                break
+            # Reads do not yield while the pipe buffer still holds data,
+            # so hand over explicitly to keep the other components flowing.
+            await asyncio.sleep(0)
+            text = raw.decode(errors="replace").rstrip("\r\n")
+            if continued is not None:
+                service, message = continued, text
+                if not text:
+                    # Only the newline of the previous chunk was left.
+                    continued = None
+                    continue
+            else:
+                service, message = split_line(text, project)
+            continued = None if raw.endswith(b"\n") else service
+            if pattern is not None and not pattern.search(message):
+                continue
+            prefix = f"{path.name}/{service}" if service else path.name
+            await queue.put((prefix, style, message))
+    finally:
+        if process.returncode is None:
+            process.terminate()
+        await process.wait()
+    return process.returncode
+
+
+async def print_lines(queue: asyncio.Queue) -> bool:
+    """Print queued lines until the None sentinel; False if the output was closed."""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return True
+        prefix, style, message = item
+        try:
+            console.print(
+                Text.assemble((prefix, style), " | ", message),
+                soft_wrap=True,
+                highlight=False,
+            )
+        except (BrokenPipeError, SystemExit):
+            # e.g. `| head` exited. Rich raises SystemExit once it has pointed
+            # stdout at /dev/null; do the same for a bare BrokenPipeError so
+            # the interpreter does not complain when flushing it at exit.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            os.close(devnull)
+            return False
+
+
+async def multiplex_logs(
+    targets: list, args: list, pattern: re.Pattern | None
+) -> list | None:
+    """Exit codes (or exceptions) of the readers, None if the output was closed first."""
+    queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+    printer = asyncio.create_task(print_lines(queue))
+    readers = [
+        asyncio.create_task(
+            read_component(path, args, pattern, queue, PREFIX_STYLES[i % len(PREFIX_STYLES)])
+        )
+        for i, path in enumerate(targets)
+    ]
+    gathered = asyncio.gather(*readers, return_exceptions=True)
+    try:
+        await asyncio.wait([printer, gathered], return_when=asyncio.FIRST_COMPLETED)
+        if printer.done():
+            # Nobody reads our output anymore: stop the `docker compose logs`
+            # children (read_component terminates them when cancelled).
+            for reader in readers:
+                reader.cancel()
+            await gathered
+            printer.result()
+            return None
+        return gathered.result()
+    finally:
+        if not printer.done():
+            await queue.put(None)
+            await printer
+
+
+def stream_logs(
+    targets: list,
+    follow: bool = True,
+    since: str | None = None,
+    tail: str | None = None,
+    grep: str | None = None,
+) -> list:
+    """Tail several components at once; returns (path, error) for those that failed."""
+    args = ["logs", "--no-color"]
+    if follow:
+        args.append("-f")
+    if since:
+        args += ["--since", since]
+    if tail:
+        args += ["--tail", tail]
+    pattern = re.compile(grep) if grep else None
+
+    try:
+        codes = asyncio.run(multiplex_logs(targets, args, pattern))
+    except KeyboardInterrupt:
+        return []
+    if codes is None:
+        return []
+
+    failures = []
+    for path, code in zip(targets, codes):
+        if isinstance(code, BaseException):
+            failures.append((path, str(code)))
+        elif code:
+            failures.append((path, f"docker compose logs exited with {code}"))
+    return failures
@@ -1,26 +1,143 @@
+import json
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
 import requests
 import typer
 from rich.console import Console
-from core.config import TEMPLATE_BASE_URL
+from core.config import TEMPLATE_BASE_URL, TEMPLATE_CACHE_DIR, TEMPLATE_CACHE_TTL, write_file
+from core.http import get_session
+from core.trace import traced
 from core.utils import current_version, get_random_hint
 
 console = Console()
 
-def fetch_template(filename: str) -> str:
+_templates: dict[str, str] = {}
+
+
+def bundled_template_path(filename: str) -> Path:
+    if getattr(sys, "frozen", False):
+        base_path = Path(sys._MEIPASS)
+    else:
+        base_path = Path(__file__).parent.parent
+    return base_path / "templates" / filename
+
+
+def template_cache_path(filename: str) -> Path:
+    return TEMPLATE_CACHE_DIR / current_version() / filename
+
+
+def load_cached_template(filename: str) -> dict | None:
+    path = template_cache_path(filename)
+    meta_path = path.with_name(f"{path.name}.meta.json")
+    if not path.exists() or not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        meta["content"] = path.read_text()
+        return meta
+    except Exception:
+        return None
+
+
+def save_cached_template(filename: str, content: str, meta: dict):
+    path = template_cache_path(filename)
+    try:
+        write_file(path, content)
+        write_file(path.with_name(f"{path.name}.meta.json"), json.dumps(meta, indent=2))
+    except Exception:
+        pass
+
+
+def download_template(filename: str, cached: dict | None) -> str:
     version = current_version()
-    url = f"{TEMPLATE_BASE_URL}/{version if version != 'unknown' else 'latest'}/{filename}"
-    
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    url = cached["url"] if cached else f"{TEMPLATE_BASE_URL}/{version if version != 'unknown' else 'latest'}/{filename}"
+    response = get_session().get(url, headers=headers, timeout=10)
+    if response.status_code in [403, 404] and "/latest/" not in url:
+        url = f"{TEMPLATE_BASE_URL}/latest/{filename}"
+        response = get_session().get(url, timeout=10)
+
+    if response.status_code == 304 and cached:
+        content = cached["content"]
+    else:
+        response.raise_for_status()
+        content = response.text
+
+    save_cached_template(
+        filename,
+        content,
+        {
+            "url": url,
+            "etag": response.headers.get("ETag", cached.get("etag") if cached else None),
+            "last_modified": response.headers.get(
+                "Last-Modified", cached.get("last_modified") if cached else None
+            ),
+            "fetched_at": time.time(),
+        },
+    )
+    return content
+
+
+@traced("template.fetch")
+def fetch_template(
+    filename: str, offline: bool = False, refresh: bool = False, quiet: bool = False
+) -> str:
+    """Resolve a template from memory, the disk cache, the bundled copy, then the network.
+
+    With `quiet` nothing is printed and failures raise instead of falling back.
+    """
+    if filename in _templates and not refresh:
+        return _templates[filename]
+
+    cached = load_cached_template(filename)
+    bundled = bundled_template_path(filename)
+
+    if not refresh or offline:
+        # A cached copy, even a stale one, is never older than the bundled one.
+        if cached:
+            stale = time.time() - cached.get("fetched_at", 0) >= TEMPLATE_CACHE_TTL
+            if stale and not offline and not quiet:
+                console.print(
+                    "[dim]Cached template may be outdated, use --refresh-template to update it.[/dim]"
+                )
+            _templates[filename] = cached["content"]
+            return _templates[filename]
+        if bundled.exists():
+            _templates[filename] = bundled.read_text()
+            return _templates[filename]
+
+    if offline:
+        if quiet:
+            raise typer.Exit(1)
+        console.print(f"[bold red] No cached template available for {filename}.[/bold red]")
+        console.print("[dim]Run 'portabase templates prefetch' while online to warm the cache.[/dim]")
+        raise typer.Exit(1)
+
     try:
         status_msg = f"[dim]Fetching template...[/dim]\n{get_random_hint()}"
-        with console.status(status_msg):
-            response = requests.get(url, timeout=10)
-            if response.status_code in [403, 404] and version != "unknown":
-                url = f"{TEMPLATE_BASE_URL}/latest/{filename}"
-                response = requests.get(url, timeout=10)
-                
-            response.raise_for_status()
-            return response.text
+        with nullcontext() if quiet else console.status(status_msg):
+            _templates[filename] = download_template(filename, cached)
+            return _templates[filename]
     except requests.RequestException as e:
+        if quiet:
+            raise
+        fallback = cached["content"] if cached else None
+        if fallback is None and bundled.exists():
+            fallback = bundled.read_text()
+        if fallback is not None:
+            console.print(f"[yellow] Could not fetch template, using local copy:[/yellow] {e}")
+            _templates[filename] = fallback
+            return fallback
         console.print(f"[bold red] Error fetching template:[/bold red] {e}")
         console.print("[dim]Check your internet connection or the template URL.[/dim]")
-        raise typer.Exit(1)
\ No newline at end of file
+        raise typer.Exit(1)
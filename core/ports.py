@@ -0,0 +1,111 @@
+import json
+import socket
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from core.config import (
+    PORT_LEASES_FILE,
+    file_lock,
+    get_config_value,
+    load_components,
+    load_env_file,
+    write_file,
+)
+
+# Host ports handed out to database containers, configurable as "port_range".
+PORT_RANGE = [20000, 29999]
+# A lease only has to outlive the time between allocation and the .env being
+# written; after that the port is found by scanning the component itself.
+PORT_LEASE_TTL = 3600
+
+
+def load_leases() -> dict:
+    if not PORT_LEASES_FILE.exists():
+        return {}
+    try:
+        with open(PORT_LEASES_FILE, "r") as f:
+            return json.load(f).get("leases", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_leases(leases: dict):
+    write_file(PORT_LEASES_FILE, json.dumps({"leases": leases}, indent=2))
+
+
+def component_ports(paths: list[Path]) -> set[int]:
+    """Host ports already written to the .env of existing components."""
+    ports = set()
+    for path in paths:
+        for key, value in load_env_file(path).items():
+            if key.endswith("PORT") and value.isdigit():
+                ports.add(int(value))
+    return ports
+
+
+def port_is_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(("", port))
+        except OSError:
+            return False
+    return True
+
+
+def allocate_ports(count: int, owner: str = "") -> list[int]:
+    """Reserve `count` host ports that no component, lease or local process uses."""
+    return lease_ports([owner] * count)
+
+
+def lease_ports(owners: list[str]) -> list[int]:
+    """Reserve one port per entry of `owners`, all in a single lease transaction."""
+    if not owners:
+        return []
+
+    start, end = get_config_value("port_range", PORT_RANGE)
+    with file_lock(PORT_LEASES_FILE):
+        now = time.time()
+        leases = {
+            port: lease
+            for port, lease in load_leases().items()
+            if now - lease.get("leased_at", 0) < PORT_LEASE_TTL
+        }
+        components = [Path(c["path"]) for c in load_components().values()]
+        used = {int(port) for port in leases} | component_ports(components)
+
+        ports = []
+        for port in range(start, end + 1):
+            if port in used or not port_is_free(port):
+                continue
+            leases[str(port)] = {"owner": owners[len(ports)], "leased_at": now}
+            ports.append(port)
+            if len(ports) == len(owners):
+                break
+        else:
+            raise RuntimeError(f"No free port left in range {start}-{end}")
+
+        save_leases(leases)
+    return ports
+
+
+def allocate_port(owner: str = "") -> int:
+    return allocate_ports(1, owner)[0]
+
+
+def release_ports(owner: str):
+    with file_lock(PORT_LEASES_FILE):
+        leases = load_leases()
+        kept = {p: lease for p, lease in leases.items() if lease.get("owner") != owner}
+        if len(kept) != len(leases):
+            save_leases(kept)
+
+
+@contextmanager
+def release_ports_on_abort(owner: str):
+    """Release `owner`'s leases if the block is left by an exception (typer.Exit, Ctrl+C...)."""
+    try:
+        yield
+    except BaseException:
+        release_ports(owner)
+        raise
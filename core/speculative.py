@@ -0,0 +1,62 @@
+import threading
+from concurrent.futures import Future, wait
+
+from core.trace import propagate
+
+
+class Speculation:
+    """Slow Docker/network work started while the user is still answering prompts.
+
+    Tasks run on daemon threads, so an aborted wizard never waits for them,
+    and must stay silent: no console output, no prompts. A task that failed is
+    redone in the foreground by join()'s fallback, which reports errors the
+    usual way.
+    """
+
+    def __init__(self):
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def start(self, key: str, func, *args, **kwargs):
+        with self.lock:
+            if key in self.futures:
+                return
+            future = self.futures[key] = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=propagate(run), name=f"speculative-{key}", daemon=True).start()
+
+    def join(self, key: str, fallback=None):
+        """Result of `key`, or of `fallback()` if the task failed or was never started."""
+        future = self.futures.get(key)
+        if future is not None:
+            try:
+                return future.result()
+            except BaseException:
+                pass
+        return fallback() if fallback is not None else None
+
+    def peek(self, key: str, timeout: float):
+        """Result of `key` if it finished within `timeout` seconds, None otherwise."""
+        future = self.futures.get(key)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except BaseException:
+            return None
+
+    def pending(self, prefix: str) -> list:
+        with self.lock:
+            return [f for k, f in self.futures.items() if k.startswith(prefix) and not f.done()]
+
+    def wait(self, prefix: str):
+        """Block until every task whose key starts with `prefix` is finished."""
+        wait(self.pending(prefix))
@@ -0,0 +1,196 @@
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+_tracer = None
+# Innermost open span. A context variable, so asyncio tasks inherit it and
+# pool workers can be handed it with propagate().
+_current = contextvars.ContextVar("portabase_span", default=None)
+
+
+class NullSpan:
+    """Returned by span() while tracing is off, so call sites cost one attribute lookup."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.id = next(tracer.ids)
+        self.parent = None
+        self.token = None
+
+    def __enter__(self):
+        parent = _current.get()
+        self.parent = parent.id if parent else None
+        self.token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        try:
+            _current.reset(self.token)
+        except ValueError:
+            # Exited from another context than the one it was entered in.
+            pass
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.record(self, self.start, end)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Collects finished spans in memory and writes them out once at exit."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.origin = time.perf_counter()
+        self.ids = itertools.count(1)
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def record(self, span: Span, start: float, end: float):
+        with self.lock:
+            self.spans.append(
+                {
+                    "id": span.id,
+                    "parent": span.parent,
+                    "name": span.name,
+                    "start": start - self.origin,
+                    "duration": end - start,
+                    "thread": threading.get_ident(),
+                    "attrs": span.attrs,
+                }
+            )
+
+    def chrome_events(self) -> list:
+        threads = {}
+        events = []
+        for span in sorted(self.spans, key=lambda s: s["start"]):
+            tid = threads.setdefault(span["thread"], len(threads) + 1)
+            events.append(
+                {
+                    "name": span["name"],
+                    "cat": span["name"].split(".", 1)[0],
+                    "ph": "X",
+                    "ts": round(span["start"] * 1e6, 3),
+                    "dur": round(span["duration"] * 1e6, 3),
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": span["attrs"],
+                }
+            )
+        return events
+
+    def export(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            if self.path.suffix == ".jsonl":
+                for span in sorted(self.spans, key=lambda s: s["start"]):
+                    f.write(json.dumps(span, default=str) + "\n")
+            else:
+                json.dump(
+                    {"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"},
+                    f,
+                    default=str,
+                )
+
+
+def span(name: str, /, **attrs):
+    """Context manager timing a block; `.set()` attaches exit codes, byte counts..."""
+    if _tracer is None:
+        return NULL_SPAN
+    return Span(_tracer, name, attrs)
+
+
+def add_span(name: str, start: float, duration: float, /, **attrs):
+    """Record a span measured elsewhere (e.g. an HTTP response's elapsed time)."""
+    if _tracer is None:
+        return
+    finished = Span(_tracer, name, attrs)
+    parent = _current.get()
+    finished.parent = parent.id if parent else None
+    _tracer.record(finished, start, start + duration)
+
+
+def propagate(func):
+    """Wrap `func` so that spans it opens on a worker thread nest under the caller's span.
+
+    Threads do not inherit context variables: use it on what is handed to
+    ThreadPoolExecutor.map/submit or threading.Thread.
+    """
+    if _tracer is None:
+        return func
+    parent = _current.get()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+def traced(name: str):
+    """Decorator form of span() for functions that are hot spots as a whole."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with Span(_tracer, name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def start_trace(path: str | Path, name: str):
+    """Enable tracing for this process; spans are written to `path` at exit.
+
+    A `.jsonl` path gets one span per line, anything else a Chrome trace
+    (chrome://tracing, Perfetto).
+    """
+    global _tracer
+    if _tracer is not None:
+        return
+    tracer = _tracer = Tracer(Path(path).expanduser())
+    root = Span(tracer, name, {})
+    root.__enter__()
+
+    def finish():
+        root.__exit__(None, None, None)
+        try:
+            tracer.export()
+        except OSError:
+            pass
+
+    atexit.register(finish)
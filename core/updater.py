@@ -1,22 +1,32 @@
+import atexit
+import hashlib
 import json
 import os
 import platform
 import shutil
 import subprocess
 import sys
-import tempfile
+import threading
 import time
 from pathlib import Path
 
-import requests
 import typer
 
-from core.config import get_config_value
+from core.config import get_config_value, write_file
+from core.delta import apply_bsdiff
+from core.download import DOWNLOAD_DIR, download_file, sha256_file
+from core.http import get_session
+from core.trace import span
 from core.utils import console, current_version, get_random_hint
 
 GITHUB_REPO = "Portabase/cli"
 GITHUB_API_BASE_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases"
 CACHE_FILE = Path.home() / ".portabase" / "update_cache.json"
+CACHE_TTL = 86400
+# How long a command's exit waits for a background release check still running.
+REFRESH_EXIT_WAIT = 1.5
+# Set to any value to never look for new releases (CI, scripts, air-gapped hosts).
+NO_UPDATE_CHECK_ENV = "PORTABASE_NO_UPDATE_CHECK"
 
 
 def is_prerelease(version: str) -> bool:
@@ -42,11 +52,11 @@ def get_platform_info():
 def get_latest_release_data(pre=False):
     try:
         if not pre:
-            response = requests.get(f"{GITHUB_API_BASE_URL}/latest", timeout=5)
+            response = get_session().get(f"{GITHUB_API_BASE_URL}/latest", timeout=5)
             response.raise_for_status()
             return response.json()
         else:
-            response = requests.get(GITHUB_API_BASE_URL, timeout=5)
+            response = get_session().get(GITHUB_API_BASE_URL, timeout=5)
             response.raise_for_status()
             releases = response.json()
             return releases[0] if releases else None
@@ -54,7 +64,54 @@ def get_latest_release_data(pre=False):
         return None
 
 
+def update_check_disabled() -> bool:
+    if os.environ.get(NO_UPDATE_CHECK_ENV):
+        return True
+    # Scripted runs (pipes, cron, CI) have nobody to read the notice.
+    return not (sys.stdout.isatty() and sys.stderr.isatty())
+
+
+def load_update_cache() -> dict:
+    try:
+        with open(CACHE_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_update_cache(latest_tag: str | None, include_pre: bool):
+    try:
+        write_file(
+            CACHE_FILE,
+            json.dumps(
+                {
+                    "last_check": time.time(),
+                    "latest_version": latest_tag,
+                    "pre": include_pre,
+                }
+            ),
+        )
+    except Exception:
+        pass
+
+
+def refresh_update_cache(include_pre: bool):
+    data = get_latest_release_data(pre=include_pre)
+    if not data:
+        return None
+    latest_tag = data.get("tag_name", "").lstrip("v")
+    save_update_cache(latest_tag, include_pre)
+    return latest_tag
+
+
 def check_for_updates(force=False):
+    """Print a notice from the cached latest release; refresh a stale cache in the background.
+
+    Only `force` (i.e. `--version`) waits for GitHub, every other command goes on
+    immediately and sees the refreshed result on its next run. The attempt is
+    recorded up front, so a check cut short by the command's exit is retried
+    after CACHE_TTL, not by every following command.
+    """
     if (
         not force
         and not getattr(sys, "frozen", False)
@@ -62,6 +119,9 @@ def check_for_updates(force=False):
     ):
         return None
 
+    if not force and update_check_disabled():
+        return None
+
     current = current_version()
     if current == "unknown":
         return None
@@ -72,29 +132,22 @@ def check_for_updates(force=False):
     else:
         include_pre = is_prerelease(current)
 
-    latest_tag = None
-
-    try:
-        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        if not force and CACHE_FILE.exists():
-            with open(CACHE_FILE, "r") as f:
-                cache = json.load(f)
-                if time.time() - cache.get("last_check", 0) < 86400:
-                    latest_tag = cache.get("latest_version")
-    except Exception:
-        pass
-
-    if latest_tag is None:
-        data = get_latest_release_data(pre=include_pre)
-        if data:
-            latest_tag = data.get("tag_name", "").lstrip("v")
-            try:
-                with open(CACHE_FILE, "w") as f:
-                    json.dump(
-                        {"last_check": time.time(), "latest_version": latest_tag}, f
-                    )
-            except Exception:
-                pass
+    if force:
+        latest_tag = refresh_update_cache(include_pre)
+    else:
+        cache = load_update_cache()
+        latest_tag = cache.get("latest_version")
+        if cache.get("pre", include_pre) != include_pre:
+            latest_tag = None
+        stale = time.time() - cache.get("last_check", 0) >= CACHE_TTL
+        if stale or cache.get("pre", include_pre) != include_pre:
+            save_update_cache(latest_tag, include_pre)
+            refresh = threading.Thread(
+                target=refresh_update_cache, args=(include_pre,), daemon=True
+            )
+            refresh.start()
+            # Let a nearly done check finish, but never hold the exit longer.
+            atexit.register(refresh.join, REFRESH_EXIT_WAIT)
 
     if not latest_tag:
         return None
@@ -108,6 +161,103 @@ def check_for_updates(force=False):
     return None
 
 
+def release_digest(data: dict, asset: dict) -> str | None:
+    """SHA-256 of an asset, from GitHub's digest field or a published checksum file."""
+    digest = asset.get("digest") or ""
+    if digest.startswith("sha256:"):
+        return digest.split(":", 1)[1].lower()
+
+    import requests
+
+    assets = {a["name"]: a for a in data.get("assets", [])}
+    for name in (f"{asset['name']}.sha256", "SHA256SUMS", "checksums.txt"):
+        if name not in assets:
+            continue
+        try:
+            response = get_session().get(
+                assets[name]["browser_download_url"], timeout=10
+            )
+            response.raise_for_status()
+        except requests.RequestException:
+            continue
+        for line in response.text.splitlines():
+            fields = line.split()
+            if len(fields) == 1 or (
+                len(fields) >= 2 and fields[1].lstrip("*") == asset["name"]
+            ):
+                return fields[0].lower()
+    return None
+
+
+def download_progress():
+    from rich.progress import (
+        BarColumn,
+        DownloadColumn,
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        TransferSpeedColumn,
+    )
+
+    return Progress(
+        SpinnerColumn(),
+        TextColumn(
+            "[progress.description]{task.description}\n[hint]"
+            + get_random_hint()
+            + "[/hint]"
+        ),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        console=console,
+    )
+
+
+def find_patch_asset(data: dict, asset_name: str, current: str) -> dict | None:
+    """bsdiff patch from the installed version, published as <asset>.from-<version>.bsdiff."""
+    patch_name = f"{asset_name}.from-{current}.bsdiff"
+    return next((a for a in data.get("assets", []) if a["name"] == patch_name), None)
+
+
+def apply_delta_update(
+    patch_asset: dict, current_exe: Path, name: str, expected_digest: str
+) -> Path | None:
+    """Rebuild the new binary from the installed one; None means fall back to a full download."""
+    try:
+        with download_progress() as progress:
+            task = progress.add_task(
+                f"Downloading {patch_asset['name']}...",
+                total=patch_asset.get("size") or None,
+            )
+            patch_file = download_file(
+                patch_asset["browser_download_url"],
+                patch_asset["name"],
+                lambda n: progress.update(task, advance=n),
+            )
+        with span("update.bspatch", patch=patch_asset["name"]) as s:
+            new_binary = apply_bsdiff(current_exe.read_bytes(), patch_file.read_bytes())
+            s.set(bytes=len(new_binary))
+        patch_file.unlink()
+    except Exception as e:
+        console.print(
+            f"[warning]⚠ Delta update unavailable ({e}), downloading the full binary.[/warning]"
+        )
+        return None
+
+    if hashlib.sha256(new_binary).hexdigest() != expected_digest:
+        console.print(
+            "[warning]⚠ Patched binary does not match the release checksum, downloading the full binary.[/warning]"
+        )
+        return None
+
+    target = DOWNLOAD_DIR / f"{name}.patched"
+    target.write_bytes(new_binary)
+    console.print(
+        f"[success]✔ Delta update applied ({patch_asset.get('size', 0) // 1024} KiB downloaded)[/success]"
+    )
+    return target
+
+
 def update_cli():
     if not getattr(sys, "frozen", False) and platform.system().lower() != "windows":
         console.print(
@@ -174,6 +324,7 @@ def update_cli():
     )
 
     try:
+        temp_file = None
         if system == "windows":
             default_bin_path = (
                 Path(os.environ.get("APPDATA", "")) / "Portabase" / "portabase.exe"
@@ -196,49 +347,47 @@ def update_cli():
 
         console.print(f"[info]Target installation path: {current_exe}[/info]")
 
-        download_url = asset["browser_download_url"]
-        fd, temp_path = tempfile.mkstemp(prefix="portabase_update_")
-        temp_file = Path(temp_path)
-        os.close(fd)
+        expected_digest = release_digest(data, asset)
 
-        try:
-            response = requests.get(download_url, stream=True, timeout=15)
-            response.raise_for_status()
-            total_size = int(response.headers.get("content-length", 0))
-
-            from rich.progress import (
-                BarColumn,
-                DownloadColumn,
-                Progress,
-                SpinnerColumn,
-                TextColumn,
-                TransferSpeedColumn,
+        patch_asset = find_patch_asset(data, asset_name, current)
+        # A patched binary can only be trusted if it can be checked against the release.
+        if patch_asset and expected_digest and current_exe.exists():
+            temp_file = apply_delta_update(
+                patch_asset, current_exe, f"{asset_name}-{latest_tag}", expected_digest
             )
 
-            with Progress(
-                SpinnerColumn(),
-                TextColumn(
-                    "[progress.description]{task.description}\n[hint]"
-                    + get_random_hint()
-                    + "[/hint]"
-                ),
-                BarColumn(),
-                DownloadColumn(),
-                TransferSpeedColumn(),
-                console=console,
-            ) as progress:
+        if temp_file is None:
+            with download_progress() as progress:
                 task = progress.add_task(
-                    f"Downloading {asset_name}...", total=total_size
+                    f"Downloading {asset_name}...", total=asset.get("size") or None
+                )
+                try:
+                    temp_file = download_file(
+                        asset["browser_download_url"],
+                        f"{asset_name}-{latest_tag}",
+                        lambda n: progress.update(task, advance=n),
+                        supersedes=f"{asset_name}-*",
+                    )
+                except Exception as e:
+                    # The partial file is kept in ~/.portabase/downloads for the next attempt.
+                    console.print(f"[danger]✖ Download interrupted: {e}[/danger]")
+                    console.print(
+                        "[info]Run [bold]portabase update[/bold] again to resume.[/info]"
+                    )
+                    return
+
+            if expected_digest:
+                if sha256_file(temp_file) != expected_digest:
+                    temp_file.unlink()
+                    console.print(
+                        "[danger]✖ Checksum mismatch, the downloaded binary was discarded.[/danger]"
+                    )
+                    return
+                console.print("[success]✔ Checksum verified[/success]")
+            else:
+                console.print(
+                    "[warning]⚠ No checksum published for this asset, skipping verification.[/warning]"
                 )
-                with open(temp_file, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            progress.update(task, advance=len(chunk))
-        except Exception as e:
-            if temp_file.exists():
-                temp_file.unlink()
-            raise e
 
         if system != "windows":
             temp_file.chmod(0o755)
@@ -249,7 +398,7 @@ def update_cli():
                 if old_exe.exists():
                     old_exe.unlink()
                 current_exe.rename(old_exe)
-            temp_file.rename(current_exe)
+            shutil.move(str(temp_file), str(current_exe))
         else:
             need_sudo = not os.access(current_exe.parent, os.W_OK) or (
                 current_exe.exists() and not os.access(current_exe, os.W_OK)
@@ -287,5 +436,5 @@ def update_cli():
             console.print(f"[danger]✖ An error occurred during update: {e}[/danger]")
         except Exception:
             print(f"An error occurred during update: {e}")
-        if "temp_file" in locals() and temp_file.exists():
+        if temp_file is not None and temp_file.exists():
             temp_file.unlink()
@@ -1,29 +1,37 @@
 import base64
 import binascii
+import functools
 import json
+import os
 import platform
 import random
 import secrets
 import shutil
-import socket
 import string
 import subprocess
+import sys
 import time
 from pathlib import Path
 
 import typer
-from questionary import Style
 from rich.align import Align
 from rich.console import Console, Theme
 from rich.prompt import Confirm
 
-questionary_style = Style(
-    [
-        ("pointer", "fg:#ff8800 bold"),
-        ("highlighted", "fg:black bg:#ff8800 bold"),
-        ("selected", "fg:#ff8800 bold"),
-    ]
-)
+from core.config import GLOBAL_CONFIG_DIR, find_component, get_config_value
+from core.trace import span, traced
+
+DOCKER_HEALTH_CACHE = GLOBAL_CONFIG_DIR / "docker_health.json"
+DOCKER_HEALTH_TTL = 30
+# How long a wizard waits on its background Docker probe before the first prompt.
+DOCKER_PROBE_WAIT = 2
+DOCKER_START_TIMEOUT = 30
+
+QUESTIONARY_STYLE_RULES = [
+    ("pointer", "fg:#ff8800 bold"),
+    ("highlighted", "fg:black bg:#ff8800 bold"),
+    ("selected", "fg:#ff8800 bold"),
+]
 
 custom_theme = Theme(
     {
@@ -90,6 +98,16 @@ def generate_password(length: int = 16) -> str:
     return "".join(password)
 
 
+def __getattr__(name: str):
+    # questionary pulls in prompt_toolkit, only build the style for interactive commands.
+    if name == "questionary_style":
+        from questionary import Style
+
+        globals()["questionary_style"] = Style(QUESTIONARY_STYLE_RULES)
+        return globals()["questionary_style"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_random_hint():
     return f"[hint]{random.choice(HINTS)}[/hint]"
 
@@ -108,10 +126,71 @@ def print_banner():
     console.print(Align.center(get_random_hint() + "\n"))
 
 
-def get_free_port():
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(("", 0))
-        return s.getsockname()[1]
+def docker_ping(docker_path: str | None = None) -> bool:
+    """Cheap daemon liveness probe: socket /_ping first, `docker info` as fallback."""
+    # core.docker_api pulls in http.client, too slow for every CLI start-up.
+    from core.docker_api import docker_binary, get_docker_api
+
+    api = get_docker_api()
+    if api is not None and api.ping():
+        return True
+    with span("docker.info") as s:
+        try:
+            subprocess.run(
+                [docker_path or docker_binary(), "info"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+            s.set(exit_code=0)
+            return True
+        except subprocess.CalledProcessError as e:
+            s.set(exit_code=e.returncode)
+            return False
+        except OSError:
+            return False
+
+
+def docker_is_alive(docker_path: str | None = None) -> bool:
+    """Liveness probe whose positive result is cached for DOCKER_HEALTH_TTL seconds."""
+    from core.docker_api import docker_host
+
+    docker_host_url = docker_host()
+    try:
+        with open(DOCKER_HEALTH_CACHE, "r") as f:
+            cache = json.load(f)
+        if (
+            cache.get("docker_host") == docker_host_url
+            and time.time() - cache.get("checked_at", 0) < DOCKER_HEALTH_TTL
+        ):
+            return True
+    except Exception:
+        pass
+
+    if not docker_ping(docker_path):
+        return False
+
+    try:
+        DOCKER_HEALTH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(DOCKER_HEALTH_CACHE, "w") as f:
+            json.dump({"checked_at": time.time(), "docker_host": docker_host_url}, f)
+    except Exception:
+        pass
+    return True
+
+
+def wait_for_docker(timeout: float) -> bool:
+    """Poll the daemon with exponential backoff until it answers or the deadline passes."""
+    deadline = time.monotonic() + timeout
+    delay = 0.25
+    while True:
+        if docker_ping():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 4)
 
 
 def start_docker():
@@ -127,39 +206,27 @@ def start_docker():
             subprocess.run(["start", "docker"], shell=True, check=True)
 
         console.print("[info]Waiting for Docker to start...[/info]")
-        for _ in range(10):
-            try:
-                subprocess.run(
-                    ["docker", "info"],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    check=True,
-                )
-                console.print("[success]✔ Docker started successfully.[/success]")
-                return True
-            except:
-                time.sleep(2)
+        timeout = get_config_value("docker_start_timeout", DOCKER_START_TIMEOUT)
+        if wait_for_docker(float(timeout)):
+            console.print("[success]✔ Docker started successfully.[/success]")
+            return True
     except Exception as e:
         console.print(f"[danger]✖ Failed to start Docker:[/danger] {e}")
 
     return False
 
 
+@traced("system.check")
 def check_system():
-    docker_path = shutil.which("docker")
+    from core.docker_api import docker_binary
+
+    docker_path = shutil.which(docker_binary())
 
     if docker_path is None:
         console.print("[danger]✖ Docker not found (binary missing).[/danger]")
         raise typer.Exit(1)
 
-    try:
-        subprocess.run(
-            [docker_path, "info"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True,
-        )
-    except subprocess.CalledProcessError:
+    if not docker_is_alive(docker_path):
         console.print(
             "[warning]⚠ Docker is installed but the Daemon is not running.[/warning]"
         )
@@ -169,9 +236,6 @@ def check_system():
 
         console.print("[danger]✖ Docker is required to continue.[/danger]")
         raise typer.Exit(1)
-    except Exception as e:
-        console.print(f"[danger]✖ Critical Error executing Docker:[/danger] {e}")
-        raise typer.Exit(1)
 
 
 def validate_work_dir(path: Path):
@@ -181,6 +245,41 @@ def validate_work_dir(path: Path):
     return path
 
 
+def resolve_component(name: str) -> Path:
+    """Component folder from a path, or from its name in the components registry."""
+    path = Path(name).resolve()
+    if not (path / "docker-compose.yml").exists():
+        registered = find_component(name)
+        if registered is not None:
+            path = registered
+    return validate_work_dir(path)
+
+
+def component_type(path: Path) -> str | None:
+    if not (path / "docker-compose.yml").exists():
+        return None
+    if (path / "databases.json").exists():
+        return "agent"
+    env_path = path / ".env"
+    if env_path.exists() and "PROJECT_SECRET=" in env_path.read_text():
+        return "dashboard"
+    return None
+
+
+def discover_components(roots: list) -> list:
+    """Portabase component folders among the given roots and their direct children."""
+    components = []
+    for root in roots:
+        root = Path(root).resolve()
+        candidates = [root]
+        if root.is_dir():
+            candidates += sorted(p for p in root.iterdir() if p.is_dir())
+        for path in candidates:
+            if path not in components and component_type(path):
+                components.append(path)
+    return components
+
+
 def validate_edge_key(key: str) -> bool:
     """Validates the integrity of the EDGE_KEY (Base64 or JSON)."""
     try:
@@ -200,19 +299,39 @@ def validate_edge_key(key: str) -> bool:
         return False
 
 
-def current_version() -> str:
+@functools.cache
+def build_info() -> dict:
+    """Version and build metadata, read once per process.
 
+    Binaries carry a `_version.py` generated by the build; source checkouts
+    fall back to pyproject.toml and have no build metadata.
+    """
+    try:
+        import _version
+
+        return {
+            "version": _version.__version__,
+            "commit": _version.__commit__,
+            "build_date": _version.__build_date__,
+            "platform": _version.__platform__,
+        }
+    except (ImportError, AttributeError):
+        pass
+
+    info = {"version": "unknown", "commit": None, "build_date": None, "platform": None}
     try:
-        import sys
         import tomllib
-        from pathlib import Path
 
         if getattr(sys, "frozen", False):
             base_path = Path(sys._MEIPASS)
         else:
             base_path = Path(__file__).parent.parent
         with open(base_path / "pyproject.toml", "rb") as f:
-            __version__ = tomllib.load(f)["project"]["version"]
+            info["version"] = tomllib.load(f)["project"]["version"]
     except (FileNotFoundError, KeyError, ImportError, AttributeError):
-        __version__ = "unknown"
-    return __version__
+        pass
+    return info
+
+
+def current_version() -> str:
+    return build_info()["version"]
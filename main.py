@@ -1,12 +1,122 @@
+import importlib
 from typing import Optional
 
 import typer
+from typer.core import TyperCommand, TyperGroup
+
+from core.utils import build_info, console
+
+# Sub-commands are imported only when dispatched, so that e.g. `portabase stop`
+# or `portabase --help` never pay for questionary, requests or the templates.
+LAZY_COMMANDS = {
+    "agent": {
+        "target": "commands.agent:agent",
+        "help": "Create a new Portabase Agent instance.",
+        "rich_help_panel": "Creation",
+        "no_args_is_help": True,
+    },
+    "dashboard": {
+        "target": "commands.dashboard:dashboard",
+        "help": "Create a new Portabase Dashboard instance.",
+        "rich_help_panel": "Creation",
+        "no_args_is_help": True,
+    },
+    "start": {
+        "target": "commands.common:start",
+        "help": "Start one or more Portabase components.",
+        "rich_help_panel": "Lifecycle",
+        "no_args_is_help": True,
+    },
+    "stop": {
+        "target": "commands.common:stop",
+        "help": "Stop one or more Portabase components.",
+        "rich_help_panel": "Lifecycle",
+        "no_args_is_help": True,
+    },
+    "restart": {
+        "target": "commands.common:restart",
+        "help": "Restart one or more Portabase components.",
+        "rich_help_panel": "Lifecycle",
+        "no_args_is_help": True,
+    },
+    "status": {
+        "target": "commands.status:status",
+        "help": "Show the state of Portabase components.",
+        "rich_help_panel": "Lifecycle",
+    },
+    "logs": {
+        "target": "commands.common:logs",
+        "help": "View logs of one or more Portabase components.",
+        "rich_help_panel": "Lifecycle",
+        "no_args_is_help": True,
+    },
+    "uninstall": {
+        "target": "commands.common:uninstall",
+        "help": "Uninstall and delete a Portabase component.",
+        "rich_help_panel": "Lifecycle",
+        "no_args_is_help": True,
+    },
+    "db": {
+        "target": "commands.db:app",
+        "help": "Manage databases configuration.",
+        "rich_help_panel": "Configuration",
+    },
+    "config": {
+        "target": "commands.config:app",
+        "help": "Manage global CLI configuration.",
+        "rich_help_panel": "Configuration",
+    },
+    "templates": {
+        "target": "commands.templates:app",
+        "help": "Manage the local compose templates cache.",
+        "rich_help_panel": "Configuration",
+    },
+}
+
+
+def load_command(name: str) -> TyperCommand | TyperGroup:
+    spec = LAZY_COMMANDS[name]
+    module_name, attr = spec["target"].split(":")
+    target = getattr(importlib.import_module(module_name), attr)
+
+    if isinstance(target, typer.Typer):
+        command = typer.main.get_group(target)
+    else:
+        single = typer.Typer(add_completion=False)
+        single.command(
+            name=name,
+            help=spec["help"],
+            no_args_is_help=spec.get("no_args_is_help", False),
+        )(target)
+        command = typer.main.get_command(single)
+
+    command.name = name
+    command.rich_help_panel = spec["rich_help_panel"]
+    return command
+
+
+class LazyGroup(TyperGroup):
+    """Root group listing lazy commands as placeholders until one is invoked."""
+
+    def __init__(self, **attrs):
+        super().__init__(**attrs)
+        for name, spec in LAZY_COMMANDS.items():
+            self.commands[name] = TyperCommand(
+                name=name,
+                help=spec["help"],
+                rich_help_panel=spec["rich_help_panel"],
+            )
+
+    def resolve_command(self, ctx, args):
+        cmd_name, cmd, args = super().resolve_command(ctx, args)
+        if cmd_name in LAZY_COMMANDS:
+            cmd = load_command(cmd_name)
+            self.commands[cmd_name] = cmd
+        return cmd_name, cmd, args
 
-from commands import agent, common, config, dashboard, db
-from core.updater import check_for_updates, update_cli
-from core.utils import console, current_version
 
 app = typer.Typer(
+    cls=LazyGroup,
     no_args_is_help=True,
     add_completion=False,
 )
@@ -14,7 +124,15 @@ app = typer.Typer(
 
 def version_callback(value: bool):
     if value:
-        console.print(f"Portabase CLI version: {current_version()}")
+        from core.updater import check_for_updates
+
+        info = build_info()
+        console.print(f"Portabase CLI version: {info['version']}")
+        if info["commit"]:
+            console.print(
+                f"[dim]commit {info['commit'][:12]}, built {info['build_date']} "
+                f"for {info['platform']}[/dim]"
+            )
         check_for_updates(force=True)
         raise typer.Exit()
 
@@ -29,57 +147,34 @@ def main(
         callback=version_callback,
         is_eager=True,
     ),
+    profile: Optional[str] = typer.Option(
+        None,
+        "--profile",
+        envvar="PORTABASE_TRACE",
+        metavar="FILE",
+        help="Record timings of slow steps to FILE (.jsonl, or a Chrome trace otherwise).",
+    ),
 ):
     """
     Portabase CLI to manage agents, dashboards and databases.
     """
+    if profile:
+        from core.trace import start_trace
+
+        start_trace(profile, f"portabase.{ctx.invoked_subcommand}")
+
     if ctx.invoked_subcommand != "update":
+        from core.updater import check_for_updates
+
         check_for_updates()
 
 
 @app.command(help="Update the CLI to the latest version.", rich_help_panel="System")
 def update():
-    update_cli()
+    from core.updater import update_cli
 
+    update_cli()
 
-app.command(
-    help="Create a new Portabase Agent instance.",
-    rich_help_panel="Creation",
-    no_args_is_help=True,
-)(agent.agent)
-app.command(
-    help="Create a new Portabase Dashboard instance.",
-    rich_help_panel="Creation",
-    no_args_is_help=True,
-)(dashboard.dashboard)
-app.command(
-    help="Start a Portabase component.",
-    rich_help_panel="Lifecycle",
-    no_args_is_help=True,
-)(common.start)
-app.command(
-    help="Stop a Portabase component.",
-    rich_help_panel="Lifecycle",
-    no_args_is_help=True,
-)(common.stop)
-app.command(
-    help="Restart a Portabase component.",
-    rich_help_panel="Lifecycle",
-    no_args_is_help=True,
-)(common.restart)
-app.command(
-    help="View logs of a Portabase component.",
-    rich_help_panel="Lifecycle",
-    no_args_is_help=True,
-)(common.logs)
-app.command(
-    help="Uninstall and delete a Portabase component.",
-    rich_help_panel="Lifecycle",
-    no_args_is_help=True,
-)(common.uninstall)
-
-app.add_typer(db.app, name="db", rich_help_panel="Configuration")
-app.add_typer(config.app, name="config", rich_help_panel="Configuration")
 
 if __name__ == "__main__":
     app()
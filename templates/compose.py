@@ -1,3 +1,10 @@
+import re
+
+import yaml
+
+# Placeholders understood by the snippets below, e.g. ${SERVICE_NAME}.
+PLACEHOLDER_PATTERN = re.compile(r"\$\{([A-Z_]+)\}")
+
 AGENT_POSTGRES_SNIPPET = """
   ${SERVICE_NAME}:
     image: postgres:17-alpine
@@ -12,11 +19,6 @@ AGENT_POSTGRES_SNIPPET = """
       - POSTGRES_DB=${DB_NAME}
       - POSTGRES_USER=${USER}
       - POSTGRES_PASSWORD=${PASSWORD}
-    healthcheck:
-      test: ["CMD-SHELL", "pg_isready -U ${USER} -d ${DB_NAME}"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 AGENT_MARIADB_SNIPPET = """
@@ -34,11 +36,6 @@ AGENT_MARIADB_SNIPPET = """
       - MYSQL_RANDOM_ROOT_PASSWORD=yes
     volumes:
       - ${VOL_NAME}:/var/lib/mysql
-    healthcheck:
-      test: ["CMD-SHELL", "mariadb-admin ping -h localhost -u ${USER} -p${PASSWORD}"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 AGENT_MONGODB_AUTH_SNIPPET = """
@@ -56,11 +53,6 @@ AGENT_MONGODB_AUTH_SNIPPET = """
     command: mongod --auth
     volumes:
       - ${VOL_NAME}:/data/db
-    healthcheck:
-      test: ["CMD-SHELL", "mongosh --eval 'db.runCommand({ping:1})' --quiet"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 AGENT_MONGODB_SNIPPET = """
@@ -75,11 +67,6 @@ AGENT_MONGODB_SNIPPET = """
       - MONGO_INITDB_DATABASE=${DB_NAME}
     volumes:
       - ${VOL_NAME}:/data/db
-    healthcheck:
-      test: ["CMD-SHELL", "mongosh --eval 'db.runCommand({ping:1})' --quiet"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 AGENT_FIREBIRD_SNIPPET = """
@@ -98,11 +85,6 @@ AGENT_FIREBIRD_SNIPPET = """
       - FIREBIRD_PASSWORD=${PASSWORD}
       - FIREBIRD_ROOT_PASSWORD=${ROOT_PASSWORD}
       - FIREBIRD_DATABASE_DEFAULT_CHARSET=UTF8
-    healthcheck:
-      test: ["CMD-SHELL", "nc -z localhost 3050"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 
@@ -117,11 +99,6 @@ AGENT_REDIS_SNIPPET = """
     networks:
       - portabase
       - default
-    healthcheck:
-      test: ["CMD-SHELL", "redis-cli ping | grep PONG"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 AGENT_REDIS_AUTH_SNIPPET = """
@@ -137,11 +114,6 @@ AGENT_REDIS_AUTH_SNIPPET = """
     networks:
       - portabase
       - default
-    healthcheck:
-      test: ["CMD-SHELL", "redis-cli -a ${PASSWORD} ping | grep PONG"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 
@@ -157,11 +129,6 @@ AGENT_VALKEY_SNIPPET = """
     networks:
       - portabase
       - default
-    healthcheck:
-      test: ["CMD-SHELL", "valkey-cli ping | grep PONG"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 AGENT_VALKEY_AUTH_SNIPPET = """
@@ -175,11 +142,6 @@ AGENT_VALKEY_AUTH_SNIPPET = """
     networks:
       - portabase
       - default
-    healthcheck:
-      test: ["CMD-SHELL", "valkey-cli -a ${PASSWORD} ping | grep PONG"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
 """
 
 AGENT_MSSQL_SNIPPET = """
@@ -195,9 +157,216 @@ AGENT_MSSQL_SNIPPET = """
       - MSSQL_SA_PASSWORD=${PASSWORD}
     volumes:
       - ${VOL_NAME}:/var/opt/mssql
-    healthcheck:
-      test: ["CMD-SHELL", "cat /proc/net/tcp6 | grep -q '059901' || exit 1"]
-      interval: 10s
-      timeout: 5s
-      retries: 20
 """
+
+
+def healthcheck(*test: str, retries: int = 5) -> dict:
+    return {
+        "test": ["CMD-SHELL", *test],
+        "interval": "10s",
+        "timeout": "5s",
+        "retries": retries,
+    }
+
+
+# (engine, variant) -> how `agent` and `db add` create a local container for it.
+# "env" lists the .env variables generated next to <PREFIX>_PORT, "user" the
+# default account, "db_name"/"database" the generated name and config value.
+DATABASE_ENGINES = {
+    ("postgresql", "no-auth"): {
+        "label": "Postgres",
+        "service": "pg",
+        "snippet": AGENT_POSTGRES_SNIPPET,
+        "port": 5432,
+        "env": ("DB", "USER", "PASS"),
+        "user": "admin",
+        "db_name": "pg_{token}",
+        "healthcheck": healthcheck("pg_isready -U ${USER} -d ${DB_NAME}"),
+    },
+    ("postgresql-cluster", "no-auth"): {
+        "label": "Postgres Cluster",
+        "service": "pg",
+        "snippet": AGENT_POSTGRES_SNIPPET,
+        "port": 5432,
+        "env": ("DB", "USER", "PASS"),
+        "user": "admin",
+        "db_name": "pg_{token}",
+        "healthcheck": healthcheck("pg_isready -U ${USER} -d ${DB_NAME}"),
+    },
+    ("mysql", "no-auth"): {
+        "label": "MariaDB",
+        "service": "mariadb",
+        "snippet": AGENT_MARIADB_SNIPPET,
+        "port": 3306,
+        "env": ("DB", "USER", "PASS"),
+        "user": "admin",
+        "db_name": "mysql_{token}",
+        "healthcheck": healthcheck(
+            "mariadb-admin ping -h localhost -u ${USER} -p${PASSWORD}"
+        ),
+    },
+    ("mariadb", "no-auth"): {
+        "label": "MariaDB",
+        "service": "mariadb",
+        "snippet": AGENT_MARIADB_SNIPPET,
+        "port": 3306,
+        "env": ("DB", "USER", "PASS"),
+        "user": "admin",
+        "db_name": "mysql_{token}",
+        "healthcheck": healthcheck(
+            "mariadb-admin ping -h localhost -u ${USER} -p${PASSWORD}"
+        ),
+    },
+    ("mongodb", "no-auth"): {
+        "label": "MongoDB",
+        "service": "mongo",
+        "snippet": AGENT_MONGODB_SNIPPET,
+        "port": 27017,
+        "env": ("DB",),
+        "db_name": "mongo_{token}",
+        "healthcheck": healthcheck(
+            "mongosh --eval 'db.runCommand({ping:1})' --quiet"
+        ),
+    },
+    ("mongodb", "with-auth"): {
+        "label": "MongoDB Auth",
+        "service": "mongo-auth",
+        "snippet": AGENT_MONGODB_AUTH_SNIPPET,
+        "port": 27017,
+        "env": ("DB", "USER", "PASS"),
+        "user": "admin",
+        "db_name": "mongo_{token}",
+        "healthcheck": healthcheck(
+            "mongosh --eval 'db.runCommand({ping:1})' --quiet"
+        ),
+    },
+    ("redis", "no-auth"): {
+        "label": "Redis",
+        "service": "redis",
+        "snippet": AGENT_REDIS_SNIPPET,
+        "port": 6379,
+        "env": (),
+        "db_name": "redis_{token}",
+        "database": "0",
+        "healthcheck": healthcheck("redis-cli ping | grep PONG"),
+    },
+    ("redis", "with-auth"): {
+        "label": "Redis Auth",
+        "service": "redis-auth",
+        "snippet": AGENT_REDIS_AUTH_SNIPPET,
+        "port": 6379,
+        "env": ("PASS",),
+        "db_name": "redis_{token}",
+        "database": "0",
+        "healthcheck": healthcheck("redis-cli -a ${PASSWORD} ping | grep PONG"),
+    },
+    ("valkey", "no-auth"): {
+        "label": "Valkey",
+        "service": "valkey",
+        "snippet": AGENT_VALKEY_SNIPPET,
+        "port": 6379,
+        "env": (),
+        "db_name": "valkey_{token}",
+        "database": "0",
+        "healthcheck": healthcheck("valkey-cli ping | grep PONG"),
+    },
+    ("valkey", "with-auth"): {
+        "label": "Valkey Auth",
+        "service": "valkey-auth",
+        "snippet": AGENT_VALKEY_AUTH_SNIPPET,
+        "port": 6379,
+        "env": ("PASS",),
+        "db_name": "valkey_{token}",
+        "database": "0",
+        "healthcheck": healthcheck("valkey-cli -a ${PASSWORD} ping | grep PONG"),
+    },
+    ("firebird", "no-auth"): {
+        "label": "Firebird",
+        "service": "firebird",
+        "snippet": AGENT_FIREBIRD_SNIPPET,
+        "port": 3050,
+        "env": ("DB", "USER", "PASS", "ROOT_PASS"),
+        "user": "alice",
+        "db_name": "mirror.fdb",
+        "database": "/var/lib/firebird/data/{db_name}",
+        "healthcheck": healthcheck("nc -z localhost 3050"),
+    },
+    ("mssql", "no-auth"): {
+        "label": "MSSQL",
+        "service": "mssql",
+        "snippet": AGENT_MSSQL_SNIPPET,
+        "port": 1433,
+        "env": ("PASS",),
+        "db_name": "master",
+        "entry_name": "MSSQL",
+        "entry_user": "sa",
+        "healthcheck": healthcheck(
+            "cat /proc/net/tcp6 | grep -q '059901' || exit 1", retries=20
+        ),
+    },
+}
+
+# Default port of each engine, used when pointing at an existing server.
+DEFAULT_PORTS = {engine: spec["port"] for (engine, _), spec in DATABASE_ENGINES.items()}
+
+# Which snippet placeholder each generated .env variable fills.
+ENV_PLACEHOLDERS = {
+    "PORT": "PORT",
+    "DB": "DB_NAME",
+    "USER": "USER",
+    "PASS": "PASSWORD",
+    "ROOT_PASS": "ROOT_PASSWORD",
+}
+
+_compiled: dict[str, list[str]] = {}
+_parsed: dict[str, dict] = {}
+
+
+def compile_snippet(snippet: str) -> list[str]:
+    """Split a snippet once into literal text (even indexes) and placeholder names (odd)."""
+    tokens = _compiled.get(snippet)
+    if tokens is None:
+        tokens = _compiled[snippet] = PLACEHOLDER_PATTERN.split(snippet)
+    return tokens
+
+
+def render_snippet(snippet: str, params: dict) -> str:
+    """Fill all placeholders in one pass; unknown ones are left as written."""
+    tokens = compile_snippet(snippet)
+    parts = tokens[:]
+    for i in range(1, len(tokens), 2):
+        name = tokens[i]
+        parts[i] = params[name] if name in params else f"${{{name}}}"
+    return "".join(parts)
+
+
+def parse_snippet(snippet: str) -> dict:
+    """YAML tree of a snippet, parsed once with the placeholders left in its strings."""
+    tree = _parsed.get(snippet)
+    if tree is None:
+        tree = _parsed[snippet] = yaml.safe_load(snippet)
+    return tree
+
+
+def fill_placeholders(node, params: dict):
+    """Copy of a parsed tree with the placeholders of every string filled."""
+    if isinstance(node, str):
+        return render_snippet(node, params) if "${" in node else node
+    if isinstance(node, dict):
+        return {fill_placeholders(k, params): fill_placeholders(v, params) for k, v in node.items()}
+    if isinstance(node, list):
+        return [fill_placeholders(item, params) for item in node]
+    return node
+
+
+def render_service(spec: dict, params: dict) -> dict:
+    """Render an engine's snippet and healthcheck into a compose service definition.
+
+    Values are substituted into the parsed tree, so they are never read as YAML.
+    """
+    (service,) = parse_snippet(spec["snippet"]).values()
+    service = fill_placeholders(service, params)
+    check = spec.get("healthcheck")
+    if check:
+        service["healthcheck"] = fill_placeholders(check, params)
+    return service